@@ -0,0 +1,49 @@
+"""Microbenchmark for the chacha keystream XOR.
+
+Reports throughput in MB/s of the block-wise engine and, for sizes where it
+finishes in reasonable time, the original reference implementation.
+"""
+import argparse
+import os
+import time
+
+from modlunky2.assets.chacha import chacha
+
+FILEPATH = b"Data/Textures/items.png"
+KEY = 0x1234567890ABCDEF
+SIZES = {
+    "1KB": 1 << 10,
+    "1MB": 1 << 20,
+    "64MB": 64 << 20,
+}
+# The reference implementation is too slow to be worth timing past this.
+MAX_REFERENCE_SIZE = 1 << 20
+
+
+def time_chacha(data, reference, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chacha(FILEPATH, data, KEY, reference=reference)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chacha throughput.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, size in SIZES.items():
+        data = os.urandom(size)
+        modes = [("block", False)]
+        if size <= MAX_REFERENCE_SIZE:
+            modes.append(("reference", True))
+        for mode, reference in modes:
+            elapsed = time_chacha(data, reference, args.repeat)
+            print(f"{name:>5} {mode:>9}: {size / elapsed / 1e6:10.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Compressed size and time of each compression strategy on a real exe.
+
+Every encrypted asset in the exe is decrypted and decompressed, then
+compressed again with each strategy. The asset's size in the exe is used as
+its budget for the fit-to-budget strategy.
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import zstandard as zstd
+
+from modlunky2.assets.assets import AssetStore
+from modlunky2.assets.chacha import chacha
+from modlunky2.assets.compression import CompressionSettings, compress
+from modlunky2.assets.constants import DEFAULT_COMPRESSION_LEVEL
+
+# Files up to this size are the ones dictionaries help with.
+DICTIONARY_MAX_SAMPLE_SIZE = 64 << 10
+DEFAULT_DICTIONARY_SIZE = 112 << 10
+
+
+def train_dictionary(
+    samples: Iterable[bytes], dict_size: int = DEFAULT_DICTIONARY_SIZE
+) -> zstd.ZstdCompressionDict:
+    """Train a dictionary on small assets (.lvl, .str, .json, ...)."""
+    return zstd.train_dictionary(
+        dict_size,
+        [sample for sample in samples if len(sample) <= DICTIONARY_MAX_SAMPLE_SIZE],
+    )
+
+
+@dataclass
+class StrategyReport:
+    name: str
+    assets: int
+    original_size: int
+    compressed_size: int
+    seconds: float
+
+    def __str__(self):
+        ratio = self.compressed_size / self.original_size if self.original_size else 0
+        return (
+            f"{self.name:<16} {self.assets:>6} assets"
+            f" {self.original_size:>12} -> {self.compressed_size:>12} bytes"
+            f" ({ratio:6.2%}) in {self.seconds:8.3f}s"
+        )
+
+
+def _run_strategy(
+    name: str, assets: List[Tuple[bytes, Optional[int]]], compress_one: Callable
+) -> StrategyReport:
+    start = time.perf_counter()
+    compressed_size = sum(len(compress_one(data, budget)) for data, budget in assets)
+    return StrategyReport(
+        name=name,
+        assets=len(assets),
+        original_size=sum(len(data) for data, _ in assets),
+        compressed_size=compressed_size,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def report_strategies(
+    assets: List[Tuple[bytes, Optional[int]]],
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+    threads: int = 0,
+    fast_level: int = 3,
+) -> Dict[str, StrategyReport]:
+    """Compress `assets` with each strategy and report size and time.
+
+    `assets` is a list of (uncompressed data, budget) where the budget is the
+    asset's compressed size in the exe, if known.
+
+    The dictionary strategy is for comparison only. The game decompresses
+    assets without a dictionary, so frames that need one can't be packed.
+    """
+    reports = {}
+
+    def fresh(data, _budget):
+        return zstd.ZstdCompressor(level=level).compress(data)
+
+    reports["per-asset"] = _run_strategy("per-asset", assets, fresh)
+
+    settings = CompressionSettings(level=level)
+    reports["reused"] = _run_strategy(
+        "reused", assets, lambda data, _budget: compress(data, settings)
+    )
+
+    if threads:
+        settings = CompressionSettings(level=level, threads=threads)
+        reports["threaded"] = _run_strategy(
+            "threaded", assets, lambda data, _budget: compress(data, settings)
+        )
+
+    settings = CompressionSettings(
+        level=fast_level, threads=threads, fit_to_budget=True
+    )
+    reports["fit-to-budget"] = _run_strategy(
+        "fit-to-budget", assets, lambda data, budget: compress(data, settings, budget)
+    )
+
+    small_assets = [
+        (data, budget)
+        for data, budget in assets
+        if len(data) <= DICTIONARY_MAX_SAMPLE_SIZE
+    ]
+    reports["small"] = _run_strategy(
+        "small",
+        small_assets,
+        lambda data, _budget: compress(data, CompressionSettings(level=level)),
+    )
+    try:
+        start = time.perf_counter()
+        dict_data = train_dictionary(data for data, _ in small_assets)
+        dict_data.precompute_compress(level=level)
+        training_seconds = time.perf_counter() - start
+    except zstd.ZstdError:
+        # Not enough samples to train on
+        return reports
+
+    cctx = zstd.ZstdCompressor(level=level, dict_data=dict_data)
+    report = _run_strategy(
+        "small+dictionary", small_assets, lambda data, _budget: cctx.compress(data)
+    )
+    report.seconds += training_seconds
+    reports["small+dictionary"] = report
+
+    return reports
+
+
+def load_assets(exe_path, limit):
+    assets = []
+    dctx = zstd.ZstdDecompressor()
+    with exe_path.open("rb") as exe:
+        asset_store = AssetStore.load_from_file(exe, use_mmap=True)
+        try:
+            for asset in asset_store.assets:
+                if asset.filepath is None or not asset.asset_block.is_encrypted:
+                    continue
+                asset.load_view(asset_store.exe_map)
+                try:
+                    data = dctx.decompress(
+                        chacha(asset.filepath.encode(), asset.data, asset_store.key)
+                    )
+                finally:
+                    asset.release_data()
+                assets.append((data, asset.asset_block.asset_len))
+                if limit and len(assets) >= limit:
+                    break
+        finally:
+            asset_store.close()
+    return assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compression strategies.")
+    parser.add_argument("exe", type=Path, help="Path to Spel2.exe")
+    parser.add_argument("--level", type=int, default=DEFAULT_COMPRESSION_LEVEL)
+    parser.add_argument("--fast-level", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=max(os.cpu_count() - 2, 1))
+    parser.add_argument(
+        "--limit", type=int, default=0, help="Only use the first N assets."
+    )
+    args = parser.parse_args()
+
+    assets = load_assets(args.exe, args.limit)
+    reports = report_strategies(
+        assets, level=args.level, threads=args.threads, fast_level=args.fast_level
+    )
+    for report in reports.values():
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
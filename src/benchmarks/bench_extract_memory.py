@@ -0,0 +1,105 @@
+"""Peak memory of AssetStore.extract with and without memory-mapping the exe.
+
+Bundle building and each configuration run in fresh interpreters since peak
+RSS is inherited across fork/exec on Linux.
+Python heap peaks come from tracemalloc and don't include mapped pages. Peak
+RSS does count touched pages of the map, but those are clean file-backed pages
+the OS can drop under pressure rather than private copies.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from modlunky2.assets.assets import AssetStore, ExtractMode
+from modlunky2.assets.constants import FILEPATH_DIRS, KNOWN_LEVELS_V2
+from modlunky2.assets.testing import BundleBuilder
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def build_exe(path: Path, bank_mb: int):
+    builder = BundleBuilder()
+    for filepath in KNOWN_LEVELS_V2:
+        builder.add_asset(filepath, os.urandom(64 << 10))
+    builder.add_asset("soundbank.bank", os.urandom(bank_mb << 20), is_encrypted=False)
+    builder.write(path)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(exe_path: Path, use_mmap: bool):
+    with tempfile.TemporaryDirectory() as out_dir:
+        extract_dir = Path(out_dir) / "Extracted"
+        compressed_dir = Path(out_dir) / ".compressed" / "Extracted"
+        for dir_ in FILEPATH_DIRS:
+            (extract_dir / dir_).mkdir(parents=True, exist_ok=True)
+            (compressed_dir / dir_).mkdir(parents=True, exist_ok=True)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with exe_path.open("rb") as exe:
+            asset_store = AssetStore.load_from_file(exe, use_mmap=use_mmap)
+            asset_store.extract(
+                extract_dir,
+                compressed_dir,
+                create_entity_sheets=False,
+                generate_string_hashes=False,
+                extract_mode=ExtractMode.THREADED,
+            )
+            asset_store.close()
+        elapsed = time.perf_counter() - start
+        _, heap_peak = tracemalloc.get_traced_memory()
+
+    mode = "mmap" if use_mmap else "read"
+    print(
+        f"{mode:>5}: {elapsed:6.2f}s  heap peak {heap_peak / 2**20:8.1f} MB"
+        f"  rss peak {peak_rss_mb():8.1f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bank-mb", type=int, default=256)
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--build", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--mmap", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.build:
+        build_exe(args.build, args.bank_mb)
+        return
+
+    if args.child:
+        run_child(args.child, args.mmap)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exe_path = Path(tmp_dir) / "Spel2.exe"
+        subprocess.run(
+            [sys.executable, __file__, "--build", str(exe_path)]
+            + ["--bank-mb", str(args.bank_mb)],
+            check=True,
+        )
+        print(f"Bundle size: {exe_path.stat().st_size / 2**20:.1f} MB")
+        for use_mmap in (False, True):
+            cmd = [sys.executable, __file__, "--child", str(exe_path)]
+            if use_mmap:
+                cmd.append("--mmap")
+            subprocess.run(cmd, check=True)
+
+
+if __name__ == "__main__":
+    main()
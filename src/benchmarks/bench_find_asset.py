@@ -0,0 +1,57 @@
+"""Load time of AssetStore on a synthetic bundle, indexed vs linear lookups."""
+import argparse
+import io
+import time
+
+from modlunky2.assets import assets
+from modlunky2.assets.assets import AssetStore
+from modlunky2.assets.constants import KNOWN_FILEPATHS
+from modlunky2.assets.testing import BundleBuilder
+
+
+class LinearAssetStore(AssetStore):
+    """The original lookup: a match_hash scan over every asset."""
+
+    def _candidate_assets(self, filepath_hash):
+        # Both find_asset and find_asset_by_hash look assets up through this
+        return self.assets
+
+
+def build_bundle(num_assets):
+    builder = BundleBuilder()
+    for idx in range(num_assets):
+        if idx < len(KNOWN_FILEPATHS):
+            filepath = KNOWN_FILEPATHS[idx]
+        else:
+            filepath = f"Data/Synthetic/asset{idx:05}.bin"
+        builder.add_asset(filepath, b"x", is_encrypted=False)
+    return builder.build()
+
+
+def time_load(store_cls, exe_data, warm):
+    if not warm:
+        assets._cached_hash_filepath.cache_clear()  # pylint: disable=protected-access
+    start = time.perf_counter()
+    store_cls.load_from_file(io.BytesIO(exe_data))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    exe_data = build_bundle(args.assets)
+    print(f"{args.assets} assets, {len(KNOWN_FILEPATHS)} known filepaths")
+    for name, store_cls in (("linear", LinearAssetStore), ("indexed", AssetStore)):
+        for warm in (False, True):
+            elapsed = min(
+                time_load(store_cls, exe_data, warm) for _ in range(args.repeat)
+            )
+            cache = "warm" if warm else "cold"
+            print(f"{name:>8} ({cache} hash cache): {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
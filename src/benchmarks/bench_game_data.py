@@ -0,0 +1,85 @@
+"""Benchmark loading entities.json/textures.json against the pickled digest.
+
+Each run is a fresh interpreter, so the times include importing modlunky2
+and building every sprite loader and merger from the data, same as the
+start of an extraction. The digest cache is written to a temporary
+directory, not CACHE_DIR.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODES = ["json", "digest-cold", "digest-warm"]
+
+
+def run_child(mode: str, cache_path: Path):
+    start = time.perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from modlunky2.sprites import game_data
+    from modlunky2.sprites.sprite_loaders import get_sprite_loader_factories
+    from modlunky2.sprites.sprite_mergers import get_all_sprite_mergers
+
+    imported = time.perf_counter()
+    if mode == "json":
+        with (game_data.GAME_DATA_DIR / "entities.json").open("rb") as json_file:
+            entities_json = json.load(json_file)
+        with (game_data.GAME_DATA_DIR / "textures.json").open("rb") as json_file:
+            textures_json = json.load(json_file)
+    else:
+        game_data.GAME_DATA_CACHE_PATH = cache_path
+        if mode == "digest-cold":
+            cache_path.unlink(missing_ok=True)
+        entities_json, textures_json = game_data.load_game_data()
+    loaded = time.perf_counter()
+
+    base_path = cache_path.parent
+    get_sprite_loader_factories(entities_json, textures_json, base_path)
+    get_all_sprite_mergers(entities_json, textures_json, base_path)
+    built = time.perf_counter()
+
+    print(json.dumps([imported - start, loaded - imported, built - loaded]))
+
+
+def time_mode(mode: str, cache_path: Path):
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", mode, str(cache_path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark game data loading.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, cache_path = args.child
+        run_child(mode, Path(cache_path))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_path = Path(temp_dir) / "game-data.pickle"
+        for mode in MODES:
+            times = [time_mode(mode, cache_path) for _ in range(args.runs)]
+            import_s, load_s, build_s = (
+                statistics.median(column) for column in zip(*times)
+            )
+            print(
+                f"{mode:<12} import {import_s * 1000:7.1f}ms"
+                f" load {load_s * 1000:7.1f}ms"
+                f" build {build_s * 1000:7.1f}ms"
+                f" total {(import_s + load_s + build_s) * 1000:7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Startup time of AssetStore.load_from_file with a cold and warm hash cache."""
+import argparse
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from modlunky2.assets import assets
+from modlunky2.assets.assets import AssetStore
+from modlunky2.assets.constants import KNOWN_FILEPATHS
+from modlunky2.assets.hash_cache import FilepathHashCache
+from modlunky2.assets.testing import BundleBuilder
+
+
+def time_load(exe_data, hash_cache):
+    # Only measure the on-disk cache, not the in-process memoization.
+    assets._cached_hash_filepath.cache_clear()  # pylint: disable=protected-access
+    start = time.perf_counter()
+    AssetStore.load_from_file(io.BytesIO(exe_data), hash_cache=hash_cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    builder = BundleBuilder()
+    for filepath in KNOWN_FILEPATHS:
+        builder.add_asset(filepath, b"x", is_encrypted=False)
+    exe_data = builder.build()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = Path(tmp_dir) / "filepath-hashes.json"
+        hash_cache = FilepathHashCache(cache_path)
+
+        no_cache = min(time_load(exe_data, None) for _ in range(args.repeat))
+        cold = []
+        for _ in range(args.repeat):
+            cache_path.unlink(missing_ok=True)
+            cold.append(time_load(exe_data, hash_cache))
+        warm = min(time_load(exe_data, hash_cache) for _ in range(args.repeat))
+
+    print(f"  no cache: {no_cache * 1000:8.1f} ms")
+    print(f"cold cache: {min(cold) * 1000:8.1f} ms")
+    print(f"warm cache: {warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark decoding memrauder dataclasses: compiled, interpreted and lazy.
+
+State is decoded from a synthetic slab with four players, each with a type
+and an inventory, so every pointer State has is followed. Player is the
+first of them. The interpreted times replace DataclassStruct.from_bytes with
+from_bytes_interpreted, including for nested structs. The lazy times are for
+lazy views, reading the fields a tracker typically would.
+
+Also counts the reads each decode makes, with and without a PageCachingReader.
+"""
+import argparse
+import struct
+import time
+from unittest import mock
+
+from modlunky2.mem.entities import Inventory, Player
+from modlunky2.mem.memrauder.model import (
+    BytesReader,
+    DataclassStruct,
+    MemContext,
+    MemoryReader,
+    PageCachingReader,
+)
+from modlunky2.mem.state import State
+
+STATE_ADDR = 0x0
+ITEMS_ADDR = 0x2000
+PLAYER_ADDR = 0x9000
+PLAYER_SIZE = 0x200
+ENTITY_DB_ADDR = 0xA000
+SLAB_SIZE = 0xB000
+
+
+def build_slab() -> bytes:
+    slab = bytearray(SLAB_SIZE)
+    struct.pack_into("<Q", slab, STATE_ADDR + 0x12F0, ITEMS_ADDR)
+    # UidEntityMap mask, which must be non-zero
+    struct.pack_into("<Q", slab, STATE_ADDR + 0x1348, 0xFF)
+    for i in range(4):
+        player_addr = PLAYER_ADDR + i * PLAYER_SIZE
+        # pylint: disable=protected-access
+        inventory_addr = ITEMS_ADDR + 0x28 + i * Inventory._size_as_element_
+        struct.pack_into("<Q", slab, ITEMS_ADDR + 0x08 + i * 8, player_addr)
+        struct.pack_into("<Q", slab, player_addr + 0x08, ENTITY_DB_ADDR)
+        struct.pack_into("<I", slab, player_addr + 0x38, 1234 + i)
+        struct.pack_into("<ff", slab, player_addr + 0x40, 12.5, 80.25)
+        struct.pack_into("<Q", slab, player_addr + 0x140, inventory_addr)
+    return bytes(slab)
+
+
+# Fields read from each lazy view
+TRACKED_FIELDS = {
+    State: ["screen", "world", "level", "theme", "time_total", "items"],
+    Player: ["uid", "position_x", "position_y", "health", "inventory"],
+}
+
+
+def decodes_per_second(cls, addr: int, slab: bytes, seconds: float, lazy=False):
+    mem_ctx = MemContext(BytesReader(slab), lazy=lazy)
+    fields = TRACKED_FIELDS[cls] if lazy else []
+    mem_ctx.type_at_addr(cls, addr)
+    count = 0
+    start = time.perf_counter()
+    while True:
+        value = mem_ctx.type_at_addr(cls, addr)
+        for field in fields:
+            getattr(value, field)
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return count / elapsed
+
+
+class CountingReader(MemoryReader):
+    def __init__(self, mem_reader: MemoryReader):
+        self.mem_reader = mem_reader
+        self.reads = 0
+
+    def read(self, addr, size):
+        self.reads += 1
+        return self.mem_reader.read(addr, size)
+
+
+def reads_per_decode(cls, addr: int, slab: bytes, cached: bool, lazy: bool) -> int:
+    counting = CountingReader(BytesReader(slab))
+    mem_reader = PageCachingReader(counting) if cached else counting
+    value = MemContext(mem_reader, lazy=lazy).type_at_addr(cls, addr)
+    for field in TRACKED_FIELDS[cls] if lazy else []:
+        getattr(value, field)
+    return counting.reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memrauder decoding.")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    slab = build_slab()
+    for cls, addr in [(State, STATE_ADDR), (Player, PLAYER_ADDR)]:
+        compiled = decodes_per_second(cls, addr, slab, args.seconds)
+        with mock.patch.object(
+            DataclassStruct, "from_bytes", DataclassStruct.from_bytes_interpreted
+        ):
+            interpreted = decodes_per_second(cls, addr, slab, args.seconds)
+        lazy = decodes_per_second(cls, addr, slab, args.seconds, lazy=True)
+        print(
+            f"{cls.__name__:<8} compiled {compiled:9.0f}/s"
+            f" interpreted {interpreted:9.0f}/s"
+            f" ({compiled / interpreted:.2f}x)"
+            f" lazy {lazy:9.0f}/s ({lazy / interpreted:.2f}x)"
+        )
+
+    for cls, addr in [(State, STATE_ADDR), (Player, PLAYER_ADDR)]:
+        for lazy in [False, True]:
+            direct = reads_per_decode(cls, addr, slab, cached=False, lazy=lazy)
+            cached = reads_per_decode(cls, addr, slab, cached=True, lazy=lazy)
+            mode = "lazy" if lazy else "eager"
+            print(
+                f"{cls.__name__:<8} {mode:<5} reads: {direct} direct,"
+                f" {cached} with page cache"
+            )
+
+
+if __name__ == "__main__":
+    main()
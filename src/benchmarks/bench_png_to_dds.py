@@ -0,0 +1,65 @@
+"""Benchmark png_to_dds over every texture in DDS_PNGS.
+
+Point it at an extracted directory (e.g. Mods/Extracted). Reports the time
+spent converting each texture and the total, optionally alongside the
+original per-pixel implementation which is also checked for identical output.
+"""
+import argparse
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from modlunky2.assets.constants import DDS_PNGS
+from modlunky2.assets.converters import _png_to_dds_reference, png_to_dds
+
+
+def time_convert(convert, img):
+    start = time.perf_counter()
+    data = convert(img)
+    return time.perf_counter() - start, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark png_to_dds.")
+    parser.add_argument(
+        "extract_dir", type=Path, help="Directory assets were extracted to."
+    )
+    parser.add_argument(
+        "--reference",
+        action="store_true",
+        help="Also time (and compare against) the per-pixel implementation.",
+    )
+    args = parser.parse_args()
+
+    total = 0.0
+    total_reference = 0.0
+    missing = 0
+    for filepath in sorted(DDS_PNGS):
+        png_path = args.extract_dir / Path(filepath).with_suffix(".png")
+        if not png_path.exists():
+            missing += 1
+            continue
+
+        with Image.open(png_path) as img:
+            img.load()
+            elapsed, data = time_convert(png_to_dds, img)
+            total += elapsed
+            line = f"{filepath:<50} {img.width:>5}x{img.height:<5} {elapsed:8.3f}s"
+            if args.reference:
+                elapsed, reference_data = time_convert(_png_to_dds_reference, img)
+                total_reference += elapsed
+                line += f" reference {elapsed:8.3f}s"
+                if data != reference_data:
+                    line += " MISMATCH"
+        print(line)
+
+    print(f"Total: {total:.3f}s")
+    if args.reference:
+        print(f"Total reference: {total_reference:.3f}s")
+    if missing:
+        print(f"Skipped {missing} textures not found in {args.extract_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark compositing of every merger in sprite_mergers.
+
+Point it at an extracted directory (e.g. Mods/Extracted) to merge the real
+sheets. Without one, every source sheet is replaced with the same noise
+image. Each merger is timed with every compositing mode and the outputs are
+checked to be identical. Nothing is saved.
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from modlunky2.sprites.base_classes.base_sprite_merger import Compositing
+from modlunky2.sprites.base_classes.sheet_cache import SHEET_CACHE
+from modlunky2.sprites.game_data import load_game_data
+from modlunky2.sprites.sprite_loaders import get_sprite_loader_factories
+from modlunky2.sprites.sprite_mergers import get_all_sprite_mergers
+
+NOISE_SHEET_SIZE = (2048, 2048)
+
+
+def use_noise_sheets(factories, base_path):
+    noise = Image.frombytes(
+        "RGBA",
+        NOISE_SHEET_SIZE,
+        os.urandom(NOISE_SHEET_SIZE[0] * NOISE_SHEET_SIZE[1] * 4),
+    )
+    # The same image is counted once per sheet, don't let any be evicted
+    SHEET_CACHE.max_bytes = 1 << 40
+    for loader_type, _ in factories:
+        # pylint: disable=protected-access
+        sheet_path = base_path / loader_type.__new__(loader_type)._sprite_sheet_path
+        sheet_path.parent.mkdir(parents=True, exist_ok=True)
+        # The file only needs to exist, the cached noise is what's used
+        Image.new("RGBA", (1, 1)).save(sheet_path)
+        SHEET_CACHE.put(sheet_path, noise)
+
+
+def time_merge(sprite_merger, sprite_loaders, compositing):
+    sprite_merger.compositing = compositing
+    start = time.perf_counter()
+    merged = sprite_merger.do_merge(sprite_loaders)
+    elapsed = time.perf_counter() - start
+    # pylint: disable=protected-access
+    return elapsed, (merged.tobytes(), sprite_merger._grid_image.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sprite merging.")
+    parser.add_argument(
+        "extract_dir",
+        type=Path,
+        nargs="?",
+        help="Directory assets were extracted to. Uses noise if not given.",
+    )
+    args = parser.parse_args()
+
+    entities_json, textures_json = load_game_data()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_path = args.extract_dir or Path(temp_dir)
+        factories = get_sprite_loader_factories(entities_json, textures_json, base_path)
+        if args.extract_dir is None:
+            use_noise_sheets(factories, base_path)
+        sprite_loaders = [factory() for _, factory in factories]
+        sprite_mergers = get_all_sprite_mergers(entities_json, textures_json, base_path)
+
+        totals = {compositing: 0.0 for compositing in Compositing}
+        mismatches = 0
+        for sprite_merger in sprite_mergers:
+            line = f"{sprite_merger.stem:<40}"
+            outputs = []
+            for compositing in Compositing:
+                elapsed, output = time_merge(sprite_merger, sprite_loaders, compositing)
+                totals[compositing] += elapsed
+                outputs.append(output)
+                line += f" {compositing.value} {elapsed:7.3f}s"
+            if any(output != outputs[0] for output in outputs):
+                mismatches += 1
+                line += " MISMATCH"
+            sprite_merger.release()
+            print(line)
+
+        for sprite_loader in sprite_loaders:
+            sprite_loader.close()
+
+    for compositing, total in totals.items():
+        print(f"Total {compositing.value}: {total:.3f}s")
+    print(f"{len(sprite_mergers)} mergers, {mismatches} mismatches")
+    print(f"Sheet cache: {SHEET_CACHE.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Time writing hashed strings files, one file at a time vs batched.
+
+Uses the .str files in an extracted directory if given, otherwise
+synthetic files shaped like the game's (one per language).
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from modlunky2.assets.string_hashing import StringHashes
+
+NUM_LANGUAGES = 10
+SYNTHETIC_SECTIONS = 400
+SYNTHETIC_LINES_PER_SECTION = 30
+
+
+def write_string_hashes_per_line(string_hashes, strings_data, hashed_strings_dest):
+    """The original writer: one encoded write per line."""
+    lines = strings_data.decode().splitlines()
+    if len(lines) != len(string_hashes.hashes):
+        logging.debug("Data for %s has %s lines, expected %s.")
+        return
+
+    with hashed_strings_dest.open("wb") as hashed_strings_file:
+        for line_num, line in enumerate(lines):
+            string_hash = string_hashes.hashes[line_num]
+            if string_hash is None:
+                output_line = line
+            else:
+                output_line = f"{string_hash}: {line}"
+            hashed_strings_file.write(f"{output_line}\n".encode())
+
+
+def synthetic_strings(language):
+    lines = []
+    for section in range(SYNTHETIC_SECTIONS):
+        lines.append(f"# Section {section}")
+        for line in range(SYNTHETIC_LINES_PER_SECTION):
+            lines.append(f"Language {language} string {section}.{line} " * 3)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def load_strings(extract_dir):
+    if extract_dir is None:
+        return [synthetic_strings(language) for language in range(NUM_LANGUAGES)]
+    return [
+        path.read_bytes() for path in sorted(extract_dir.glob("strings[0-9][0-9].str"))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hashed strings.")
+    parser.add_argument(
+        "extract_dir", type=Path, nargs="?", help="Directory assets were extracted to."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    all_strings = load_strings(args.extract_dir)
+    print(f"{len(all_strings)} language files")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dest_dir = Path(tmp_dir)
+        dests = [
+            dest_dir / f"strings{idx:02}_hashed.str" for idx in range(len(all_strings))
+        ]
+
+        best_per_file = best_batch = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            string_hashes = StringHashes.from_data(all_strings[0])
+            for strings_data, dest in zip(all_strings, dests):
+                write_string_hashes_per_line(string_hashes, strings_data, dest)
+            elapsed = time.perf_counter() - start
+            best_per_file = min(best_per_file or elapsed, elapsed)
+            expected = [dest.read_bytes() for dest in dests]
+
+            start = time.perf_counter()
+            string_hashes = StringHashes.from_data(all_strings[0])
+            string_hashes.write_all_string_hashes(zip(all_strings, dests))
+            elapsed = time.perf_counter() - start
+            best_batch = min(best_batch or elapsed, elapsed)
+            assert expected == [dest.read_bytes() for dest in dests]
+
+    print(f"per-line writes: {best_per_file:.3f}s")
+    print(f"batched:         {best_batch:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
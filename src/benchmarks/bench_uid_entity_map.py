@@ -0,0 +1,78 @@
+"""Benchmark UidEntityMap lookups, one at a time vs. get_many().
+
+The table and entities are synthetic, laid out by UidEntityMapSlabBuilder.
+Each lookup is of a batch of consecutive uids, like the entities spawned
+since the last poll. Reads of the wrapped memory are counted too, since
+each is a ReadProcessMemory call when reading the game.
+"""
+import argparse
+import time
+
+from modlunky2.mem.entities import EntityType
+from modlunky2.mem.memrauder.model import BytesReader, MemContext, MemoryReader
+from modlunky2.mem.testing import UidEntityMapSlabBuilder
+
+
+class CountingReader(MemoryReader):
+    def __init__(self, mem_reader: MemoryReader):
+        self.mem_reader = mem_reader
+        self.reads = 0
+
+    def read(self, addr, size):
+        self.reads += 1
+        return self.mem_reader.read(addr, size)
+
+
+def time_lookups(lookup, batches, seconds: float):
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for batch in batches:
+            lookup(batch)
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return elapsed / count / len(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark UidEntityMap lookups.")
+    parser.add_argument("--entities", type=int, default=4000)
+    parser.add_argument("--mask", type=lambda x: int(x, 0), default=0x1FFF)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    builder = UidEntityMapSlabBuilder(mask=args.mask)
+    entity_types = [EntityType.ITEM_ROCK, EntityType.ITEM_BOMB, EntityType.ITEM_ROPE]
+    for uid in range(args.entities):
+        builder.add_entity(uid, entity_types[uid % len(entity_types)])
+    slab = builder.build_slab()
+    batches = [
+        range(start, start + args.batch)
+        for start in range(0, args.entities, args.batch)
+    ]
+
+    for lazy in [False, True]:
+        reader = CountingReader(BytesReader(slab))
+        uid_map = builder.build_map(MemContext(reader, lazy=lazy))
+
+        def get_each(uids):
+            return [
+                uid_map.get(uid) for uid in uids
+            ]  # pylint: disable=cell-var-from-loop
+
+        mode = "lazy" if lazy else "eager"
+        for name, lookup in [("get", get_each), ("get_many", uid_map.get_many)]:
+            reader.reads = 0
+            lookup(batches[0])
+            reads = reader.reads
+            per_batch = time_lookups(lookup, batches, args.seconds)
+            print(
+                f"{mode:<5} {name:<8} {per_batch * 1e6:8.1f}us per batch of"
+                f" {args.batch}, {reads} reads"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,38 @@
 import hashlib
 import logging
+import mmap
 import os
 import sys
 import traceback
-import json
 from collections import defaultdict
 from concurrent.futures import wait
+from concurrent.futures.process import ProcessPoolExecutor
 from concurrent.futures.thread import ThreadPoolExecutor
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from struct import pack, unpack
+from struct import pack, unpack, unpack_from
+from typing import Dict, Optional
 
 import zstandard as zstd
 from PIL import Image
 
 from modlunky2.assets.constants import KNOWN_TEXTURES_V1
 from modlunky2.assets.exc import NonSiblingAsset
-from modlunky2.sprites.sprite_loaders import get_all_sprite_loaders
+from modlunky2.sprites.atlas_index import AtlasIndex
+from modlunky2.sprites.game_data import load_game_data
+from modlunky2.sprites.merge_scheduler import schedule_merges
 from modlunky2.sprites.sprite_mergers import get_all_sprite_mergers
-from modlunky2.constants import BASE_DIR
 
-from modlunky2.assets.chacha import Key, chacha, hash_filepath
+from modlunky2.assets.compression import CompressionSettings, compress, get_compressor
+from modlunky2.assets.chacha import (
+    Key,
+    chacha,
+    chacha_block_key,
+    hash_filepath,
+    xor_blocks,
+)
 from modlunky2.assets.constants import (
     BANK_ALIGNMENT,
     DDS_PNGS,
@@ -34,11 +45,219 @@ from modlunky2.assets.soundbank import extract_soundbank
 from modlunky2.assets.converters import dds_to_png, png_to_dds, rgba_to_png
 from modlunky2.assets.exc import FileConflict, MissingAsset, MultipleMatchingAssets
 from modlunky2.assets.string_hashing import StringHashes
-from modlunky2.assets.hashing import md5sum_path
+from modlunky2.assets.hashing import md5sum_path, stat_signature
+from modlunky2.assets.manifest import AssetFingerprint, ExtractManifest, ManifestEntry
 
 
 logger = logging.getLogger(__name__)
 
+# Number of leading filepath hash bytes used to key AssetStore's hash index.
+# Hashes shorter than this fall back to a linear scan.
+HASH_INDEX_PREFIX_LEN = 8
+
+# Bytes read from disk at a time when packing. Must be a multiple of the
+# 0x40 byte chacha block size so only the final chunk has a partial block.
+PACK_CHUNK_SIZE = 0x100000
+
+# Filepath hashes only depend on (filepath, key) so they're shared across
+# stores. Sized to hold every known filepath for a handful of keys.
+_cached_hash_filepath = lru_cache(maxsize=4 * 1024)(hash_filepath)
+
+
+class ExtractMode(Enum):
+    """How AssetStore.extract schedules the per-asset extraction work."""
+
+    SERIAL = 1
+    THREADED = 2
+    # Each worker process reads its own asset from the exe by offset/length
+    PROCESS = 3
+
+
+def extracted_path(extract_dir: Path, filepath: str) -> Path:
+    """Where the asset at `filepath` is written to when extracted."""
+    path = extract_dir / filepath
+    if filepath in DDS_PNGS:
+        path = path.with_suffix(".png")
+    return path
+
+
+@dataclass
+class ExtractResult:
+    # Whether the extracted file was written. False if it was already current.
+    written: bool
+    # Fingerprint of the payload, if it was asked for
+    fingerprint: Optional[AssetFingerprint] = None
+    # The decompressed (and converted) data, if it was written
+    data: Optional[bytes] = None
+
+
+def extract_asset_data(
+    filepath: str,
+    data,
+    is_encrypted: bool,
+    extract_dir: Path,
+    compressed_dir: Path,
+    key: Key,
+    compression_level=DEFAULT_COMPRESSION_LEVEL,
+    recompress=False,
+    fingerprint=False,
+    previous_entry: Optional[ManifestEntry] = None,
+) -> Optional[ExtractResult]:
+    """Decrypt, decompress and convert `data` then write it to `extract_dir`.
+
+    With `fingerprint`, the decrypted payload is fingerprinted, and nothing is
+    written if it and the extracted file match `previous_entry`.
+
+    Returns None if the data couldn't be decompressed.
+    """
+    out_filepath = extracted_path(extract_dir, filepath)
+
+    compressed_filepath = compressed_dir / f"{filepath}.zst"
+    md5sum_filepath = compressed_dir / f"{filepath}.md5sum"
+    stat_filepath = compressed_dir / f"{filepath}.stat"
+
+    if is_encrypted:
+        try:
+            # Decrypt
+            data = chacha(filepath.encode(), data, key)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed decryption")
+            return None
+
+    asset_fingerprint = None
+    if fingerprint:
+        asset_fingerprint = AssetFingerprint.from_payload(data)
+        if previous_entry is not None and previous_entry.is_current(
+            asset_fingerprint, out_filepath
+        ):
+            return ExtractResult(written=False, fingerprint=asset_fingerprint)
+
+    if is_encrypted:
+        try:
+            # Decompress
+            cctx = zstd.ZstdDecompressor()
+            data = cctx.decompress(data)
+
+            if recompress:
+                # Recompress at higher compression level to give
+                # better chance of assets fitting in binary
+                logger.info("Storing compressed asset %s...", compressed_filepath)
+                with compressed_filepath.open("wb") as compressed_file:
+                    compressed_data = get_compressor(compression_level).compress(data)
+                    compressed_file.write(compressed_data)
+
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed compression")
+            return None
+
+    if filepath in KNOWN_TEXTURES_V1:
+        data = rgba_to_png(data)
+    elif filepath in DDS_PNGS:
+        data = dds_to_png(data)
+
+    if recompress:
+        # Get a hash of the the uncompressed file to be used
+        # to detect if the source file changed
+        md5sum = hashlib.md5(data).hexdigest()
+        with md5sum_filepath.open("w") as md5sum_file:
+            md5sum_file.write(md5sum)
+
+    logger.info("Storing asset %s...", out_filepath)
+    with out_filepath.open("wb") as asset_file:
+        asset_file.write(data)
+
+    if recompress:
+        # Lets packing skip hashing the file until it's modified
+        with stat_filepath.open("wb") as stat_file:
+            stat_file.write(stat_signature(out_filepath))
+
+    return ExtractResult(written=True, fingerprint=asset_fingerprint, data=data)
+
+
+def _copy_file_to_handle(src_path: Path, dest_handle, count: int):
+    """Copy `count` bytes of `src_path` to the current position of `dest_handle`.
+
+    Uses copy_file_range/sendfile to copy in-kernel when they're available.
+    """
+    dest_handle.flush()
+    position = dest_handle.tell()
+    with src_path.open("rb") as src_file:
+        src_fd, dest_fd = src_file.fileno(), dest_handle.fileno()
+        copied = 0
+        try:
+            if hasattr(os, "copy_file_range"):
+                while copied < count:
+                    sent = os.copy_file_range(
+                        src_fd, dest_fd, count - copied, copied, position + copied
+                    )
+                    if sent == 0:
+                        break
+                    copied += sent
+            elif hasattr(os, "sendfile"):
+                os.lseek(dest_fd, position, os.SEEK_SET)
+                while copied < count:
+                    sent = os.sendfile(dest_fd, src_fd, copied, count - copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+        except OSError:
+            # Not supported between these files, fall back to a buffered copy.
+            pass
+
+        dest_handle.seek(position + copied)
+        src_file.seek(copied)
+        while copied < count:
+            chunk = src_file.read(min(PACK_CHUNK_SIZE, count - copied))
+            if not chunk:
+                break
+            dest_handle.write(chunk)
+            copied += len(chunk)
+
+    if copied != count:
+        raise RuntimeError(f"Copied {copied} bytes of {src_path}, expected {count}")
+
+
+def _encrypt_file_to_handle(src_path: Path, dest_handle, filepath: bytes, key, count):
+    """Encrypt `count` bytes of `src_path` into `dest_handle` a chunk at a time."""
+    block_key = chacha_block_key(filepath, count, key)
+    written = 0
+    with src_path.open("rb") as src_file:
+        while written < count:
+            chunk = src_file.read(min(PACK_CHUNK_SIZE, count - written))
+            if not chunk:
+                break
+            dest_handle.write(xor_blocks(chunk, block_key))
+            written += len(chunk)
+
+    if written != count:
+        raise RuntimeError(f"Read {written} bytes of {src_path}, expected {count}")
+
+
+def _extract_from_exe(
+    exe_path,
+    filepath,
+    asset_offset,
+    asset_len,
+    is_encrypted,
+    *args,
+):
+    """Process pool entry point. Reads the asset itself instead of receiving it.
+
+    Returns the result without its data, or a formatted traceback on failure
+    so the parent can log it.
+    """
+    try:
+        with open(exe_path, "rb") as exe_handle:
+            exe_handle.seek(asset_offset)
+            data = exe_handle.read(asset_len)
+        result = extract_asset_data(filepath, data, is_encrypted, *args)
+        if result is None:
+            return None, "Failed to decompress"
+    except Exception:  # pylint: disable=broad-except
+        return None, "".join(traceback.format_exception(*sys.exc_info())).strip()
+    # The parent doesn't need the data, so don't send it back
+    return replace(result, data=None), None
+
 
 @dataclass
 class ExeAssetBlock:
@@ -111,6 +330,32 @@ class ExeAssetBlock:
             asset_len=asset_len,
         )
 
+    @classmethod
+    def from_buffer(cls, buffer, offset):
+        """Like `from_exe_handle` but parses the block at `offset` of `buffer`.
+
+        Returns None if there is no more assets as the current offset.
+        """
+        data_len, filepath_len = unpack_from(b"<II", buffer, offset)
+
+        if (data_len, filepath_len) == (0, 0):
+            return None
+
+        if data_len <= 0:
+            raise RuntimeError(f"Expected data length > 0, found {data_len}")
+
+        hash_offset = offset + 8
+        asset_offset = hash_offset + filepath_len + 1
+
+        return ExeAssetBlock(
+            offset=offset,
+            filepath_len=filepath_len,
+            filepath_hash=bytes(buffer[hash_offset : hash_offset + filepath_len]),
+            is_encrypted=buffer[hash_offset + filepath_len] == 1,
+            asset_offset=asset_offset,
+            asset_len=data_len - 1,
+        )
+
     def read_data(self, exe_handle):
         exe_handle.seek(self.asset_offset)
         return exe_handle.read(self.asset_len)
@@ -143,6 +388,16 @@ class ExeAsset:
         handle.seek(self.asset_block.asset_offset)
         self.data = handle.read(self.asset_block.asset_len)
 
+    def load_view(self, buffer):
+        """Like `load_data` but references the asset in `buffer` without copying."""
+        start = self.asset_block.asset_offset
+        self.data = memoryview(buffer)[start : start + self.asset_block.asset_len]
+
+    def release_data(self):
+        if isinstance(self.data, memoryview):
+            self.data.release()
+        self.data = None
+
     def extract(
         self,
         extract_dir: Path,
@@ -150,58 +405,31 @@ class ExeAsset:
         key: Key,
         compression_level=DEFAULT_COMPRESSION_LEVEL,
         recompress=False,
-    ):
+        fingerprint=False,
+        previous_entry: Optional[ManifestEntry] = None,
+    ) -> Optional[ExtractResult]:
+        """Extract the loaded data. Returns None if it failed."""
         if not self.filepath:
             raise RuntimeError("Asset doesn't have filepath.")
 
         if self.data is None:
             raise RuntimeError("load_data hasn't been called.")
 
-        filepath = extract_dir / self.filepath
-
-        compressed_filepath = compressed_dir / f"{self.filepath}.zst"
-        md5sum_filepath = compressed_dir / f"{self.filepath}.md5sum"
-
-        if self.asset_block.is_encrypted:
-            try:
-                # Decrypt
-                self.data = chacha(self.filepath.encode(), self.data, key)
-
-                # Decompress
-                cctx = zstd.ZstdDecompressor()
-                self.data = cctx.decompress(self.data)
-
-                if recompress:
-                    # Recompress at higher compression level to give
-                    # better chance of assets fitting in binary
-                    logger.info("Storing compressed asset %s...", compressed_filepath)
-                    with compressed_filepath.open("wb") as compressed_file:
-                        cctx = zstd.ZstdCompressor(level=compression_level)
-                        compressed_data = cctx.compress(self.data)
-                        compressed_file.write(compressed_data)
-
-            except Exception:  # pylint: disable=broad-except
-                logger.exception("Failed compression")
-                return
-
-        if self.filepath in KNOWN_TEXTURES_V1:
-            self.data = rgba_to_png(self.data)
-        elif self.filepath in DDS_PNGS:
-            self.data = dds_to_png(self.data)
-
-        if recompress:
-            # Get a hash of the the uncompressed file to be used
-            # to detect if the source file changed
-            md5sum = hashlib.md5(self.data).hexdigest()
-            with md5sum_filepath.open("w") as md5sum_file:
-                md5sum_file.write(md5sum)
-
-        logger.info("Storing asset %s...", filepath)
-        if self.filepath in DDS_PNGS:
-            filepath = filepath.with_suffix(".png")
-
-        with filepath.open("wb") as asset_file:
-            asset_file.write(self.data)
+        result = extract_asset_data(
+            self.filepath,
+            self.data,
+            self.asset_block.is_encrypted,
+            extract_dir,
+            compressed_dir,
+            key,
+            compression_level,
+            recompress,
+            fingerprint,
+            previous_entry,
+        )
+        if result is not None and result.written:
+            self.data = result.data
+        return result
 
 
 class AssetStore:
@@ -212,8 +440,13 @@ class AssetStore:
     def __init__(self, exe_handle):
         self.assets = []
         self.exe_handle = exe_handle
+        # Read-only map of the exe when loaded with `use_mmap`
+        self.exe_map = None
         self.total_size = 0
         self._key = Key()
+        # Assets by the prefix of their filepath hash, built on demand.
+        self._hash_index = None
+        self._short_hash_assets = None
 
     @property
     def key(self):
@@ -223,29 +456,89 @@ class AssetStore:
         self._key.update(size)
 
     @classmethod
-    def load_from_file(cls, exe_handle):
-        asset_store = cls(exe_handle)
-        asset_store.exe_handle.seek(cls.BUNDLE_OFFSET)
+    def load_from_file(cls, exe_handle, use_mmap=False, hash_cache=None):
+        """Read the asset blocks from `exe_handle`.
 
-        while True:
-            asset_block = ExeAssetBlock.from_exe_handle(exe_handle)
+        With `use_mmap` the exe is mapped read-only and extraction reads
+        assets as zero-copy views of the map. Call `close` when done.
 
-            if asset_block is None:
-                # We've reached the end of the asset blocks.
-                break
+        `hash_cache` is an optional FilepathHashCache used to skip hashing
+        the known filepaths when this bundle's key has been seen before.
+        """
+        asset_store = cls(exe_handle)
+
+        if use_mmap:
+            asset_store.exe_map = mmap.mmap(
+                exe_handle.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            asset_blocks = asset_store._iter_blocks_from_buffer(asset_store.exe_map)
+        else:
+            asset_store.exe_handle.seek(cls.BUNDLE_OFFSET)
+            asset_blocks = iter(lambda: ExeAssetBlock.from_exe_handle(exe_handle), None)
 
+        for asset_block in asset_blocks:
             asset_store.update_key(asset_block.data_len)
             asset_store.total_size += asset_block.total_size
             asset_store.assets.append(ExeAsset(asset_block, None))
 
-        asset_store.populate_asset_filepaths()
+        asset_store.populate_asset_filepaths(hash_cache)
         return asset_store
 
+    @classmethod
+    def _iter_blocks_from_buffer(cls, buffer):
+        offset = cls.BUNDLE_OFFSET
+        while True:
+            asset_block = ExeAssetBlock.from_buffer(buffer, offset)
+            if asset_block is None:
+                # We've reached the end of the asset blocks.
+                return
+            yield asset_block
+            offset = asset_block.asset_offset + asset_block.asset_len
+
+    def close(self):
+        """Release the exe map, if any. Asset data views must be released first."""
+        if self.exe_map is None:
+            return
+        for asset in self.assets:
+            if isinstance(asset.data, memoryview):
+                asset.release_data()
+        self.exe_map.close()
+        self.exe_map = None
+
+    def _build_hash_index(self):
+        hash_index = defaultdict(list)
+        short_hash_assets = []
+        for position, asset in enumerate(self.assets):
+            filepath_hash = asset.asset_block.filepath_hash
+            if len(filepath_hash) < HASH_INDEX_PREFIX_LEN:
+                short_hash_assets.append((position, asset))
+                continue
+            hash_index[filepath_hash[:HASH_INDEX_PREFIX_LEN]].append((position, asset))
+        self._hash_index = hash_index
+        self._short_hash_assets = short_hash_assets
+
+    def _candidate_assets(self, filepath_hash):
+        """Assets which could match `filepath_hash`, in bundle order."""
+        if len(filepath_hash) < HASH_INDEX_PREFIX_LEN:
+            return self.assets
+
+        if self._hash_index is None:
+            self._build_hash_index()
+
+        candidates = self._hash_index.get(filepath_hash[:HASH_INDEX_PREFIX_LEN], [])
+        if self._short_hash_assets:
+            candidates = sorted(
+                candidates + self._short_hash_assets, key=lambda item: item[0]
+            )
+        return [asset for _, asset in candidates]
+
     def find_asset(self, filepath):
         if filepath is None:
             return None
-        filepath_hash = self.hash_filepath(filepath)
-        for asset in self.assets:
+        return self.find_asset_by_hash(self.hash_filepath(filepath))
+
+    def find_asset_by_hash(self, filepath_hash):
+        for asset in self._candidate_assets(filepath_hash):
             if asset.match_hash(filepath_hash):
                 return asset
         return None
@@ -257,34 +550,43 @@ class AssetStore:
         if not isinstance(filepath, bytes):
             filepath = filepath.encode()
 
-        return hash_filepath(filepath, self.key)
+        return _cached_hash_filepath(filepath, self.key)
+
+    def populate_asset_filepaths(self, hash_cache=None):
+        filepath_hashes = None
+        if hash_cache is not None:
+            filepath_hashes = hash_cache.get(self.key)
+
+        if filepath_hashes is None:
+            filepath_hashes = {
+                filepath: self.hash_filepath(filepath) for filepath in KNOWN_FILEPATHS
+            }
+            if hash_cache is not None:
+                hash_cache.put(self.key, filepath_hashes)
 
-    def populate_asset_filepaths(self):
         for filepath in KNOWN_FILEPATHS:
-            asset = self.find_asset(filepath)
+            filepath_hash = filepath_hashes.get(filepath)
+            if filepath_hash is None:
+                filepath_hash = self.hash_filepath(filepath)
+            asset = self.find_asset_by_hash(filepath_hash)
             if asset is None:
                 continue
             asset.filepath = filepath
 
     @staticmethod
-    def _extract_single(asset, *args, **kwargs):
+    def _extract_single(asset, *args, exe_map=None, **kwargs):
         try:
+            if exe_map is not None:
+                # Views are cheap so they're only created once work starts
+                asset.load_view(exe_map)
             logger.info("Extracting %s... ", asset.filepath)
-            asset.extract(*args, **kwargs)
+            return asset.extract(*args, **kwargs)
         except Exception:  # pylint: disable=broad-except
             logger.exception("Failed Extraction")
-
-    @staticmethod
-    def _merge_single_entity(sprite_merger, sprite_loaders):
-        try:
-            sprite_merger.do_merge(sprite_loaders)
-            sprite_merger.save()
-        except Exception:  # pylint: disable=broad-except
-            logger.critical(
-                "Failed to merge sprite for %s: %s",
-                sprite_merger.stem,
-                "".join(traceback.format_exception(*sys.exc_info())).strip(),
-            )
+            return None
+        finally:
+            # Anything still needed afterwards is read back from extract_dir
+            asset.release_data()
 
     def extract(
         self,
@@ -297,33 +599,76 @@ class AssetStore:
         create_entity_sheets=True,
         extract_sound_extensions=None,
         reuse_extracted=False,
+        extract_mode=ExtractMode.THREADED,
+        incremental=False,
     ):
+        """Extract the known assets to `extract_dir`.
+
+        With `incremental`, only assets whose payload changed since the last
+        extraction (or whose extracted file was modified) are extracted, and
+        only the sprite sheets merged from changed sheets are recreated.
+        """
         unextracted = []
+        # Extracted paths of the assets that changed. None means all of them.
+        changed_paths = None
 
         if not reuse_extracted:
-            for asset in self.assets:
-                if asset.filepath is None:
-                    # No known filepaths matched this asset.
-                    unextracted.append(asset)
-                    continue
+            # No known filepaths matched these assets.
+            unextracted = [asset for asset in self.assets if asset.filepath is None]
+
+            settings = {
+                "recompress": recompress,
+                "compression-level": compression_level if recompress else None,
+            }
+            manifest_path = compressed_dir / ExtractManifest.FILENAME
+            previous_entries = {}
+            if incremental:
+                previous_entries = ExtractManifest.load(manifest_path, settings).entries
+
+            assets = [asset for asset in self.assets if asset.filepath is not None]
+            # Workers fingerprint the payload they decrypt anyway, and skip
+            # writing assets that match the previous extraction.
+            extract_args = (
+                extract_dir,
+                compressed_dir,
+                self.key,
+                compression_level,
+                recompress,
+                incremental,
+            )
+            if extract_mode == ExtractMode.PROCESS:
+                results = self._extract_processes(
+                    max_workers, assets, previous_entries, *extract_args
+                )
+            else:
+                results = self._extract_in_process(
+                    extract_mode, max_workers, assets, previous_entries, *extract_args
+                )
 
-                asset.load_data(self.exe_handle)
+            if previous_entries:
+                changed_paths = {
+                    extracted_path(extract_dir, asset.filepath)
+                    for asset, result in results.items()
+                    if result.written
+                }
+                logger.info(
+                    "%s of %s assets changed since the last extraction",
+                    len(changed_paths),
+                    len(assets),
+                )
 
-            with ThreadPoolExecutor(max_workers=max_workers) as pool:
-                futures = [
-                    pool.submit(
-                        self._extract_single,
-                        asset,
-                        extract_dir,
-                        compressed_dir,
-                        self.key,
-                        compression_level,
-                        recompress,
+            if incremental:
+                manifest = ExtractManifest(settings)
+                for asset, result in results.items():
+                    manifest.record(
+                        asset.filepath,
+                        result.fingerprint,
+                        extracted_path(extract_dir, asset.filepath),
                     )
-                    for asset in self.assets
-                    if asset.filepath
-                ]
-                wait(futures, timeout=300)
+                try:
+                    manifest.save(manifest_path)
+                except OSError:
+                    logger.warning("Failed to write extract manifest %s", manifest_path)
 
         if generate_string_hashes:
             self.hash_strings(extract_dir)
@@ -331,35 +676,34 @@ class AssetStore:
         if create_entity_sheets:
             logger.info("Creating entity sprite sheets...")
 
-            with open(
-                BASE_DIR / "static/game_data/entities.json", encoding="utf-8"
-            ) as entities_file:
-                entities_json = json.loads(entities_file.read())
-            with open(
-                BASE_DIR / "static/game_data/textures.json", encoding="utf-8"
-            ) as textures_file:
-                textures_json = json.loads(textures_file.read())
-
-            sprite_loaders = get_all_sprite_loaders(
-                entities_json, textures_json, extract_dir
-            )
+            entities_json, textures_json = load_game_data()
             sprite_mergers = get_all_sprite_mergers(
                 entities_json, textures_json, extract_dir
             )
-
-            with ThreadPoolExecutor(max_workers=max_workers) as pool:
-                futures = [
-                    pool.submit(
-                        self._merge_single_entity,
-                        sprite_merger,
-                        sprite_loaders,
-                    )
+            if changed_paths is not None:
+                sprite_mergers = [
+                    sprite_merger
                     for sprite_merger in sprite_mergers
+                    if not sprite_merger.target_path.exists()
+                    or any(
+                        extract_dir / path in changed_paths
+                        for path in sprite_merger.source_sheet_paths
+                    )
                 ]
-                wait(futures, timeout=300)
+
+            # Source sheets are only opened by the workers that need them
+            schedule_merges(
+                extract_dir, sprite_mergers, entities_json, textures_json, max_workers
+            )
 
             logger.info("Done creating entity sprite sheets...")
 
+            # So the level editor doesn't have to work out where every sprite is
+            try:
+                AtlasIndex.load_or_build(extract_dir)
+            except OSError:
+                logger.warning("Failed to index the sprite sheets in %s", extract_dir)
+
         if extract_sound_extensions:
             extract_soundbank(
                 extract_dir / "soundbank.bank",
@@ -369,16 +713,90 @@ class AssetStore:
 
         return unextracted
 
+    def _extract_in_process(
+        self, extract_mode, max_workers, assets, previous_entries, *extract_args
+    ) -> Dict[ExeAsset, ExtractResult]:
+        """Extract `assets` in this process. Returns the successful results."""
+        if self.exe_map is None:
+            for asset in assets:
+                asset.load_data(self.exe_handle)
+
+        def extract_single(asset):
+            return self._extract_single(
+                asset,
+                *extract_args,
+                previous_entry=previous_entries.get(asset.filepath),
+                exe_map=self.exe_map,
+            )
+
+        if extract_mode == ExtractMode.SERIAL:
+            results = {asset: extract_single(asset) for asset in assets}
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    pool.submit(extract_single, asset): asset for asset in assets
+                }
+                done, _ = wait(futures, timeout=300)
+            results = {futures[future]: future.result() for future in done}
+        return {asset: result for asset, result in results.items() if result}
+
+    def _extract_processes(
+        self, max_workers, assets, previous_entries, *extract_args
+    ) -> Dict[ExeAsset, ExtractResult]:
+        """Extract `assets` in worker processes. Returns the successful results."""
+        exe_path = self.exe_handle.name
+        results = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(
+                    _extract_from_exe,
+                    exe_path,
+                    asset.filepath,
+                    asset.asset_block.asset_offset,
+                    asset.asset_block.asset_len,
+                    asset.asset_block.is_encrypted,
+                    *extract_args,
+                    previous_entries.get(asset.filepath),
+                ): asset
+                for asset in assets
+            }
+            logger.info("Extracting %s assets in worker processes...", len(futures))
+            done, _ = wait(futures, timeout=300)
+            for future in done:
+                result, error = future.result()
+                if error is not None:
+                    logger.critical(
+                        "Failed Extraction of %s: %s", futures[future].filepath, error
+                    )
+                    continue
+                results[futures[future]] = result
+        return results
+
+    def _read_extracted_data(self, asset, extract_dir):
+        """Data of an extracted asset, from memory if present otherwise from disk."""
+        if asset.data is not None:
+            return asset.data
+
+        path = extract_dir / asset.filepath
+        if not path.exists():
+            return None
+        with path.open("rb") as extracted_file:
+            return extracted_file.read()
+
     def hash_strings(self, extract_dir):
         # Use the english strings as the source for generating hash values.
         english_strings = self.find_asset("strings00.str")
-        if english_strings is None or english_strings.data is None:
+        english_data = None
+        if english_strings is not None:
+            english_data = self._read_extracted_data(english_strings, extract_dir)
+        if english_data is None:
             logging.warning("Didn't find data for english strings in strings00.str")
             return
 
-        string_hashes = StringHashes.from_data(english_strings.data)
+        string_hashes = StringHashes.from_data(english_data)
 
         # Create the hashed string files separately since they all depend on strings00.str
+        strings = []
         for asset in self.assets:
             if asset.filepath and asset.filepath.endswith(".str"):
                 asset_file_path = Path(asset.filepath)
@@ -387,21 +805,26 @@ class AssetStore:
                     / asset_file_path.parent
                     / f"{asset_file_path.stem}_hashed{asset_file_path.suffix}"
                 )
-                string_hashes.write_string_hashes(asset.data, hashed_strings_file)
+                strings_data = self._read_extracted_data(asset, extract_dir)
+                if strings_data is None:
+                    continue
+                strings.append((strings_data, hashed_strings_file))
+        string_hashes.write_all_string_hashes(strings)
+
+    def pack_assets(self, streaming=True):
+        """Write the assets' disk data into the exe.
 
-    def pack_assets(self):
+        By default each asset is streamed from disk in fixed-size chunks. With
+        `streaming=False` each asset is read and encrypted whole.
+        """
         self.exe_handle.seek(self.BUNDLE_OFFSET)
 
         for asset in self.assets:
             if asset.filepath is None:
                 continue
 
-            assert asset.asset_block.asset_len == asset.disk_asset.get_asset_len()
-            data = asset.disk_asset.get_asset_data()
-
-            if asset.asset_block.is_encrypted:
-                logger.info("Encrypting file %s", asset.disk_asset.asset_path)
-                data = chacha(asset.filepath.encode(), data, self.key)
+            asset_len = asset.disk_asset.get_asset_len()
+            assert asset.asset_block.asset_len == asset_len
 
             logger.info("Packing file %s", asset.disk_asset.asset_path)
             self.exe_handle.write(
@@ -409,10 +832,29 @@ class AssetStore:
             )
             self.exe_handle.write(asset.asset_block.filepath_hash)
             self.exe_handle.write(pack("<b", asset.asset_block.is_encrypted))
+
+            if streaming:
+                self._stream_asset(asset, asset_len)
+                continue
+
+            data = asset.disk_asset.get_asset_data()
+            if asset.asset_block.is_encrypted:
+                logger.info("Encrypting file %s", asset.disk_asset.asset_path)
+                data = chacha(asset.filepath.encode(), data, self.key)
             self.exe_handle.write(data)
 
         self.exe_handle.write(pack("<II", 0, 0))
 
+    def _stream_asset(self, asset, asset_len):
+        data_path = asset.disk_asset.get_asset_data_path()
+        if asset.asset_block.is_encrypted:
+            logger.info("Encrypting file %s", asset.disk_asset.asset_path)
+            _encrypt_file_to_handle(
+                data_path, self.exe_handle, asset.filepath.encode(), self.key, asset_len
+            )
+        else:
+            _copy_file_to_handle(data_path, self.exe_handle, asset_len)
+
     def recalculate_key(self):
         """Recalculate the key from the current assets."""
         new_key = Key()
@@ -423,6 +865,7 @@ class AssetStore:
         self._key = new_key
 
     def update_filepath_hashes(self):
+        self._hash_index = None
         for asset in self.assets:
             if asset.filepath is None:
                 continue
@@ -436,14 +879,23 @@ class AssetStore:
         fallback_dir,
         compressed_dir,
         compression_level=DEFAULT_COMPRESSION_LEVEL,
+        streaming=True,
+        compression=None,
     ):
+        """Pack the assets found in the dirs into the exe.
+
+        `compression` is a CompressionSettings to use instead of just
+        `compression_level`, e.g. to fit assets to their original size.
+        """
         disk_bundle = DiskBundle.from_dirs(
             self.assets,
             search_dirs,
             fallback_dir,
             compressed_dir,
         )
-        disk_bundle.compress_if_needed(compression_level=compression_level)
+        disk_bundle.compress_if_needed(
+            compression_level=compression_level, compression=compression
+        )
 
         offset = self.BUNDLE_OFFSET
         for asset in self.assets:
@@ -476,7 +928,7 @@ class AssetStore:
 
         self.recalculate_key()
         self.update_filepath_hashes()
-        self.pack_assets()
+        self.pack_assets(streaming=streaming)
 
 
 class ResolutionPolicy(Enum):
@@ -583,14 +1035,18 @@ class DiskBundle:
         self,
         compression_level=DEFAULT_COMPRESSION_LEVEL,
         max_workers=max(os.cpu_count() - 2, 1),
+        compression=None,
     ):
         with ThreadPoolExecutor(max_workers=max_workers) as pool:
             futures = [
-                pool.submit(disk_asset.compress, compression_level)
+                pool.submit(
+                    disk_asset.compress_if_needed, compression_level, compression
+                )
                 for disk_asset in self.disk_assets.values()
-                if disk_asset.needs_compression()
             ]
-            wait(futures, timeout=300)
+            # Raises if an asset failed to compress
+            for future in futures:
+                future.result()
 
 
 @dataclass
@@ -642,6 +1098,23 @@ class DiskAsset:
             / f"{self.rel_asset_path.with_suffix(self.real_suffix)}.md5sum"
         )
 
+    @property
+    def stat_path(self):
+        return (
+            self.compressed_dir
+            / f"{self.rel_asset_path.with_suffix(self.real_suffix)}.stat"
+        )
+
+    def _stat_unchanged(self, signature):
+        if not self.stat_path.exists():
+            return False
+        with self.stat_path.open("rb") as stat_file:
+            return stat_file.read().strip() == signature
+
+    def _write_stat(self, signature):
+        with self.stat_path.open("wb") as stat_file:
+            stat_file.write(signature)
+
     def needs_compression(self):
         if not self.exe_asset.asset_block.is_encrypted:
             return False
@@ -652,15 +1125,30 @@ class DiskAsset:
         if not self.compressed_path.exists():
             return True
 
+        # Taken before hashing so a write during hashing isn't missed next time
+        signature = stat_signature(self.asset_path)
+        if self._stat_unchanged(signature):
+            return False
+
         md5sum = self.md5sum_of_asset()
         with self.md5sum_path.open("rb") as md5sum_file:
             stored_md5sum = md5sum_file.read().strip()
         if md5sum != stored_md5sum:
             return True
 
+        self._write_stat(signature)
         return False
 
-    def compress(self, compression_level=DEFAULT_COMPRESSION_LEVEL):
+    def compress_if_needed(
+        self, compression_level=DEFAULT_COMPRESSION_LEVEL, compression=None
+    ):
+        if self.needs_compression():
+            self.compress(compression_level, compression)
+
+    def compress(self, compression_level=DEFAULT_COMPRESSION_LEVEL, compression=None):
+        if compression is None:
+            compression = CompressionSettings(level=compression_level)
+
         if not self.exe_asset.asset_block.is_encrypted:
             return
 
@@ -675,28 +1163,27 @@ class DiskAsset:
             with open(self.asset_path, "rb") as asset_file:
                 data = asset_file.read()
 
+        signature = stat_signature(self.asset_path)
         md5sum = self.md5sum_of_asset()
         with self.md5sum_path.open("wb") as md5sum_file:
             md5sum_file.write(md5sum)
 
         logger.info("Compressing %s...", self.asset_path)
-        cctx = zstd.ZstdCompressor(level=compression_level)
-        data = cctx.compress(data)
+        # The exe_asset still has the size from the original exe
+        data = compress(data, compression, budget=self.exe_asset.asset_block.asset_len)
         with open(self.compressed_path, "wb") as compressed_file:
             compressed_file.write(data)
+        self._write_stat(signature)
 
-    def get_asset_len(self):
+    def get_asset_data_path(self):
+        """Path of the data packed into the exe for this asset."""
         if self.exe_asset.asset_block.is_encrypted:
-            path = self.compressed_path
-        else:
-            path = self.asset_path
-        return path.stat().st_size
+            return self.compressed_path
+        return self.asset_path
 
-    def get_asset_data(self):
-        if self.exe_asset.asset_block.is_encrypted:
-            path = self.compressed_path
-        else:
-            path = self.asset_path
+    def get_asset_len(self):
+        return self.get_asset_data_path().stat().st_size
 
-        with path.open("rb") as file_:
+    def get_asset_data(self):
+        with self.get_asset_data_path().open("rb") as file_:
             return file_.read()
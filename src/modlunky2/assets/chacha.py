@@ -4,6 +4,10 @@ from struct import pack, unpack
 
 DEFAULT_COMPRESSION_LEVEL = 20
 
+# Number of bytes XOR'd against the keystream at a time. Must be a multiple
+# of the 0x40 byte block size.
+XOR_CHUNK_SIZE = 0x10000
+
 
 def rotate_left(a, b, bits=32):
     a &= (1 << bits) - 1
@@ -173,10 +177,7 @@ def mix_in_filepath(filepath, h):
     return h
 
 
-def chacha_rest(data, key):
-    # NOTE: This appears to be an implementation mistake on the Spelunky 2 dev's part
-    # They generate a quad_round advanced version of (nonce'd key), but then they
-    # xor with the untweaked key instead of the tweaked key...
+def _chacha_rest_reference(data, key):
     out = b""
     if len(data) >= 0x40:
         blocks = len(data) // 0x40
@@ -188,19 +189,61 @@ def chacha_rest(data, key):
     return out
 
 
-def chacha_v1(filepath, data):
+def xor_blocks(data, key, chunk_size=XOR_CHUNK_SIZE):
+    """XOR `data` against the reversed 0x40 byte `key` repeated per block.
+
+    Works on any bytes-like object (including memoryview slices) and XORs
+    `chunk_size` bytes at a time as a single integer instead of byte by byte.
+    """
+    data = memoryview(data).cast("B")
+    blocks_len = len(data) - len(data) % 0x40
+    out = []
+
+    if blocks_len:
+        chunk_size = min(chunk_size, blocks_len)
+        keystream = int.from_bytes(key[::-1] * (chunk_size // 0x40), "little")
+        for start in range(0, blocks_len, chunk_size):
+            chunk = data[start : min(start + chunk_size, blocks_len)]
+            chunk_keystream = keystream
+            if len(chunk) < chunk_size:
+                chunk_keystream &= (1 << (8 * len(chunk))) - 1
+            out.append(
+                (int.from_bytes(chunk, "little") ^ chunk_keystream).to_bytes(
+                    len(chunk), "little"
+                )
+            )
+
+    # Trailing partial block uses the head of the key, reversed.
+    rest = data[blocks_len:]
+    if rest:
+        tail_key = int.from_bytes(key[: len(rest)][::-1], "little")
+        out.append(
+            (int.from_bytes(rest, "little") ^ tail_key).to_bytes(len(rest), "little")
+        )
+
+    return b"".join(out)
+
+
+def chacha_rest(data, key, reference=False):
+    # NOTE: This appears to be an implementation mistake on the Spelunky 2 dev's part
+    # They generate a quad_round advanced version of (nonce'd key), but then they
+    # xor with the untweaked key instead of the tweaked key...
+    if reference:
+        return _chacha_rest_reference(bytes(data), key)
+    return xor_blocks(data, key)
+
+
+def chacha_block_key_v1(filepath):
     # Untweaked key begins as half-advanced "0xBABE"
     h = two_rounds(pack(b"<QQQQQQQQ", 0xBABE, 0, 0, 0, 0, 0, 0, 0))
 
     h = mix_in_filepath(filepath, h)
 
     # Add the tweaked key and its advancement, then advance by four round pairs.
-    key = quad_rounds(add_qwords(h, quad_rounds(h)))
-
-    return chacha_rest(data, key)
+    return quad_rounds(add_qwords(h, quad_rounds(h)))
 
 
-def chacha_v2(filepath, data, key):
+def chacha_block_key_v2(filepath, key, data_len):
     # Untweaked key begins as half-advanced `key`
     h = two_rounds(pack(b"<QQQQQQQQ", key, len(filepath), 0, 0, 0, 0, 0, 0))
 
@@ -209,16 +252,42 @@ def chacha_v2(filepath, data, key):
     # Add the tweaked key and its advancement, then advance by four round pairs.
     tmp = add_qwords(h, quad_rounds(h))
     tmp = s_to_q(tmp)
-    key = quad_rounds(q_to_s([tmp[0] ^ key + len(data)] + tmp[1:]))
+    return quad_rounds(q_to_s([tmp[0] ^ key + data_len] + tmp[1:]))
+
+
+def chacha_block_key(filepath, data_len, key=None, version="v2"):
+    """The 0x40 byte key `chacha` XORs `data_len` bytes of data against.
+
+    Useful for encrypting a stream in chunks with `xor_blocks`. Every chunk
+    but the last must be a multiple of 0x40 bytes.
+    """
+    if version == "v1":
+        return chacha_block_key_v1(filepath)
+
+    if version == "v2":
+        return chacha_block_key_v2(filepath, key, data_len)
+
+    raise ValueError("Invalid version provided.")
+
+
+def chacha_v1(filepath, data, reference=False):
+    return chacha_rest(data, chacha_block_key_v1(filepath), reference)
+
+
+def chacha_v2(filepath, data, key, reference=False):
+    return chacha_rest(data, chacha_block_key_v2(filepath, key, len(data)), reference)
 
-    return chacha_rest(data, key)
 
+def chacha(filepath, data, key=None, version="v2", reference=False):
+    """Encrypt or decrypt `data` for the asset at `filepath`.
 
-def chacha(filepath, data, key=None, version="v2"):
+    `reference` selects the original byte-at-a-time implementation which is
+    kept around to verify the block-wise XOR engine against.
+    """
     if version == "v1":
-        return chacha_v1(filepath, data)
+        return chacha_v1(filepath, data, reference)
 
     if version == "v2":
-        return chacha_v2(filepath, data, key)
+        return chacha_v2(filepath, data, key, reference)
 
     raise ValueError("Invalid version provided.")
@@ -0,0 +1,79 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import zstandard as zstd
+
+from modlunky2.assets.constants import DEFAULT_COMPRESSION_LEVEL
+
+MAX_COMPRESSION_LEVEL = 22
+
+# Inputs smaller than this are always compressed on the calling thread.
+# Spinning up zstd's workers costs more than it saves for small assets.
+THREADED_MIN_SIZE = 4 << 20
+
+_thread_local = threading.local()
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    """How assets are compressed before being packed into the exe.
+
+    These are plain values so they can be handed to worker processes.
+    """
+
+    level: int = DEFAULT_COMPRESSION_LEVEL
+
+    # Number of zstd worker threads used for inputs of at least
+    # THREADED_MIN_SIZE bytes. 0 compresses on the calling thread.
+    threads: int = 0
+
+    # When a budget is given, compress at `level` and only retry at the
+    # higher `budget_levels` if the result doesn't fit.
+    fit_to_budget: bool = False
+    budget_levels: Tuple[int, ...] = (DEFAULT_COMPRESSION_LEVEL, MAX_COMPRESSION_LEVEL)
+
+
+def get_compressor(level: int, threads: int = 0) -> zstd.ZstdCompressor:
+    """A compressor for the calling thread, reused across calls.
+
+    ZstdCompressor isn't safe to share between threads, but creating one
+    (and its context) for every asset is wasted work.
+    """
+    compressors = getattr(_thread_local, "compressors", None)
+    if compressors is None:
+        compressors = _thread_local.compressors = {}
+
+    key = (level, threads)
+    cctx = compressors.get(key)
+    if cctx is None:
+        cctx = compressors[key] = zstd.ZstdCompressor(level=level, threads=threads)
+    return cctx
+
+
+def compress(
+    data, settings: Optional[CompressionSettings] = None, budget: Optional[int] = None
+) -> bytes:
+    """Compress `data` as a standalone zstd frame the game can read.
+
+    With `fit_to_budget`, `budget` is the most bytes the result should take
+    up, usually the asset's original size in the exe. The result may still
+    be larger if even the highest level can't fit it.
+    """
+    if settings is None:
+        settings = CompressionSettings()
+
+    threads = settings.threads if len(data) >= THREADED_MIN_SIZE else 0
+    compressed = get_compressor(settings.level, threads).compress(data)
+
+    if not settings.fit_to_budget or budget is None:
+        return compressed
+
+    for level in settings.budget_levels:
+        if len(compressed) <= budget:
+            break
+        if level <= settings.level:
+            continue
+        compressed = get_compressor(level, threads).compress(data)
+
+    return compressed
@@ -1,8 +1,24 @@
 import io
-from struct import pack, unpack
+from struct import Struct, pack, unpack
 
 from PIL import Image
 
+# https://docs.microsoft.com/en-us/windows/win32/direct3ddds/dds-header
+DDS_HEADER = Struct("<4s2I5I11I4I16s4II")
+DDS_HEADER_SIZE = 124  # always the same
+DDS_FLAGS = 0x0002100F  # required flags + pitch + mipmapped
+# pixel format sub structure
+DDS_PF_SIZE = 32  # size of pixel format structure, constant
+DDS_PF_FLAGS = 0x41  # uncompressed RGB with alpha channel
+DDS_FOURCC = 0  # compression mode (not used for uncompressed data)
+DDS_BITCOUNT = 32
+# bit masks for each channel, here for RGBA. Stored in big endian.
+DDS_MASKS = pack(">4I", 0xFF000000, 0x00FF0000, 0x0000FF00, 0x000000FF)
+DDS_CAPS = 0x1000  # simple texture with only one surface and no mipmaps
+
+# Lookup table mapping alpha to a paste mask: opaque anywhere alpha isn't 0
+_VISIBLE_LUT = [0] + [255] * 255
+
 
 def rgba_to_png(data):
     width, height = unpack(b"<II", data[:8])
@@ -22,47 +38,51 @@ def dds_to_png(data):
     return new_data.getvalue()
 
 
+def dds_header(width, height):
+    return DDS_HEADER.pack(
+        b"DDS ",  # magic bytes
+        DDS_HEADER_SIZE,
+        DDS_FLAGS,
+        height,
+        width,
+        width * 4,  # pitch, bytes per line
+        1,  # depth
+        1,  # mipmaps
+        *((0,) * 11),  # reserved
+        DDS_PF_SIZE,
+        DDS_PF_FLAGS,
+        DDS_FOURCC,
+        DDS_BITCOUNT,
+        DDS_MASKS,
+        DDS_CAPS,
+        0,  # caps2, additional surface data, unused
+        0,  # caps3, unused
+        0,  # caps4, unused
+        0,  # reserved
+    )
+
+
 def png_to_dds(img):
     """Takes a .png `Image` and returns .DDS data."""
 
     img = img.convert("RGBA")
 
-    # https://docs.microsoft.com/en-us/windows/win32/direct3ddds/dds-header
-    header_size = 124  # always the same
-    flags = 0x0002100F  # required flags + pitch + mipmapped
-
-    height = img.height
-    width = img.width
-
-    pitch = width * 4  # bytes per line
-    depth = 1
-    mipmaps = 1
-
-    # pixel format sub structure
-    pfsize = 32  # size of pixel format structure, constant
-    pfflags = 0x41  # uncompressed RGB with alpha channel
-    fourcc = 0  # compression mode (not used for uncompressed data)
-    bitcount = 32
-    # bit masks for each channel, here for RGBA
-    rmask = 0xFF000000
-    gmask = 0x00FF0000
-    bmask = 0x0000FF00
-    amask = 0x000000FF
-
-    caps = 0x1000  # simple texture with only one surface and no mipmaps
-    caps2 = 0  # additional surface data, unused
-    caps3 = 0  # unused
-    caps4 = 0  # unused
-
-    data = b"DDS "  # magic bytes
-    data += pack("<II", header_size, flags)
-    data += pack("<5I", height, width, pitch, depth, mipmaps)
-    data += pack("<11I", *((0,) * 11))  # reserved
-    data += pack("<4I", pfsize, pfflags, fourcc, bitcount)
-    data += pack(">4I", rmask, gmask, bmask, amask)  # masks are stored in big endian
-    data += pack("<4I", caps, caps2, caps3, caps4)
-    data += pack("<I", 0)  # reserved
+    # Force all transparent pixels to be (0, 0, 0, 0) instead of
+    # e.g. (255, 255, 255, 0) by pasting only the visible pixels
+    # onto a fully transparent image.
+    visible = img.getchannel("A").point(_VISIBLE_LUT)
+    out = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    out.paste(img, mask=visible)
+
+    return dds_header(img.width, img.height) + out.tobytes()
+
+
+def _png_to_dds_reference(img):
+    """Original per-pixel implementation, kept to verify `png_to_dds` against."""
+
+    img = img.convert("RGBA")
 
+    data = dds_header(img.width, img.height)
     data += bytes(
         (
             byte if rgba[3] != 0 else 0
@@ -0,0 +1,141 @@
+import hashlib
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from struct import unpack_from
+from typing import Dict, Optional
+
+from modlunky2.assets.hashing import md5sum_path
+from modlunky2.assets.json_cache import JsonCache
+from modlunky2.assets.patcher import Patcher
+from modlunky2.config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+EXE_IDENTITY_CACHE_PATH = DATA_DIR / "exe-identities.json"
+
+# Blocks of this size are hashed at evenly spaced offsets through the file
+SAMPLE_BLOCK_SIZE = 0x10000
+SAMPLE_BLOCK_COUNT = 16
+
+# Offset of e_lfanew, the offset of the PE header, in the DOS header
+PE_OFFSET_OFFSET = 0x3C
+# The PE signature is followed by Machine and NumberOfSections before TimeDateStamp
+PE_TIMESTAMP_OFFSET = 8
+
+
+def _pe_timestamp(header: bytes) -> Optional[int]:
+    if len(header) < PE_OFFSET_OFFSET + 4 or header[:2] != b"MZ":
+        return None
+    (pe_offset,) = unpack_from("<I", header, PE_OFFSET_OFFSET)
+    if len(header) < pe_offset + PE_TIMESTAMP_OFFSET + 4:
+        return None
+    if header[pe_offset : pe_offset + 4] != b"PE\x00\x00":
+        return None
+    (timestamp,) = unpack_from("<I", header, pe_offset + PE_TIMESTAMP_OFFSET)
+    return timestamp
+
+
+@dataclass(frozen=True)
+class ExeIdentity:
+    """Cheap to compute stand-in for an exe's contents.
+
+    Any of these changing means the exe was modified or replaced (e.g. by a
+    game update), without having to hash the whole file.
+    """
+
+    size: int
+    mtime_ns: int
+    pe_timestamp: Optional[int]
+    sample_md5: str
+
+    @classmethod
+    def from_path(cls, path: Path) -> "ExeIdentity":
+        stat = path.stat()
+        sample_md5 = hashlib.md5()
+        pe_timestamp = None
+        with path.open("rb") as exe:
+            step = max(stat.st_size // SAMPLE_BLOCK_COUNT, 1)
+            for offset in range(0, stat.st_size, step):
+                exe.seek(offset)
+                block = exe.read(SAMPLE_BLOCK_SIZE)
+                if offset == 0:
+                    pe_timestamp = _pe_timestamp(block)
+                sample_md5.update(block)
+            # Always include the end of the file
+            exe.seek(max(stat.st_size - SAMPLE_BLOCK_SIZE, 0))
+            sample_md5.update(exe.read(SAMPLE_BLOCK_SIZE))
+
+        return cls(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            pe_timestamp=pe_timestamp,
+            sample_md5=sample_md5.hexdigest(),
+        )
+
+
+class ExeIdentityCache:
+    """On-disk cache of each exe's full md5 and whether it's patched.
+
+    Entries are keyed by path and only used while the exe's ExeIdentity is
+    unchanged. Only the most recently stored `max_entries` are kept.
+    """
+
+    # Bump when the identity or the file format changes.
+    VERSION = 2
+
+    def __init__(self, cache_path: Path, max_entries: int = 8):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self._cache = JsonCache(cache_path, self.VERSION, max_entries)
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(path.resolve())
+
+    def _get(self, path: Path, identity: ExeIdentity) -> Dict:
+        """The cached entry for `path`, or an empty one if it's stale."""
+        entry = self._cache.get(self._key(path))
+        if not isinstance(entry, dict) or entry.get("identity") != asdict(identity):
+            return {}
+        return entry
+
+    def _update(self, path: Path, identity: ExeIdentity, **values):
+        def update(entry: Optional[Dict]) -> Dict:
+            if not isinstance(entry, dict) or entry.get("identity") != asdict(identity):
+                entry = {"identity": asdict(identity)}
+            entry.update(values)
+            return entry
+
+        self._cache.update(self._key(path), update)
+
+    def md5sum(self, path: Path) -> bytes:
+        """Same as md5sum_path, but only hashes the file if it changed."""
+        identity = ExeIdentity.from_path(path)
+        md5sum = self._get(path, identity).get("md5")
+        if md5sum is not None:
+            return md5sum.encode()
+
+        logger.info("Hashing %s", path)
+        md5sum = md5sum_path(path)
+        self._update(path, identity, md5=md5sum.decode())
+        return md5sum
+
+    def is_patched(self, path: Path) -> bool:
+        """Same as utils.is_patched, but only scans the file if it changed."""
+        identity = ExeIdentity.from_path(path)
+        patched = self._get(path, identity).get("patched")
+        if patched is not None:
+            return patched
+
+        with path.open("rb") as exe:
+            patched = Patcher(exe).is_checksum_patched()
+        self._update(path, identity, patched=patched)
+        return patched
+
+    def record_patched(self, path: Path, md5sum: Optional[bytes] = None):
+        """Remember that `path` was just patched, e.g. after packing."""
+        values = {"patched": True}
+        if md5sum is not None:
+            values["md5"] = md5sum.decode()
+        self._update(path, ExeIdentity.from_path(path), **values)
@@ -2,7 +2,7 @@ import argparse
 import logging
 from pathlib import Path
 
-from .assets import AssetStore
+from .assets import AssetStore, ExtractMode
 from .constants import (
     DEFAULT_COMPRESSION_LEVEL,
     EXTRACTED_DIR,
@@ -49,6 +49,13 @@ def main():
             "but packing will be faster."
         ),
     )
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        default=False,
+        action="store_true",
+        help="Only extract assets that changed since the last extraction.",
+    )
     parser.add_argument(
         "--create-entity-sheets",
         dest="create_entity_sheets",
@@ -56,6 +63,20 @@ def main():
         action="store_true",
         help=("Create extended entity assets merged from multiple sheets."),
     )
+    parser.add_argument(
+        "--extract-mode",
+        type=str.upper,
+        default=ExtractMode.THREADED.name,
+        choices=[mode.name for mode in ExtractMode],
+        help="How to schedule extraction work. Default: %(default)s",
+    )
+    parser.add_argument(
+        "--no-mmap",
+        dest="mmap",
+        default=True,
+        action="store_false",
+        help="Read assets into memory instead of memory-mapping the exe.",
+    )
     parser.add_argument(
         "--no-mkdirs",
         dest="mkdirs",
@@ -82,15 +103,20 @@ def main():
                 parents=True, exist_ok=True
             )
 
-    asset_store = AssetStore.load_from_file(args.exe)
-    unextracted = asset_store.extract(
-        mods_dir / extracted_dir,
-        mods_dir / ".compressed" / extracted_dir,
-        args.compression_level,
-        recompress=args.recompress,
-        create_entity_sheets=args.create_entity_sheets,
-        generate_string_hashes=False,
-    )
+    asset_store = AssetStore.load_from_file(args.exe, use_mmap=args.mmap)
+    try:
+        unextracted = asset_store.extract(
+            mods_dir / extracted_dir,
+            mods_dir / ".compressed" / extracted_dir,
+            args.compression_level,
+            recompress=args.recompress,
+            create_entity_sheets=args.create_entity_sheets,
+            generate_string_hashes=False,
+            extract_mode=ExtractMode[args.extract_mode],
+            incremental=args.incremental,
+        )
+    finally:
+        asset_store.close()
 
     for asset in unextracted:
         logging.warning("Un-extracted Asset %s", asset.asset_block)
@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import Dict, Optional
+
+from modlunky2.assets.json_cache import JsonCache
+from modlunky2.config import DATA_DIR
+
+FILEPATH_HASH_CACHE_PATH = DATA_DIR / "filepath-hashes.json"
+
+
+class FilepathHashCache:
+    """On-disk cache of filepath -> filepath hash for each bundle key.
+
+    Filepath hashes only depend on the filepath and the key derived from the
+    bundle, so they're stable for a given game version. Only the most recently
+    stored `max_keys` keys are kept.
+    """
+
+    # Bump when the hashing or the file format changes.
+    VERSION = 2
+
+    def __init__(self, cache_path: Path, max_keys: int = 4):
+        self.cache_path = cache_path
+        self.max_keys = max_keys
+        self._cache = JsonCache(cache_path, self.VERSION, max_keys)
+
+    def get(self, key: int) -> Optional[Dict[str, bytes]]:
+        """Returns the cached hashes for `key`, or None if there aren't any."""
+        entry = self._cache.get(f"{key:016x}")
+        if entry is None:
+            return None
+
+        try:
+            return {
+                filepath: bytes.fromhex(filepath_hash)
+                for filepath, filepath_hash in entry["hashes"].items()
+            }
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+
+    def put(self, key: int, hashes: Dict[str, bytes]):
+        entry = {
+            "hashes": {
+                filepath: filepath_hash.hex()
+                for filepath, filepath_hash in hashes.items()
+            },
+        }
+        self._cache.put(f"{key:016x}", entry)
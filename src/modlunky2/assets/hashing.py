@@ -11,3 +11,10 @@ def md5sum_path(path, chunk_size=8192):
             md5sum.update(chunk)
             chunk = file_.read(chunk_size)
         return md5sum.hexdigest().encode()
+
+
+def stat_signature(path):
+    """Cheap signature of a file that changes whenever the file is modified."""
+
+    stat = path.stat()
+    return f"{stat.st_size} {stat.st_mtime_ns} {stat.st_ino}".encode()
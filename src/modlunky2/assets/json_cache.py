@@ -0,0 +1,72 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonCache:
+    """Small versioned JSON file mapping string keys to entries.
+
+    Entries are kept in the order they were last stored, so only the
+    `max_entries` most recently stored are written back. A file with another
+    `version` or that can't be read is treated as empty.
+    """
+
+    def __init__(self, cache_path: Path, version: int, max_entries: int):
+        self.cache_path = cache_path
+        self.version = version
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict:
+        if not self.cache_path.exists():
+            return {}
+
+        try:
+            with self.cache_path.open("r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            logger.warning("Failed to read cache %s", self.cache_path)
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return {}
+
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def _write(self, entries: Dict):
+        # Evict the oldest entries
+        oldest = list(entries)[: max(len(entries) - self.max_entries, 0)]
+        for key in oldest:
+            del entries[key]
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        with temp_path.open("w", encoding="utf-8") as cache_file:
+            json.dump({"version": self.version, "entries": entries}, cache_file)
+        os.replace(temp_path, self.cache_path)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self._read().get(key)
+
+    def update(self, key: str, update: Callable[[Optional[Dict]], Dict]):
+        """Stores `update(entry)` for `key`, making it the newest entry."""
+        with self._lock:
+            entries = self._read()
+            entry = update(entries.pop(key, None))
+            entries[key] = entry
+            try:
+                self._write(entries)
+            except OSError:
+                logger.warning("Failed to write cache %s", self.cache_path)
+
+    def put(self, key: str, entry: Dict):
+        self.update(key, lambda _old: entry)
@@ -0,0 +1,118 @@
+import json
+import logging
+import os
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AssetFingerprint:
+    """Identifies the payload an extracted asset was produced from.
+
+    The crc is of the decrypted payload. The encryption (and filepath hashes)
+    depend on the bundle key which changes whenever any asset changes size,
+    so the encrypted bytes differ for every asset across game updates.
+    """
+
+    asset_len: int
+    crc32: int
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(asset_len=len(payload), crc32=zlib.crc32(payload))
+
+
+@dataclass(frozen=True)
+class ExtractedFile:
+    """Stat of an extracted file, to notice it being modified or replaced."""
+
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def from_path(cls, path: Path) -> Optional["ExtractedFile"]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return cls(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    fingerprint: AssetFingerprint
+    extracted: ExtractedFile
+
+    def is_current(self, fingerprint: AssetFingerprint, extracted_path: Path) -> bool:
+        """Whether this was extracted from `fingerprint` and left untouched."""
+        if self.fingerprint != fingerprint:
+            return False
+        return self.extracted == ExtractedFile.from_path(extracted_path)
+
+
+class ExtractManifest:
+    """Fingerprints of the assets written by the last extraction.
+
+    Lets the next extraction skip assets whose payload in the exe hasn't
+    changed and whose extracted file hasn't been touched since.
+    """
+
+    FILENAME = "extract-manifest.json"
+    # Bump when the format or the extraction output changes.
+    VERSION = 1
+
+    def __init__(self, settings: Dict, entries: Dict[str, ManifestEntry] = None):
+        # Extraction options that affect the output. A manifest written with
+        # different settings is ignored.
+        self.settings = settings
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path: Path, settings: Dict) -> "ExtractManifest":
+        """Load the manifest at `path`, or an empty one if it's unusable."""
+        empty = cls(settings)
+        if not path.exists():
+            return empty
+
+        try:
+            with path.open("r", encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+            if data["version"] != cls.VERSION or data["settings"] != settings:
+                return empty
+            entries = {
+                filepath: ManifestEntry(
+                    fingerprint=AssetFingerprint(**entry["fingerprint"]),
+                    extracted=ExtractedFile(**entry["extracted"]),
+                )
+                for filepath, entry in data["entries"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable extract manifest %s", path)
+            return empty
+
+        return cls(settings, entries)
+
+    def save(self, path: Path):
+        data = {
+            "version": self.VERSION,
+            "settings": self.settings,
+            "entries": {
+                filepath: asdict(entry) for filepath, entry in self.entries.items()
+            },
+        }
+        temp_path = path.with_name(f"{path.name}.tmp")
+        with temp_path.open("w", encoding="utf-8") as manifest_file:
+            json.dump(data, manifest_file)
+        os.replace(temp_path, path)
+
+    def record(
+        self, filepath: str, fingerprint: AssetFingerprint, extracted_path: Path
+    ):
+        extracted = ExtractedFile.from_path(extracted_path)
+        if extracted is None:
+            return
+        self.entries[filepath] = ManifestEntry(fingerprint, extracted)
@@ -14,6 +14,8 @@ We overwrite the exit() call with NOPs
 
 import logging
 
+from modlunky2.assets.pattern_scan import Pattern, scan_file
+
 CHECKSUM_PATCH_START = b"\x48\x3B\xC1\x74\x09\x33\xC9\xFF"
 CHECKSUM_PATCH_END = 0xCC
 CHECKSUM_PATCH_REPLACE = b"\x48\x3B\xC1\x74\x09" + b"\x90" * 9
@@ -21,6 +23,13 @@ CHECKSUM_PATCH_REPLACE = b"\x48\x3B\xC1\x74\x09" + b"\x90" * 9
 RELEASE_AOB_PRODUCTION = b"\x00\x50\x72\x6F\x64\x75\x63\x74\x69\x6F\x6E\x00"
 RELEASE_AOB_REPLACE = b"\x00\x4D\x6F\x64\x6C\x75\x6E\x6B\x79\x32\x00\x00"
 
+CHECKSUM_START_PATTERN = Pattern.from_bytes("checksum-start", CHECKSUM_PATCH_START)
+CHECKSUM_PATTERN = Pattern.from_aob(
+    "checksum", "48 3B C1 74 09 33 C9 FF ?? ?? ?? ?? ?? CC"
+)
+RELEASE_PATTERN = Pattern.from_bytes("release", RELEASE_AOB_PRODUCTION)
+PATCH_PATTERNS = [CHECKSUM_START_PATTERN, CHECKSUM_PATTERN, RELEASE_PATTERN]
+
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +37,24 @@ logger = logging.getLogger(__name__)
 class Patcher:
     def __init__(self, exe_handle):
         self.exe_handle = exe_handle
+        self._hits = None
+
+    def scan(self):
+        """Offsets of every PATCH_PATTERNS match, keyed by pattern name.
+
+        The exe is scanned once and the result shared by the checks and
+        patches below, which keep it up to date as they patch.
+        """
+        if self._hits is None:
+            # Make sure earlier writes through the handle are visible to the mmap
+            self.exe_handle.flush()
+            self._hits = scan_file(self.exe_handle, PATCH_PATTERNS)
+        return self._hits
+
+    def _patched(self, index):
+        for offsets in self.scan().values():
+            if index in offsets:
+                offsets.remove(index)
 
     def find(self, needle, offset=0, bsize=4096):
         if bsize < len(needle):
@@ -54,22 +81,19 @@ class Patcher:
 
     def is_checksum_patched(self) -> bool:
         """Returns true of the binary has already been patched."""
-        self.exe_handle.seek(0)
-        return self.find(CHECKSUM_PATCH_START) == -1
+        return not self.scan()[CHECKSUM_START_PATTERN.name]
 
     def patch_checksum(self):
-        self.exe_handle.seek(0)
-
         logger.info("Patching asset checksum check")
-        index = self.find(CHECKSUM_PATCH_START)
-        if index == -1:
+        hits = self.scan()
+        if not hits[CHECKSUM_START_PATTERN.name]:
             logger.warning("Didn't find instructions to patch. Is game unmodified?")
             return False
 
-        self.exe_handle.seek(index)
-        ops = self.exe_handle.read(14)
-
-        if ops[-1] != CHECKSUM_PATCH_END:
+        index = hits[CHECKSUM_START_PATTERN.name][0]
+        if index not in hits[CHECKSUM_PATTERN.name]:
+            self.exe_handle.seek(index)
+            ops = self.exe_handle.read(CHECKSUM_PATTERN.size)
             logger.warning(
                 "Checksum check has unexpected form, this script has "
                 "to be updated for the current game version."
@@ -84,17 +108,19 @@ class Patcher:
         )
         self.exe_handle.seek(index)
         self.exe_handle.write(CHECKSUM_PATCH_REPLACE)
+        self._patched(index)
         return True
 
     def patch_release(self):
-        self.exe_handle.seek(0)
-        index = self.find(RELEASE_AOB_PRODUCTION)
-        if index == -1:
+        hits = self.scan()
+        if not hits[RELEASE_PATTERN.name]:
             logger.warning(
                 "Didn't find production string in release. Is this a vanilla binary being patched?"
             )
             return False
 
+        index = hits[RELEASE_PATTERN.name][0]
         self.exe_handle.seek(index)
         self.exe_handle.write(RELEASE_AOB_REPLACE)
+        self._patched(index)
         return True
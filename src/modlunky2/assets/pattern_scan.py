@@ -0,0 +1,98 @@
+"""Find byte patterns (array of bytes signatures) in a buffer.
+
+Patterns are written like `48 3B C1 FF ?? ?? CC` where `??` matches any byte.
+All patterns are searched for in a single pass over the buffer, a window at
+a time, so each part of a large mapped file is only paged in once.
+"""
+import mmap
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+# Size of the window of the buffer searched for every pattern before moving on
+SCAN_WINDOW_SIZE = 0x400000
+
+WILDCARD = "??"
+
+
+@dataclass(frozen=True)
+class Pattern:
+    name: str
+
+    # Literal runs of the pattern as (offset, bytes). Anything between them is
+    # a wildcard.
+    segments: Tuple[Tuple[int, bytes], ...]
+
+    size: int
+
+    @classmethod
+    def from_aob(cls, name: str, aob: str) -> "Pattern":
+        segments = []
+        run_start = 0
+        run = bytearray()
+        tokens = aob.split()
+        for idx, token in enumerate(tokens):
+            if token == WILDCARD:
+                if run:
+                    segments.append((run_start, bytes(run)))
+                run = bytearray()
+                run_start = idx + 1
+            else:
+                run.append(int(token, 16))
+        if run:
+            segments.append((run_start, bytes(run)))
+
+        if not segments:
+            raise ValueError(f"Pattern {name} has no literal bytes")
+        return cls(name=name, segments=tuple(segments), size=len(tokens))
+
+    @classmethod
+    def from_bytes(cls, name: str, data: bytes) -> "Pattern":
+        return cls(name=name, segments=((0, bytes(data)),), size=len(data))
+
+    @property
+    def anchor(self) -> Tuple[int, bytes]:
+        """The longest literal run, which is what's actually searched for."""
+        return max(self.segments, key=lambda segment: len(segment[1]))
+
+    def matches_at(self, buffer, pos: int) -> bool:
+        if pos < 0 or pos + self.size > len(buffer):
+            return False
+        return all(
+            buffer[pos + offset : pos + offset + len(literal)] == literal
+            for offset, literal in self.segments
+        )
+
+
+def scan(
+    buffer, patterns: Iterable[Pattern], window_size=SCAN_WINDOW_SIZE
+) -> Dict[str, List[int]]:
+    """Offsets of every match of each pattern, keyed by pattern name."""
+    patterns = list(patterns)
+    hits: Dict[str, List[int]] = {pattern.name: [] for pattern in patterns}
+    buffer_len = len(buffer)
+
+    for window_start in range(0, buffer_len, window_size):
+        window_end = min(window_start + window_size, buffer_len)
+        for pattern in patterns:
+            anchor_offset, anchor = pattern.anchor
+            # Only matches starting in this window, so nothing is found twice
+            search_start = window_start + anchor_offset
+            search_end = min(window_end + anchor_offset + len(anchor) - 1, buffer_len)
+            pos = buffer.find(anchor, search_start, search_end)
+            while pos != -1:
+                match_start = pos - anchor_offset
+                if pattern.matches_at(buffer, match_start):
+                    hits[pattern.name].append(match_start)
+                pos = buffer.find(anchor, pos + 1, search_end)
+
+    return hits
+
+
+def scan_file(handle, patterns: Iterable[Pattern]) -> Dict[str, List[int]]:
+    """Scan an open file through a read-only mmap."""
+    if os.fstat(handle.fileno()).st_size == 0:
+        # Empty files can't be mapped
+        return scan(b"", patterns)
+    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return scan(buffer, patterns)
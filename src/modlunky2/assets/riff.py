@@ -1,45 +1,112 @@
-# Per PEP 594, the chunk module is deprecated in Python 3.11.
-# It must be replaced by Python 3.12's EoL (ETA Oct 2028)
-from chunk import Chunk  # pylint: disable=deprecated-module
-
-
-class RIFFChunk(Chunk):
-    def __init__(self, f):
-        super().__init__(f, align=True, bigendian=False)
-        self.skip()
-        self.end = self.tell() + self.offset
-        self.seek(0)
-        self.children = None
-        self.type = None
-
-    def populate_children(self):
-        children = []
-        while self.file.tell() < self.end:
-            chunk = RIFFChunk(self.file)
-            if chunk.getname() == b"LIST":
-                chunk.type = chunk.read(4)
-                chunk.populate_children()
-            chunk.seek(0)
-            chunk.skip()
-            children.append(chunk)
-        self.children = children
+import mmap
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from struct import unpack_from
+from typing import Iterator, List, Optional
+
+CHUNK_HEADER_SIZE = 8
+# Chunks with a 4 byte type followed by child chunks
+CONTAINER_NAMES = (b"RIFF", b"LIST")
+# Alignments above this aren't interesting and would just be noise
+MAX_ALIGNMENT = 0x1000
+
+
+@dataclass
+class RIFFChunk:
+    name: bytes
+
+    # Offset of the chunk's data, after its name and size
+    offset: int
+
+    # Size of the chunk's data, not including the pad byte of odd sized chunks
+    size: int
+
+    # Largest power of two (up to MAX_ALIGNMENT) the data offset is aligned to
+    alignment: int
+
+    # For RIFF and LIST chunks
+    type: Optional[bytes] = None
+    children: Optional[List["RIFFChunk"]] = None
+
+    @property
+    def end(self):
+        return self.offset + self.size
+
+    def getname(self):
+        return self.name
 
     def __repr__(self):
         return "<%s %r with %s children>" % (
             self.__class__.__name__,
-            self.getname(),
+            self.name,
             "no" if self.children is None else len(self.children),
         )
 
 
-class RIFF(RIFFChunk):
-    def __init__(self, f):
-        super().__init__(f)
+def _alignment(offset):
+    if offset == 0:
+        return MAX_ALIGNMENT
+    return min(offset & -offset, MAX_ALIGNMENT)
+
+
+def _parse_chunk(buffer, pos: int) -> RIFFChunk:
+    name, size = unpack_from("<4sI", buffer, pos)
+    offset = pos + CHUNK_HEADER_SIZE
+    if offset + size > len(buffer):
+        raise ValueError(
+            f"Chunk {name!r} at {pos:#x} with size {size:#x} runs past the end"
+        )
+
+    chunk = RIFFChunk(name=name, offset=offset, size=size, alignment=_alignment(offset))
+    if name in CONTAINER_NAMES:
+        chunk.type = bytes(buffer[offset : offset + 4])
+        chunk.children = []
+        child_pos = offset + 4
+        while child_pos + CHUNK_HEADER_SIZE <= chunk.end:
+            child = _parse_chunk(buffer, child_pos)
+            chunk.children.append(child)
+            # Chunks are word aligned
+            child_pos = child.end + child.size % 2
+    return chunk
+
+
+class RIFF:
+    """Index of every chunk in a RIFF file, built once over a buffer.
+
+    The buffer is usually a read-only mmap, see `RIFF.open`. Chunk data is
+    accessed through `view` without copying it.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.root = _parse_chunk(buffer, 0)
+        if self.root.name != b"RIFF":
+            raise ValueError(f"Expected RIFF chunk, found {self.root.name!r}")
+
+        self.type = self.root.type
+        self.children = self.root.children
+        self.chunks = list(self.walk())
+
+    @classmethod
+    @contextmanager
+    def open(cls, path: Path):
+        """Index the RIFF file at `path` over a read-only mmap.
+
+        Views of the chunks must be released before leaving the context.
+        """
+        with path.open("rb") as riff_file:
+            with mmap.mmap(riff_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield cls(buffer)
 
-        assert self.getname() == b"RIFF"
-        self.seek(0)
-        self.type = self.read(4)
-        self.populate_children()
+    def walk(self, chunk: Optional[RIFFChunk] = None) -> Iterator[RIFFChunk]:
+        """Every chunk, depth first, starting with `chunk` (the root by default)."""
+        if chunk is None:
+            chunk = self.root
+        yield chunk
+        for child in chunk.children or []:
+            yield from self.walk(child)
 
-    def save(self):
-        pass
+    def view(self, chunk: RIFFChunk, start: int = 0) -> memoryview:
+        """Zero-copy view of the chunk's data, from `start` bytes in."""
+        return memoryview(self.buffer)[chunk.offset + start : chunk.end]
@@ -1,25 +1,243 @@
 import argparse
+import hashlib
+import json
 import logging
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
+from struct import unpack_from
+from typing import Dict, List, Optional, Tuple
 
 import fsb5
 from fsb5.utils import LibraryNotFoundException
 
-from .riff import RIFF
+from .riff import RIFF, RIFFChunk
 
 
 logger = logging.getLogger(__name__)
 
+# Number of samples rebuilt by each task in the process pool
+SAMPLE_BATCH_SIZE = 64
+
+# FSB5 data in SND chunks starts at the next multiple of this
+FSB_ALIGNMENT = 0x20
+
+# Start of the FSB5 header: magic, version, number of samples, sample headers
+# size, name table size, data size and sound format
+FSB5_HEADER_PREFIX = "<4sIIIIII"
+
+# Records what each extracted sample was rebuilt from, see SoundbankManifest
+MANIFEST_FILENAME = ".soundbank-manifest.json"
+
 
 class Extension(Enum):
     WAV = "wav"
     OGG = "ogg"
 
 
-def extract_soundbank(
-    soundbank_path: Path, dest_path: Path, extract_extensions: Extension = None
+@dataclass
+class FormatStats:
+    extracted: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def samples_per_sec(self):
+        if not self.seconds:
+            return 0.0
+        return self.extracted / self.seconds
+
+
+class SoundbankManifest:
+    """Rebuilt samples keyed by their path relative to the extract directory.
+
+    Each entry has the crc32 of the sample data in the bank, and the size,
+    mtime and md5 of the file rebuilt from it. A sample is only rebuilt again
+    if its data changed or the file on disk no longer matches. The file is
+    only hashed when its size matches but its mtime doesn't.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, dict]] = None):
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "SoundbankManifest":
+        try:
+            with path.open("r", encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+            if data.get("version") != cls.VERSION:
+                return cls(path)
+            return cls(path, data["entries"])
+        except FileNotFoundError:
+            return cls(path)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Ignoring unreadable soundbank manifest %s", path)
+            return cls(path)
+
+    def save(self):
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as manifest_file:
+            json.dump({"version": self.VERSION, "entries": self.entries}, manifest_file)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def make_entry(out_path: Path, source_crc32: int, md5: str) -> dict:
+        stat = out_path.stat()
+        return {
+            "source-crc32": source_crc32,
+            "size": stat.st_size,
+            "mtime-ns": stat.st_mtime_ns,
+            "md5": md5,
+        }
+
+    @staticmethod
+    def current_entry(
+        entry: Optional[dict], out_path: Path, source_crc32: int
+    ) -> Optional[dict]:
+        """The entry to keep if `out_path` is still what `entry` recorded.
+
+        Returns None if the sample needs to be rebuilt.
+        """
+        if entry is None or entry.get("source-crc32") != source_crc32:
+            return None
+
+        try:
+            stat = out_path.stat()
+        except FileNotFoundError:
+            return None
+        if stat.st_size != entry.get("size"):
+            return None
+        if stat.st_mtime_ns == entry.get("mtime-ns"):
+            return entry
+
+        # Touched, so check whether the contents changed too
+        if _md5sum_file(out_path) != entry.get("md5"):
+            return None
+        return {**entry, "mtime-ns": stat.st_mtime_ns}
+
+
+def _md5sum_file(path: Path) -> str:
+    with path.open("rb") as file_:
+        return hashlib.md5(file_.read()).hexdigest()
+
+
+def fsb_chunks(riff: RIFF) -> List[RIFFChunk]:
+    """The bank's SND chunks, each containing an FSB5."""
+    # The first two children are the bank's FMT and LIST chunks
+    return riff.children[2:]
+
+
+def fsb_view(riff: RIFF, chunk: RIFFChunk) -> memoryview:
+    """View of the FSB5 data in an SND chunk."""
+    # FSB5 data starts at the next 0x20 aligned offset
+    return riff.view(chunk, FSB_ALIGNMENT - chunk.offset % FSB_ALIGNMENT)
+
+
+def fsb_header(riff: RIFF, chunk: RIFFChunk) -> Tuple[str, int]:
+    """Sample extension and number of samples of the FSB5 in an SND chunk.
+
+    Only reads the header, unlike fsb5.FSB5 which copies and parses the
+    whole FSB5.
+    """
+    with fsb_view(riff, chunk) as view:
+        magic, _, num_samples, _, _, _, mode = unpack_from(FSB5_HEADER_PREFIX, view)
+    if magic != b"FSB5":
+        raise ValueError(f"Expected magic header 'FSB5' but got {magic!r}")
+    return fsb5.SoundFormat(mode).file_extension, num_samples
+
+
+@lru_cache(maxsize=2)
+def _load_fsb(soundbank_path: Path, fsb_index: int) -> fsb5.FSB5:
+    """Parse an FSB5 once per worker, straight from a mapping of the bank."""
+    with RIFF.open(soundbank_path) as riff:
+        with fsb_view(riff, fsb_chunks(riff)[fsb_index]) as view:
+            return fsb5.FSB5(view)
+
+
+@dataclass
+class SampleResult:
+    rel_path: str
+    # Manifest entry for the extracted file
+    entry: dict
+    # False if the file was already current and left as is
+    rebuilt: bool
+    frequency: int
+    channels: int
+    samples: int
+
+
+def _rebuild_samples(
+    soundbank_path: Path,
+    fsb_index: int,
+    sample_indexes: range,
+    dest_path: Path,
+    entries: Dict[str, dict],
 ):
+    """Process pool task: rebuild a batch of samples from one FSB5.
+
+    Samples still matching their entry in `entries` are skipped. Returns a
+    SampleResult for each sample, or the error message if the library needed
+    to decode the format is missing.
+    """
+    fsb = _load_fsb(soundbank_path, fsb_index)
+    ext = fsb.get_sample_extension()
+    results = []
+    for index in sample_indexes:
+        sample = fsb.samples[index]
+        rel_path = f"{ext}/{sample.name}.{ext}"
+        out_path = dest_path / rel_path
+        source_crc32 = zlib.crc32(sample.data)
+
+        entry = SoundbankManifest.current_entry(
+            entries.get(rel_path), out_path, source_crc32
+        )
+        rebuilt = entry is None
+        if rebuilt:
+            try:
+                data = fsb.rebuild_sample(sample)
+            except LibraryNotFoundException as err:
+                return str(err)
+
+            with out_path.open("wb") as out_file:
+                out_file.write(data)
+            entry = SoundbankManifest.make_entry(
+                out_path, source_crc32, hashlib.md5(data).hexdigest()
+            )
+
+        results.append(
+            SampleResult(
+                rel_path,
+                entry,
+                rebuilt,
+                sample.frequency,
+                sample.channels,
+                sample.samples,
+            )
+        )
+    return results
+
+
+def extract_soundbank(
+    soundbank_path: Path,
+    dest_path: Path,
+    extract_extensions: Extension = None,
+    max_workers=max(os.cpu_count() - 2, 1),
+    batch_size=SAMPLE_BATCH_SIZE,
+) -> Dict[str, FormatStats]:
+    """Extract the samples of every FSB5 in the soundbank to `dest_path`.
+
+    Samples are rebuilt in batches in a process pool. Samples whose file
+    still matches what was rebuilt last time are skipped. Returns the
+    stats for each extension.
+    """
     if extract_extensions:
         extract_extensions = set(ext.value for ext in extract_extensions)
 
@@ -30,44 +248,82 @@ def extract_soundbank(
         if not ext_dest_path.exists():
             ext_dest_path.mkdir(parents=True, exist_ok=True)
 
-    with soundbank_path.open("rb") as soundbank_file:
-        riff = RIFF(soundbank_file)
-
-        for i in range(len(riff.children) - 2):
-            chunk = riff.children[i + 2]
+    manifest = SoundbankManifest.load(dest_path / MANIFEST_FILENAME)
+    stats: Dict[str, FormatStats] = {}
 
-            # read the file into a FSB5 object
-            chunk.seek(0)
-            chunk.seek(0x20 - chunk.offset % 0x20)
-            fsb = fsb5.FSB5(chunk.read())
+    # The samples themselves are only parsed by the workers
+    with RIFF.open(soundbank_path) as riff:
+        fsb_headers = [fsb_header(riff, chunk) for chunk in fsb_chunks(riff)]
 
-            # from python-fsb5 repo ==
-            # get the extension of samples based off the sound format specified in the header
-            ext = fsb.get_sample_extension()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for i, (ext, num_samples) in enumerate(fsb_headers):
             if extract_extensions and ext not in extract_extensions:
                 continue
+            start_time = time.perf_counter()
+            ext_stats = stats.setdefault(ext, FormatStats())
+            ext_entries = {
+                rel_path: entry
+                for rel_path, entry in manifest.entries.items()
+                if rel_path.startswith(f"{ext}/")
+            }
 
-            for sample in fsb.samples:
-                logger.info(
-                    "Extracting %s.%s (%sHz, %s channels, %s samples)",
-                    sample.name,
-                    ext,
-                    sample.frequency,
-                    sample.channels,
-                    sample.samples,
+            futures = [
+                pool.submit(
+                    _rebuild_samples,
+                    soundbank_path,
+                    i,
+                    range(batch, min(batch + batch_size, num_samples)),
+                    dest_path,
+                    ext_entries,
                 )
-                try:
-                    with (dest_path / ext / f"{sample.name}.{ext}").open(
-                        "wb"
-                    ) as out_file:
-                        out_file.write(fsb.rebuild_sample(sample))
-                except LibraryNotFoundException as err:
+                for batch in range(0, num_samples, batch_size)
+            ]
+            rebuilt = 0
+            for future in futures:
+                results = future.result()
+                if isinstance(results, str):
                     logger.error(
-                        "Failed to extract files for extension %s: %s", ext, err
+                        "Failed to extract files for extension %s: %s", ext, results
                     )
-                    return
+                    for remaining in futures:
+                        remaining.cancel()
+                    manifest.save()
+                    return stats
+                for result in results:
+                    manifest.entries[result.rel_path] = result.entry
+                    if not result.rebuilt:
+                        ext_stats.skipped += 1
+                        continue
+                    rebuilt += 1
+                    logger.info(
+                        "Extracted %s (%sHz, %s channels, %s samples)",
+                        result.rel_path,
+                        result.frequency,
+                        result.channels,
+                        result.samples,
+                    )
+            ext_stats.extracted += rebuilt
+            ext_stats.seconds += time.perf_counter() - start_time
+
+            logger.info(
+                "Extracted %s %s files from bank %s (%s unchanged)",
+                rebuilt,
+                ext,
+                i,
+                num_samples - rebuilt,
+            )
 
-            logger.info("Extracted %s %s files from bank %s", len(fsb.samples), ext, i)
+    manifest.save()
+    for ext, ext_stats in stats.items():
+        logger.info(
+            "%s: extracted %s samples in %.2fs (%.1f samples/sec), skipped %s",
+            ext,
+            ext_stats.extracted,
+            ext_stats.seconds,
+            ext_stats.samples_per_sec,
+            ext_stats.skipped,
+        )
+    return stats
 
 
 def main():
@@ -1,6 +1,9 @@
+import os
 import zlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
 
 
 class StringHashes:
@@ -10,6 +13,11 @@ class StringHashes:
         # line should be written as `crc_hash: original line of text`.
         self.hashes = hashes
 
+        # Prefix for each line, ready to be joined with the line itself
+        self._prefixes = [
+            "" if string_hash is None else f"{string_hash}: " for string_hash in hashes
+        ]
+
     @classmethod
     def from_data(cls, strings_data):
         hashes = []
@@ -32,22 +40,46 @@ class StringHashes:
 
         return cls(hashes=hashes)
 
-    def write_string_hashes(self, strings_data, hashed_strings_dest: Path):
+    def format_string_hashes(self, strings_data) -> Optional[bytes]:
+        """The hashed version of `strings_data`, or None if it doesn't line up."""
         lines = strings_data.decode().splitlines()
         if len(lines) != len(self.hashes):
-            logging.debug("Data for %s has %s lines, expected %s.")
-            return
-
-        with hashed_strings_dest.open("wb") as hashed_strings_file:
-            for line_num, line in enumerate(lines):
-                if line_num >= len(self.hashes):
-                    hashed_strings_file.write(f"{line}\n".encode())
-                    continue
-
-                string_hash = self.hashes[line_num]
-                if string_hash is None:
-                    output_line = line
-                else:
-                    output_line = f"{string_hash}: {line}"
-
-                hashed_strings_file.write(f"{output_line}\n".encode())
+            return None
+
+        return "".join(
+            f"{prefix}{line}\n" for prefix, line in zip(self._prefixes, lines)
+        ).encode()
+
+    def write_string_hashes(self, strings_data, hashed_strings_dest: Path) -> bool:
+        data = self.format_string_hashes(strings_data)
+        if data is None:
+            logging.debug(
+                "Data for %s has %s lines, expected %s.",
+                hashed_strings_dest,
+                len(strings_data.decode().splitlines()),
+                len(self.hashes),
+            )
+            return False
+
+        # Written to a temporary file first so a reader never sees half a file
+        tmp_dest = hashed_strings_dest.with_name(f"{hashed_strings_dest.name}.tmp")
+        with tmp_dest.open("wb") as hashed_strings_file:
+            hashed_strings_file.write(data)
+        os.replace(tmp_dest, hashed_strings_dest)
+        return True
+
+    def write_all_string_hashes(
+        self,
+        strings: Iterable[Tuple[bytes, Path]],
+        max_workers=max(os.cpu_count() - 2, 1),
+    ) -> List[Path]:
+        """Write the hashed version of every (strings_data, dest) at once.
+
+        Returns the destinations that were written.
+        """
+        strings = list(strings)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            written = list(
+                pool.map(lambda item: self.write_string_hashes(*item), strings)
+            )
+        return [dest for (_, dest), ok in zip(strings, written) if ok]
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+import dataclasses
+from pathlib import Path
+from struct import pack
+from typing import List, Tuple
+
+import zstandard as zstd
+
+from modlunky2.assets.assets import AssetStore
+from modlunky2.assets.chacha import Key, chacha, hash_filepath
+
+# Compression level for synthetic bundles. Kept low so tests stay fast.
+TESTING_COMPRESSION_LEVEL = 3
+
+
+@dataclass
+class BundleBuilder:
+    """Builds a synthetic Spel2.exe asset bundle for tests and benchmarks."""
+
+    # (filepath, uncompressed data, is_encrypted)
+    assets: List[Tuple[str, bytes, bool]] = dataclasses.field(default_factory=list)
+
+    def add_asset(self, filepath: str, data: bytes, is_encrypted: bool = True):
+        self.assets.append((filepath, data, is_encrypted))
+        return self
+
+    def build(self) -> bytes:
+        payloads = []
+        key = Key()
+        cctx = zstd.ZstdCompressor(level=TESTING_COMPRESSION_LEVEL)
+        for filepath, data, is_encrypted in self.assets:
+            if is_encrypted:
+                data = cctx.compress(data)
+            payloads.append(data)
+            key.update(len(data) + 1)
+
+        out = bytearray(AssetStore.BUNDLE_OFFSET)
+        for (filepath, _, is_encrypted), data in zip(self.assets, payloads):
+            filepath = filepath.encode()
+            if is_encrypted:
+                data = chacha(filepath, data, key.key)
+            filepath_hash = hash_filepath(filepath, key.key)
+            out += pack("<II", len(data) + 1, len(filepath_hash))
+            out += filepath_hash
+            out += pack("<b", is_encrypted)
+            out += data
+        out += pack("<II", 0, 0)
+
+        return bytes(out)
+
+    def write(self, path: Path) -> Path:
+        with path.open("wb") as exe_file:
+            exe_file.write(self.build())
+        return path
+
+
+# FSB5 header, see fsb5.FSB5Header. Version 1 has no trailing `unknown` field.
+FSB5_HEADER = "<4sIIIIII8s16s8s"
+# Sample header frequency index for 44100Hz
+FSB5_FREQUENCY_44100 = 8
+FSB5_PCM16 = 2
+
+
+def build_fsb5_pcm16(samples: List[Tuple[str, bytes]]) -> bytes:
+    """A single channel 44100Hz PCM16 FSB5 with the given (name, data) samples."""
+    sample_headers = b""
+    data = b""
+    for _, sample_data in samples:
+        # Sample data offsets are stored in 16 byte units
+        data += b"\x00" * (-len(data) % 16)
+        sample_headers += pack(
+            "<Q",
+            FSB5_FREQUENCY_44100 << 1
+            | (len(data) // 16) << 6
+            | (len(sample_data) // 2) << 34,
+        )
+        data += sample_data
+
+    names = b""
+    name_offsets = b""
+    for name, _ in samples:
+        name_offsets += pack("<I", len(samples) * 4 + len(names))
+        names += name.encode() + b"\x00"
+    name_table = name_offsets + names
+
+    header = pack(
+        FSB5_HEADER,
+        b"FSB5",
+        1,
+        len(samples),
+        len(sample_headers),
+        len(name_table),
+        len(data),
+        FSB5_PCM16,
+        b"\x00" * 8,
+        b"\x00" * 16,
+        b"\x00" * 8,
+    )
+    return header + sample_headers + name_table + data
+
+
+def _riff_chunk(name: bytes, data: bytes) -> bytes:
+    chunk = name + pack("<I", len(data)) + data
+    if len(data) % 2:
+        chunk += b"\x00"
+    return chunk
+
+
+def build_soundbank(fsbs: List[bytes]) -> bytes:
+    """A RIFF soundbank laid out like soundbank.bank with one SND chunk per FSB5.
+
+    FSB5 data in SND chunks starts at the next 0x20 aligned offset.
+    """
+    out = bytearray(b"RIFF\x00\x00\x00\x00FEV ")
+    out += _riff_chunk(b"FMT ", b"\x00" * 8)
+    out += _riff_chunk(b"LIST", b"PROJ" + _riff_chunk(b"BNKI", b"\x00" * 4))
+    for fsb in fsbs:
+        data_offset = len(out) + 8
+        padding = 0x20 - data_offset % 0x20
+        out += _riff_chunk(b"SND ", b"\x00" * padding + fsb)
+    out[4:8] = pack("<I", len(out) - 8)
+    return bytes(out)
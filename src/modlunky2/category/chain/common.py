@@ -166,8 +166,7 @@ class ChainMixin:
             if companion_items is None:
                 continue
 
-            for item_uid in companion_items:
-                item = game_state.instance_id_to_pointer.get(item_uid)
+            for item in game_state.instance_id_to_pointer.get_many(companion_items):
                 if item is None:
                     continue
                 if item.value.type.id is item_type:
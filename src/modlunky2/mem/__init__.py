@@ -15,6 +15,7 @@ from modlunky2.mem.state import State
 from modlunky2.mem.memrauder.model import (
     MemoryReader,
     MemContext,
+    PageCachingReader,
 )
 
 VirtualQueryEx = ctypes.windll.kernel32.VirtualQueryEx
@@ -138,7 +139,9 @@ class Spel2Process:
     def __init__(self, proc_handle):
         self.proc_handle = proc_handle
         self._feedcode = None
-        self.mem_ctx = MemContext(Spel2Reader(self))
+        # Reset by get_state(), so each poll sees one snapshot of the game
+        self.page_cache = PageCachingReader(Spel2Reader(self))
+        self.mem_ctx = MemContext(self.page_cache, lazy=True)
 
     @classmethod
     def from_pid(cls, pid):
@@ -263,4 +266,5 @@ class Spel2Process:
 
     def get_state(self) -> Optional[State]:
         addr = self.get_feedcode() - 0x5F
+        self.page_cache.new_snapshot()
         return self.mem_ctx.type_at_addr(State, addr)
@@ -3,6 +3,9 @@ from abc import ABC, abstractmethod
 import ctypes
 from dataclasses import InitVar, dataclass
 import dataclasses
+import enum
+from functools import lru_cache
+import struct
 from types import MappingProxyType
 from typing import (
     Any,
@@ -10,8 +13,11 @@ from typing import (
     ClassVar,
     Dict,
     Generic,
+    Iterable,
+    List,
     Mapping,
     Optional,
+    Sequence,
     Tuple,
     Type,
     TypeVar,
@@ -27,6 +33,11 @@ class MemoryReader(ABC):
     def read(self, addr: int, size: int) -> Optional[bytes]:
         raise NotImplementedError()
 
+    # Hint that ranges, as (addr, size), are about to be read. Readers that
+    # cache may fetch them together up front.
+    def prefetch(self, ranges: Iterable[Tuple[int, int]]):
+        pass
+
 
 # Memory backed by a bytes object. Intended for testing.
 @dataclass(frozen=True)
@@ -43,6 +54,146 @@ class BytesReader(MemoryReader):
 _EMPTY_BYTES_READER = BytesReader(bytes())
 
 
+@dataclass(frozen=True)
+class PageCacheStats:
+    # Calls to read(). A hit needed no pages that weren't already cached
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    # Calls to the wrapped reader, and the bytes they returned
+    reads: int = 0
+    bytes_read: int = 0
+
+    def since(self, earlier: PageCacheStats) -> PageCacheStats:
+        return PageCacheStats(
+            requests=self.requests - earlier.requests,
+            hits=self.hits - earlier.hits,
+            misses=self.misses - earlier.misses,
+            reads=self.reads - earlier.reads,
+            bytes_read=self.bytes_read - earlier.bytes_read,
+        )
+
+    def __str__(self):
+        return (
+            f"{self.requests} requests ({self.hits} hits, {self.misses} misses),"
+            f" {self.reads} reads of {self.bytes_read} bytes"
+        )
+
+
+# Serves reads from whole pages, each read from mem_reader once per snapshot.
+#
+# Adjacent missing pages are read together. Reads spanning more than
+# max_read_pages skip the cache. Call new_snapshot() to drop the cached pages,
+# e.g. before each poll. Not thread-safe.
+#
+# The wrapped reader must fail the same way for every byte of a page, as
+# process memory does.
+class PageCachingReader(MemoryReader):
+    def __init__(
+        self,
+        mem_reader: MemoryReader,
+        page_size: int = 0x1000,
+        max_read_pages: int = 64,
+    ):
+        if page_size & (page_size - 1):
+            raise ValueError(f"page size {page_size} isn't a power of 2")
+        self.mem_reader = mem_reader
+        self.page_size = page_size
+        self.max_read_pages = max_read_pages
+        self._shift = page_size.bit_length() - 1
+        self._pages: Dict[int, bytes] = {}
+        self._requests = 0
+        self._hits = 0
+        self._misses = 0
+        self._reads = 0
+        self._bytes_read = 0
+
+    def new_snapshot(self):
+        self._pages.clear()
+
+    def stats(self) -> PageCacheStats:
+        return PageCacheStats(
+            requests=self._requests,
+            hits=self._hits,
+            misses=self._misses,
+            reads=self._reads,
+            bytes_read=self._bytes_read,
+        )
+
+    def _read_through(self, addr: int, size: int) -> Optional[bytes]:
+        data = self.mem_reader.read(addr, size)
+        self._reads += 1
+        if data is not None:
+            self._bytes_read += len(data)
+        return data
+
+    # Reads runs of consecutive pages. Returns False if any failed.
+    def _fetch(self, page_numbers: List[int]) -> bool:
+        fetched = True
+        run_start = 0
+        for i, page in enumerate(page_numbers):
+            end_of_run = (
+                i + 1 == len(page_numbers)
+                or page_numbers[i + 1] != page + 1
+                or i + 1 - run_start == self.max_read_pages
+            )
+            if not end_of_run:
+                continue
+
+            first_page = page_numbers[run_start]
+            num_pages = i + 1 - run_start
+            run_start = i + 1
+            data = self._read_through(
+                first_page << self._shift, num_pages << self._shift
+            )
+            if data is None:
+                fetched = False
+                continue
+            for j in range(num_pages):
+                offset = j << self._shift
+                self._pages[first_page + j] = data[offset : offset + self.page_size]
+        return fetched
+
+    def _missing_pages(self, addr: int, size: int) -> List[int]:
+        first_page = addr >> self._shift
+        last_page = (addr + size - 1) >> self._shift
+        return [
+            page for page in range(first_page, last_page + 1) if page not in self._pages
+        ]
+
+    # Fetches the pages for all of ranges, as (addr, size), ahead of reading
+    # them. Pages in different ranges are read together if they're adjacent.
+    def prefetch(self, ranges: Iterable[Tuple[int, int]]):
+        missing = set()
+        for addr, size in ranges:
+            if 0 < size <= self.max_read_pages << self._shift:
+                missing.update(self._missing_pages(addr, size))
+        self._fetch(sorted(missing))
+
+    def read(self, addr: int, size: int) -> Optional[bytes]:
+        self._requests += 1
+        if size <= 0 or size > self.max_read_pages << self._shift:
+            self._misses += 1
+            return self._read_through(addr, size)
+
+        missing = self._missing_pages(addr, size)
+        if missing:
+            self._misses += 1
+            if not self._fetch(missing):
+                return None
+        else:
+            self._hits += 1
+
+        first_page = addr >> self._shift
+        offset = addr - (first_page << self._shift)
+        if offset + size <= self.page_size:
+            return self._pages[first_page][offset : offset + size]
+
+        last_page = (addr + size - 1) >> self._shift
+        data = b"".join(self._pages[page] for page in range(first_page, last_page + 1))
+        return data[offset : offset + size]
+
+
 T = TypeVar("T")  # pylint: disable=invalid-name
 
 
@@ -86,9 +237,14 @@ class BiMemType(MemType[T]):
 # MemContext automatically creates, and caches, DataclassStruct instances.
 # It also holds a MemoryReader to simplify usage of both DataclassStruct
 # and PolyPointer.
+#
+# If lazy is set, dataclasses are returned as lazy views (see
+# lazy_view_class()). Their non-scalar fields are decoded, and pointers
+# followed, when first accessed rather than up front.
 @dataclass
 class MemContext:
     mem_reader: MemoryReader = _EMPTY_BYTES_READER
+    lazy: bool = False
     _type_map: Dict[type, DataclassStruct] = dataclasses.field(
         default_factory=dict, compare=False, repr=False
     )
@@ -262,6 +418,13 @@ class DataclassStruct(MemType[T]):
     dataclass: Type[T]
 
     struct_fields: Dict[str, _StructField] = dataclasses.field(init=False)
+    _compiled_from_bytes: Callable[[bytes, MemContext], T] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    _compiled_lazy_view: Callable[[bytes, MemContext], T] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    _size: int = dataclasses.field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not dataclasses.is_dataclass(self.dataclass):
@@ -283,6 +446,9 @@ class DataclassStruct(MemType[T]):
         # TODO search for dataclasses in MRO and check that our offsets don't overlap
 
         object.__setattr__(self, "struct_fields", struct_fields)
+        object.__setattr__(self, "_compiled_from_bytes", self._compile(lazy=False))
+        object.__setattr__(self, "_compiled_lazy_view", self._compile(lazy=True))
+        object.__setattr__(self, "_size", self.field_size())
 
     def field_size(self) -> int:
         upper = 0
@@ -301,18 +467,101 @@ class DataclassStruct(MemType[T]):
                 f"{self.dataclass} must have _size_as_element_ attribute to be used in array field"
             )
 
+    # Generates a from_bytes() equivalent for this dataclass.
+    #
+    # Scalar fields that don't overlap are unpacked by one struct.Struct, and
+    # only converted if their py_type isn't the plain Python type. The rest are
+    # decoded by their own MemType. The dataclass is then constructed with
+    # keyword arguments, without building a dict.
+    #
+    # If lazy, the unpacked scalars are put straight into a lazy view instead,
+    # and the rest are left for it to decode on access.
+    def _compile(self, lazy: bool) -> Callable[[bytes, MemContext], T]:
+        scalars = []
+        for name, meta in self.struct_fields.items():
+            mem_type = meta.mem_type
+            if isinstance(mem_type, ScalarCType) and mem_type.struct_format:
+                scalars.append((meta.offset, name, mem_type))
+        scalars.sort(key=lambda s: s[0])
+
+        namespace = {"cls": self.dataclass}
+        lines = []
+        args = {}
+        fmt = "="
+        packed_names = []
+        start = scalars[0][0] if scalars else 0
+        end = start
+        for offset, name, mem_type in scalars:
+            if offset < end:
+                continue
+            var = f"v{len(packed_names)}"
+            fmt += "x" * (offset - end) + mem_type.struct_format
+            end = offset + mem_type.field_size()
+            packed_names.append(var)
+            if mem_type.py_type in (bool, int, float):
+                args[name] = var
+            else:
+                namespace[f"conv_{var}"] = mem_type.py_type
+                args[name] = f"conv_{var}({var})"
+
+        if packed_names:
+            namespace["unpack_from"] = struct.Struct(fmt).unpack_from
+            lines.append(f"({', '.join(packed_names)},) = unpack_from(buf, {start})")
+
+        if lazy:
+            namespace["cls"] = lazy_view_class(self.dataclass)
+            namespace["new"] = object.__new__
+            namespace["dc_struct"] = self
+            lines.append("obj = new(cls)")
+            lines.append(
+                "obj.__dict__.update({"
+                + "".join(f"{name!r}: {value}, " for name, value in args.items())
+                + f"{_LAZY_VIEW_KEY!r}: (dc_struct, buf, mem_ctx)"
+                + "})"
+            )
+            lines.append("return obj")
+        else:
+            for i, (name, meta) in enumerate(self.struct_fields.items()):
+                if name in args:
+                    continue
+                namespace[f"mem_type_{i}"] = meta.mem_type
+                upper = meta.offset + meta.field_size
+                args[
+                    name
+                ] = f"mem_type_{i}.from_bytes(buf[{meta.offset}:{upper}], mem_ctx)"
+
+            lines.append(
+                "return cls("
+                + ", ".join(f"{name}={args[name]}" for name in self.struct_fields)
+                + ")"
+            )
+        source = "def from_bytes(buf, mem_ctx):\n" + "".join(
+            f"    {line}\n" for line in lines
+        )
+        exec(source, namespace)  # pylint: disable=exec-used
+        return namespace["from_bytes"]
+
     def from_bytes(self, buf: bytes, mem_ctx: MemContext) -> T:
+        # A short buffer would only fail when a lazy field is accessed. Decode
+        # eagerly instead, so it fails now.
+        if mem_ctx.lazy and len(buf) >= self._size:
+            decode = self._compiled_lazy_view
+        else:
+            decode = self._compiled_from_bytes
+        try:
+            return decode(buf, mem_ctx)
+        except Exception:  # pylint: disable=broad-except
+            # The compiled decoder can't say which field failed. Decode again
+            # field-by-field to raise the same error it would have.
+            pass
+        return self.from_bytes_interpreted(buf, mem_ctx)
+
+    # Decodes each field in turn. Slower than from_bytes(), but the reference
+    # for what it should return.
+    def from_bytes_interpreted(self, buf: bytes, mem_ctx: MemContext) -> T:
         field_data = {}
-        for name, meta in self.struct_fields.items():
-            upper = meta.offset + meta.field_size
-            view = buf[meta.offset : upper]
-            try:
-                field_data[name] = meta.mem_type.from_bytes(view, mem_ctx)
-            except ScalarCValueConstructionError:
-                # If we failed to convert a leaf value, abandon building the object but re-raise the exception
-                raise
-            except Exception as err:
-                raise ValueError(f"failed to get value for field {meta.path}") from err
+        for name in self.struct_fields:
+            field_data[name] = self.field_from_bytes(name, buf, mem_ctx)
 
         try:
             return self.dataclass(**field_data)
@@ -321,6 +570,91 @@ class DataclassStruct(MemType[T]):
                 f"failed to construct value for field {self.path}"
             ) from err
 
+    # Decodes a single field from the bytes of the whole struct.
+    def field_from_bytes(self, name: str, buf: bytes, mem_ctx: MemContext) -> Any:
+        meta = self.struct_fields[name]
+        upper = meta.offset + meta.field_size
+        view = buf[meta.offset : upper]
+        try:
+            return meta.mem_type.from_bytes(view, mem_ctx)
+        except ScalarCValueConstructionError:
+            # If we failed to convert a leaf value, abandon building the object but re-raise the exception
+            raise
+        except Exception as err:
+            raise ValueError(f"failed to get value for field {meta.path}") from err
+
+
+# Where a lazy view keeps its DataclassStruct, buffer and MemContext
+_LAZY_VIEW_KEY = "_ml2_lazy_view_"
+
+
+_NO_DEFAULT = object()
+
+
+class _LazyField:
+    def __init__(self, name: str, default: Any):
+        self.name = name
+        self.default = default
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            # Accessed on the class, same as the dataclass's default value
+            if self.default is _NO_DEFAULT:
+                raise AttributeError(self.name)
+            return self.default
+
+        dc_struct, buf, mem_ctx = obj.__dict__[_LAZY_VIEW_KEY]
+        value = dc_struct.field_from_bytes(self.name, buf, mem_ctx)
+        # The instance attribute takes precedence over this from now on
+        obj.__dict__[self.name] = value
+        return value
+
+
+def _lazy_eq(self, other):
+    if view_base_class(type(other)) is not view_base_class(type(self)):
+        return NotImplemented
+    names = [field.name for field in dataclasses.fields(self)]
+    return tuple(getattr(self, n) for n in names) == tuple(
+        getattr(other, n) for n in names
+    )
+
+
+_LAZY_VIEW_CLASSES: Dict[type, type] = {}
+
+
+# Returns a subclass of cls for lazy views of it.
+#
+# Views are created without calling __init__ or __post_init__. Each field not
+# set at creation is decoded from the view's buffer when it's first accessed,
+# then stored as an ordinary instance attribute. Views compare equal to
+# instances of cls with the same field values, and repr() the same way.
+def lazy_view_class(cls: type) -> type:
+    view_class = _LAZY_VIEW_CLASSES.get(cls)
+    if view_class is not None:
+        return view_class
+
+    namespace = {
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "_lazy_view_of_": cls,
+    }
+    for field in dataclasses.fields(cls):
+        namespace[field.name] = _LazyField(
+            field.name, getattr(cls, field.name, _NO_DEFAULT)
+        )
+    if cls.__dataclass_params__.eq:  # pylint: disable=no-member
+        namespace["__eq__"] = _lazy_eq
+        namespace["__hash__"] = cls.__hash__
+
+    view_class = type(cls.__name__, (cls,), namespace)
+    _LAZY_VIEW_CLASSES[cls] = view_class
+    return view_class
+
+
+# Returns the dataclass a lazy view class is a view of, or cls if it isn't one.
+def view_base_class(cls: type) -> type:
+    return cls.__dict__.get("_lazy_view_of_", cls)
+
 
 def _build_allowed_c_types():
     pair_list = [(ctypes.c_bool, bool)]
@@ -346,6 +680,32 @@ def _build_allowed_c_types():
     return tuple(pair_list)
 
 
+# Format characters for struct.unpack() that give the same value as ctypes.
+# c_longdouble has no equivalent.
+def _build_struct_formats():
+    pointer_format = "Q" if ctypes.sizeof(ctypes.c_void_p) == 8 else "I"
+    return (
+        (ctypes.c_bool, "?"),
+        (ctypes.c_int8, "b"),
+        (ctypes.c_uint8, "B"),
+        (ctypes.c_int16, "h"),
+        (ctypes.c_uint16, "H"),
+        (ctypes.c_int32, "i"),
+        (ctypes.c_uint32, "I"),
+        (ctypes.c_int64, "q"),
+        (ctypes.c_uint64, "Q"),
+        (ctypes.c_void_p, pointer_format),
+        (ctypes.c_float, "f"),
+        (ctypes.c_double, "d"),
+    )
+
+
+# A struct that unpacks count consecutive values with format in one call
+@lru_cache(maxsize=256)
+def scalar_array_struct(struct_format: str, count: int) -> struct.Struct:
+    return struct.Struct(f"={count}{struct_format}")
+
+
 @dataclass(frozen=True)
 class ScalarCValueConstructionError(Exception):
     path: FieldPath
@@ -361,8 +721,14 @@ class ScalarCType(BiMemType[T]):
     py_type: Type[T]
     c_type: type
 
+    # Empty if the value can't be unpacked by struct
+    struct_format: str = dataclasses.field(init=False, repr=False, compare=False)
+    # Enum members by value, to avoid calling the enum for each array element
+    _members: Dict[Any, Any] = dataclasses.field(init=False, repr=False, compare=False)
+
     # Dict doesn't work correctly, presumably c_foo isn't hashable
     _allowed_c_types: ClassVar[Tuple[Tuple[type, type]]] = _build_allowed_c_types()
+    _struct_formats: ClassVar[Tuple[Tuple[type, str]]] = _build_struct_formats()
 
     def __post_init__(self):
         expected_type = None
@@ -383,9 +749,47 @@ class ScalarCType(BiMemType[T]):
                 f"field {self.path}: {self.py_type} must be a subtype of {expected_type}"
             )
 
+        struct_format = ""
+        for known_c_type, known_format in self._struct_formats:
+            if known_c_type is self.c_type:
+                struct_format = known_format
+                break
+        object.__setattr__(self, "struct_format", struct_format)
+
+        members = {}
+        if issubclass(self.py_type, enum.Enum):
+            members = {
+                member.value: member for member in self.py_type.__members__.values()
+            }
+        object.__setattr__(self, "_members", members)
+
     def field_size(self) -> int:
         return ctypes.sizeof(self.c_type)
 
+    # Converts values unpacked with struct_format the same way from_bytes()
+    # converts the C value.
+    def from_unpacked(self, values: Tuple) -> Sequence[T]:
+        if self.py_type in (bool, int, float):
+            return values
+
+        members = self._members
+        try:
+            return [members[value] for value in values]
+        except KeyError:
+            pass
+
+        # Not an enum, or a value that isn't a single member (e.g. combined flags)
+        converted = []
+        for value in values:
+            member = members.get(value)
+            if member is None:
+                try:
+                    member = self.py_type(value)
+                except Exception as err:
+                    raise ScalarCValueConstructionError(self.path, value) from err
+            converted.append(member)
+        return converted
+
     def from_bytes(self, buf: bytes, mem_ctx: MemContext) -> T:
         try:
             mem_value = self.c_type.from_buffer_copy(buf).value
@@ -423,19 +827,34 @@ class Array(MemType[T]):
     elem_mem_type: MemType = dataclasses.field(init=False)
     _total_field_size: int = dataclasses.field(init=False)
     collection_type: T = dataclasses.field(init=False)
+    # Set if the elements are scalars that struct can unpack all at once
+    _scalar_struct: Optional[struct.Struct] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
 
     def __post_init__(self, py_type, deferred_elem_mem_type):
         collection_type, elem_py_type = unwrap_collection_type(self.path, py_type)
         elem_mem_type = deferred_elem_mem_type(self.path, elem_py_type)
         total_field_size = elem_mem_type.element_size() * self.count
+        scalar_struct = None
+        if isinstance(elem_mem_type, ScalarCType) and elem_mem_type.struct_format:
+            scalar_struct = scalar_array_struct(elem_mem_type.struct_format, self.count)
         object.__setattr__(self, "elem_mem_type", elem_mem_type)
         object.__setattr__(self, "_total_field_size", total_field_size)
         object.__setattr__(self, "collection_type", collection_type)
+        object.__setattr__(self, "_scalar_struct", scalar_struct)
 
     def field_size(self) -> int:
         return self._total_field_size
 
     def from_bytes(self, buf: bytes, mem_ctx: MemContext) -> T:
+        if self._scalar_struct is not None:
+            try:
+                values = self._scalar_struct.unpack_from(buf)
+            except struct.error as err:
+                raise ValueError(f"failed to deserialize field {self.path}") from err
+            return self.collection_type(self.elem_mem_type.from_unpacked(values))
+
         values = []
         elem_size = self.elem_mem_type.element_size()
         for i in range(0, self.count):
@@ -512,7 +931,7 @@ class PolyPointer(Generic[T]):
         if isinstance(self.value, cls):
             return self.value
 
-        value_type = type(self.value)
+        value_type = view_base_class(type(self.value))
         if not issubclass(cls, value_type):
             raise TypeError("Trying to cast {value_type} to unrelated class {cls}")
 
@@ -592,3 +1011,6 @@ class DictMap((Generic[K, V])):
             return None
 
         return self.mapping[key]
+
+    def get_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        return [self.get(key) for key in keys]
@@ -15,7 +15,9 @@ from modlunky2.mem.memrauder.model import (
     FieldPath,
     MemContext,
     MemType,
+    ScalarCType,
     ScalarCValueConstructionError,
+    scalar_array_struct,
     unwrap_optional_type,
     unwrap_collection_type,
 )
@@ -71,6 +73,15 @@ class Vector(MemType[T]):
         if elem_buf is None:
             return None
 
+        if (
+            isinstance(self.elem_mem_type, ScalarCType)
+            and self.elem_mem_type.struct_format
+        ):
+            values = scalar_array_struct(
+                self.elem_mem_type.struct_format, vector_meta.size
+            ).unpack_from(elem_buf)
+            return self.collection_type(self.elem_mem_type.from_unpacked(values))
+
         values = []
         for i in range(0, vector_meta.size):
             elem_offset = elem_size * i
@@ -1,7 +1,8 @@
 from dataclasses import InitVar, dataclass
 import dataclasses
 import logging
-from typing import ClassVar, Optional
+import struct
+from typing import ClassVar, Dict, Iterable, List, Optional, Tuple
 
 from modlunky2.mem.entities import Entity
 from modlunky2.mem.memrauder.model import (
@@ -39,6 +40,19 @@ class _RobinHoodTableEntry:
     SIZE: ClassVar[int] = 16
 
 
+# hashed_key and entity_addr, for unpacking many entries at once
+_TABLE_ENTRY_STRUCT = struct.Struct("<I4xQ")
+
+# Entries read from a uid's starting index by get_many(). Most probes are short.
+_PROBE_WINDOW = 8
+# Windows this many entries apart, or less, are read together
+_PROBE_WINDOW_GAP = 32
+
+# Entities this many bytes apart, or less, are read together by get_many()
+_ENTITY_READ_GAP = 0x100
+_MAX_ENTITY_READ = 0x10000
+
+
 # This is the hash function used in version 1.25.2 .
 # The name comes from the apparent source https://github.com/skeeto/hash-prospector
 def _lowbias32(x: int):  # pylint: disable=invalid-name
@@ -135,6 +149,149 @@ class UidEntityMap:
 
         return PolyPointer[Entity](addr, entity, self.mem_ctx)
 
+    # Reads table entries [start, start + count), which must not wrap.
+    def _read_table_entries(
+        self, start: int, count: int, entries: Dict[int, Tuple[int, int]]
+    ):
+        entry_size = _RobinHoodTableEntry.SIZE
+        buf = self.mem_ctx.mem_reader.read(
+            self.meta.table_ptr + start * entry_size, count * entry_size
+        )
+        if buf is None:
+            return
+        for i, entry in enumerate(_TABLE_ENTRY_STRUCT.iter_unpack(buf)):
+            entries[start + i] = entry
+
+    # Reads windows of entries starting at each index, joining nearby ones.
+    def _read_probe_windows(
+        self, indexes: Iterable[int], entries: Dict[int, Tuple[int, int]]
+    ):
+        table_size = self.meta.mask + 1
+        windows = []
+        for index in indexes:
+            end = index + _PROBE_WINDOW
+            if end > table_size:
+                windows.append((index, table_size))
+                windows.append((0, end - table_size))
+            else:
+                windows.append((index, end))
+        windows.sort()
+
+        runs = []
+        for start, end in windows:
+            if runs and start <= runs[-1][1] + _PROBE_WINDOW_GAP:
+                runs[-1][1] = max(runs[-1][1], end)
+            else:
+                runs.append([start, end])
+
+        entry_size = _RobinHoodTableEntry.SIZE
+        self.mem_ctx.mem_reader.prefetch(
+            (self.meta.table_ptr + start * entry_size, (end - start) * entry_size)
+            for start, end in runs
+        )
+        for start, end in runs:
+            self._read_table_entries(start, end - start, entries)
+
+    # Same as _get_addr() for each uid, but reads the table in windows.
+    def _get_addrs(self, uids: List[int]) -> List[int]:
+        mask = self.meta.mask
+        entries: Dict[int, Tuple[int, int]] = {}
+        target_keys = [_lowbias32(uid + 1) for uid in uids]
+        self._read_probe_windows((key & mask for key in target_keys), entries)
+
+        addrs = []
+        for target_key in target_keys:
+            addr = 0
+            cur_index = target_key & mask
+            while True:
+                entry = entries.get(cur_index)
+                if entry is None:
+                    self._read_probe_windows([cur_index], entries)
+                    entry = entries.get(cur_index)
+                    if entry is None:
+                        # Reading the bytes for the entry failed.
+                        break
+
+                hashed_key, entity_addr = entry
+                if hashed_key == target_key:
+                    addr = entity_addr
+                    break
+                if hashed_key == 0:
+                    break
+                target_psl = (cur_index - target_key) & mask
+                entry_psl = (cur_index - hashed_key) & mask
+                if target_psl > entry_psl:
+                    break
+
+                cur_index = (cur_index + 1) & mask
+            addrs.append(addr)
+        return addrs
+
+    # Reads the Entity at each address, joining reads of nearby ones.
+    def _read_entities(self, addrs: Iterable[int]) -> Dict[int, Optional[Entity]]:
+        mem_reader = self.mem_ctx.mem_reader
+        mem_type = self.mem_ctx.get_mem_type(Entity)
+        entity_size = mem_type.field_size()
+        entities = {}
+
+        def read_run(run: List[int]):
+            start = run[0]
+            buf = mem_reader.read(start, run[-1] + entity_size - start)
+            for addr in run:
+                if buf is None:
+                    entities[addr] = self.mem_ctx.type_at_addr(Entity, addr)
+                else:
+                    offset = addr - start
+                    entities[addr] = mem_type.from_bytes(
+                        buf[offset : offset + entity_size], self.mem_ctx
+                    )
+
+        runs: List[List[int]] = []
+        for addr in sorted(set(addrs)):
+            if not runs or (
+                addr > runs[-1][-1] + entity_size + _ENTITY_READ_GAP
+                or addr + entity_size - runs[-1][0] > _MAX_ENTITY_READ
+            ):
+                runs.append([])
+            runs[-1].append(addr)
+
+        mem_reader.prefetch((run[0], run[-1] + entity_size - run[0]) for run in runs)
+        for run in runs:
+            read_run(run)
+        return entities
+
+    def get_many(self, uids: Iterable[int]) -> List[Optional[PolyPointer[Entity]]]:
+        """Same as get() for each of uids, in the same order.
+
+        Table entries and entities are read in as few calls as possible.
+        """
+        uids = list(uids)
+        if self.meta.table_ptr == 0:
+            return [None] * len(uids)
+
+        # -1 is used as a null-like value
+        lookup_uids = [uid for uid in uids if uid != -1]
+        addrs = dict(zip(lookup_uids, self._get_addrs(lookup_uids)))
+        entities = self._read_entities(addr for addr in addrs.values() if addr != 0)
+
+        found = []
+        for uid in uids:
+            addr = addrs.get(uid, 0)
+            entity = entities.get(addr) if addr != 0 else None
+            if entity is None:
+                found.append(None)
+                continue
+            if entity.uid != uid:
+                logger.warning(
+                    "Entity lookup failed with ID mismatch. Expected %d, got %d",
+                    uid,
+                    entity.uid,
+                )
+                found.append(None)
+                continue
+            found.append(PolyPointer[Entity](addr, entity, self.mem_ctx))
+        return found
+
 
 @dataclass(frozen=True)
 class UidEntityMapType(MemType[UidEntityMap]):
@@ -1,9 +1,20 @@
 from dataclasses import dataclass
 import dataclasses
-from typing import ClassVar, Dict, Iterable, List, Tuple
+import struct
+from typing import ClassVar, Dict, Iterable, List, Optional, Tuple
 
 from modlunky2.mem.entities import Entity, EntityDBEntry, EntityType
-from modlunky2.mem.memrauder.model import DictMap, MemContext, PolyPointer
+from modlunky2.mem.memrauder.model import (
+    DictMap,
+    FieldPath,
+    MemContext,
+    PolyPointer,
+)
+from modlunky2.mem.memrauder.spelunky2 import (
+    UidEntityMap,
+    UidEntityMapType,
+    _lowbias32,
+)
 
 
 def poly_pointer_no_mem(value):
@@ -47,3 +58,67 @@ class EntityMapBuilder:
 
     def build(self):
         return DictMap(self.entity_map)
+
+
+# Lays out a UidEntityMap's Robin Hood table, and the entities it points to,
+# the way the game does. Entities only have their uid and type set.
+@dataclass
+class UidEntityMapSlabBuilder:
+    mask: int = 0xFF
+    entity_types: Dict[int, EntityType] = dataclasses.field(default_factory=dict)
+
+    META_ADDR: ClassVar[int] = 0x0
+    TABLE_ADDR: ClassVar[int] = 0x1000
+    ENTITY_SIZE: ClassVar[int] = 0x100
+
+    def add_entity(self, uid: int, entity_type: EntityType):
+        self.entity_types[uid] = entity_type
+
+    def _table(self, entity_addrs: Dict[int, int]) -> List[Optional[Tuple[int, int]]]:
+        table = [None] * (self.mask + 1)
+        for uid, addr in entity_addrs.items():
+            entry = (_lowbias32(uid + 1), addr)
+            index = entry[0] & self.mask
+            while True:
+                if table[index] is None:
+                    table[index] = entry
+                    break
+                # Take the place of entries closer to their starting index
+                entry_psl = (index - entry[0]) & self.mask
+                other_psl = (index - table[index][0]) & self.mask
+                if entry_psl > other_psl:
+                    table[index], entry = entry, table[index]
+                index = (index + 1) & self.mask
+        return table
+
+    def build_slab(self) -> bytes:
+        table_size = (self.mask + 1) * 16
+        db_addr = self.TABLE_ADDR + table_size
+        type_addrs = {}
+        for entity_type in sorted(set(self.entity_types.values())):
+            type_addrs[entity_type] = db_addr + len(type_addrs) * 0x100
+        first_entity_addr = db_addr + len(type_addrs) * 0x100
+        entity_addrs = {
+            uid: first_entity_addr + i * self.ENTITY_SIZE
+            for i, uid in enumerate(self.entity_types)
+        }
+
+        slab = bytearray(first_entity_addr + len(entity_addrs) * self.ENTITY_SIZE)
+        struct.pack_into("<QQ", slab, self.META_ADDR, self.mask, self.TABLE_ADDR)
+        for index, entry in enumerate(self._table(entity_addrs)):
+            if entry is not None:
+                struct.pack_into("<I4xQ", slab, self.TABLE_ADDR + index * 16, *entry)
+        for entity_type, addr in type_addrs.items():
+            struct.pack_into("<I", slab, addr + 0x14, entity_type)
+        for uid, addr in entity_addrs.items():
+            struct.pack_into(
+                "<Q", slab, addr + 0x08, type_addrs[self.entity_types[uid]]
+            )
+            struct.pack_into("<I", slab, addr + 0x38, uid)
+        return bytes(slab)
+
+    # Reads the map from a slab made by build_slab()
+    def build_map(self, mem_ctx: MemContext) -> UidEntityMap:
+        map_type = UidEntityMapType(FieldPath(), UidEntityMap)
+        buf = mem_ctx.mem_reader.read(self.META_ADDR, map_type.field_size())
+        return map_type.from_bytes(buf, mem_ctx)
@@ -0,0 +1,241 @@
+"""Index of where every sprite SpelunkySpriteFetcher can return lives.
+
+Building it means creating a loader for every sheet the fetcher knows
+about. The index is saved next to the extracted assets, so afterwards the
+fetcher only reads one small file and looks names up in dicts.
+"""
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from modlunky2.constants import BASE_DIR
+from modlunky2.sprites.base_classes import (
+    AbstractBiome,
+    BaseJsonSpriteLoader,
+    BaseSpriteLoader,
+)
+from modlunky2.sprites.tilecode_extras import EXTRA_TILECODE_CLASSES
+from modlunky2.version import current_version
+
+logger = logging.getLogger(__name__)
+
+ATLAS_INDEX_FILENAME = ".sprite-atlas-index.json"
+
+# Index into AtlasIndex.sheets, and the box to crop from that sheet
+AtlasEntry = Tuple[int, Tuple[int, int, int, int]]
+
+
+def make_non_biome_sheets(base_path: Path) -> List[BaseSpriteLoader]:
+    # pylint: disable=import-outside-toplevel
+    from modlunky2.sprites import monsters
+    from modlunky2.sprites.items import ItemSheet
+    from modlunky2.sprites.coffins import CoffinSheet
+    from modlunky2.sprites.deco_extra import DecoExtraSheet
+    from modlunky2.sprites.base_eggship2 import EggShip2Sheet
+    from modlunky2.sprites.hud import HudSheet
+    from modlunky2.sprites.floormisc import FloorMiscSheet
+    from modlunky2.sprites.tilecode_extras import TilecodeExtras
+
+    # Gather all of the sheets in a list, these are the classes, not instances yet
+    _sheets = [getattr(monsters, m) for m in monsters.__all__]
+    _sheets.extend(
+        [
+            CoffinSheet,
+            EggShip2Sheet,
+            ItemSheet,
+            HudSheet,
+            FloorMiscSheet,
+            DecoExtraSheet,
+        ]
+    )
+
+    # Now making them instances
+    sheets = []
+    for sheet in _sheets:
+        if issubclass(sheet, BaseJsonSpriteLoader):
+            sheets.append(sheet(None, None, base_path))
+        else:
+            sheets.append(sheet(base_path))
+
+    # These uses the constant BASE_DIR as the base path as this
+    # texture is bundled with the source rather than coming
+    # from the extracted assets.
+    sheets.append(TilecodeExtras(BASE_DIR))
+    for class_ in EXTRA_TILECODE_CLASSES:
+        sheets.append(class_(BASE_DIR))
+    return sheets
+
+
+def make_biomes(base_path: Path) -> Dict[str, AbstractBiome]:
+    from modlunky2.sprites import biomes  # pylint: disable=import-outside-toplevel
+
+    return {
+        getattr(biomes, b).biome_name: getattr(biomes, b)(base_path)
+        for b in biomes.__all__
+    }
+
+
+@dataclass(frozen=True)
+class AtlasSheet:
+    # Relative to the extracted assets, or to BASE_DIR if bundled
+    path: str
+    bundled: bool
+    mtime_ns: int
+
+    def full_path(self, base_path: Path) -> Path:
+        return (BASE_DIR if self.bundled else base_path) / self.path
+
+
+class AtlasIndex:
+    """Where `SpelunkySpriteFetcher.get` finds each sprite.
+
+    `non_biome` is checked first, then the requested biome in `biomes`, then
+    `fallback`, which has each biome sprite from the first biome that has it.
+    """
+
+    # Bump when the format changes
+    VERSION = 1
+
+    def __init__(
+        self,
+        sheets: List[AtlasSheet],
+        non_biome: Dict[str, AtlasEntry],
+        biomes: Dict[str, Dict[str, AtlasEntry]],
+        fallback: Dict[str, AtlasEntry],
+        modlunky_version: str,
+    ):
+        self.sheets = sheets
+        self.non_biome = non_biome
+        self.biomes = biomes
+        self.fallback = fallback
+        self.modlunky_version = modlunky_version
+
+    @classmethod
+    def build(cls, base_path: Path) -> "AtlasIndex":
+        """Index every sheet the fetcher uses under `base_path`.
+
+        Sheets are only opened, not decoded. Raises FileNotFoundError if any
+        are missing, same as the fetcher would.
+        """
+        sheets: List[AtlasSheet] = []
+        sheet_ids: Dict[Path, int] = {}
+
+        def entry(location) -> AtlasEntry:
+            sheet_path, bbox = location
+            sheet_id = sheet_ids.get(sheet_path)
+            if sheet_id is None:
+                try:
+                    rel_path = sheet_path.relative_to(base_path)
+                    bundled = False
+                except ValueError:
+                    rel_path = sheet_path.relative_to(BASE_DIR)
+                    bundled = True
+                sheet_id = sheet_ids[sheet_path] = len(sheets)
+                sheets.append(
+                    AtlasSheet(
+                        path=rel_path.as_posix(),
+                        bundled=bundled,
+                        mtime_ns=sheet_path.stat().st_mtime_ns,
+                    )
+                )
+            return sheet_id, bbox
+
+        non_biome = {}
+        # Later sheets win, same as the fetcher's key map
+        for sheet in make_non_biome_sheets(base_path):
+            for name in sheet.key_map():
+                non_biome[name] = entry(sheet.locate(name))
+
+        biomes = {}
+        fallback = {}
+        for biome_name, biome in make_biomes(base_path).items():
+            biome_entries = biomes[biome_name] = {}
+            # pylint: disable=protected-access
+            for name in biome._sheet_map:
+                biome_entries[name] = entry(biome.locate(name))
+                fallback.setdefault(name, biome_entries[name])
+
+        return cls(sheets, non_biome, biomes, fallback, str(current_version()))
+
+    def find(self, name: str, biome: str = "cave") -> Optional[AtlasEntry]:
+        found = self.non_biome.get(name)
+        if found is None:
+            found = self.biomes.get(biome, {}).get(name)
+        if found is None:
+            found = self.fallback.get(name)
+        return found
+
+    def is_current(self, base_path: Path) -> bool:
+        """Whether the index was built by this version from the sheets that
+        are there now."""
+        if self.modlunky_version != str(current_version()):
+            return False
+        for sheet in self.sheets:
+            try:
+                if sheet.full_path(base_path).stat().st_mtime_ns != sheet.mtime_ns:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def save(self, path: Path):
+        data = {
+            "version": self.VERSION,
+            "modlunky-version": self.modlunky_version,
+            "sheets": [
+                [sheet.path, sheet.bundled, sheet.mtime_ns] for sheet in self.sheets
+            ],
+            "non-biome": self.non_biome,
+            "biomes": self.biomes,
+            "fallback": self.fallback,
+        }
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as index_file:
+            json.dump(data, index_file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["AtlasIndex"]:
+        try:
+            with path.open("r", encoding="utf-8") as index_file:
+                data = json.load(index_file)
+            if data.get("version") != cls.VERSION:
+                return None
+
+            def entries(raw):
+                return {
+                    name: (sheet_id, tuple(bbox))
+                    for name, (sheet_id, bbox) in raw.items()
+                }
+
+            return cls(
+                sheets=[AtlasSheet(*sheet) for sheet in data["sheets"]],
+                non_biome=entries(data["non-biome"]),
+                biomes={biome: entries(raw) for biome, raw in data["biomes"].items()},
+                fallback=entries(data["fallback"]),
+                modlunky_version=data["modlunky-version"],
+            )
+        except FileNotFoundError:
+            return None
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Ignoring unreadable sprite atlas index %s", path)
+            return None
+
+    @classmethod
+    def load_or_build(cls, base_path: Path) -> "AtlasIndex":
+        """The index saved under `base_path`, rebuilding and saving it if it's
+        missing or out of date."""
+        index_path = base_path / ATLAS_INDEX_FILENAME
+        index = cls.load(index_path)
+        if index is not None and index.is_current(base_path):
+            return index
+
+        index = cls.build(base_path)
+        try:
+            index.save(index_path)
+        except OSError:
+            logger.warning("Failed to write sprite atlas index %s", index_path)
+        return index
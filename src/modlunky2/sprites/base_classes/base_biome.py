@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Optional, Type
+from typing import Dict, Optional, Tuple, Type
 
 from PIL import Image
 
@@ -106,3 +106,11 @@ class AbstractBiome(ABC):
             return None
         # this will either be the `get` method of the floor or deco sheet object
         return get_func(name)
+
+    def locate(self, name: str) -> Optional[Tuple[Path, Tuple[int, int, int, int]]]:
+        """The sheet `get` would crop `name` from, and the box it would crop."""
+        get_func = self._sheet_map.get(name)
+        if get_func is None:
+            return None
+        # Ask the sheet whose `get` this is
+        return get_func.__self__.locate(name)
@@ -1,39 +1,16 @@
 from abc import ABC, abstractmethod
-from functools import wraps
 from pathlib import Path
-from typing import Callable, Dict, Optional, Union
-from threading import Lock
+from typing import Callable, Dict, Optional, Tuple, Union
 
 from PIL import Image
 
+from modlunky2.sprites.base_classes.sheet_cache import SHEET_CACHE
 from modlunky2.sprites.base_classes.types import chunk_map_type
 
 _DEFAULT_BASE_PATH = Path(
     r"C:\Program Files (x86)\Steam\steamapps\common\Spelunky 2\Mods\Extracted"
 )
 
-_CACHED_NONE_SENTINEL = object()
-_CACHE_LOCK = Lock()
-
-
-def _cache_img_not_class(func):
-    """using this because functools.lrucache will keep the class object from getting
-    GCed if you are using it on a method"""
-
-    # noinspection PyProtectedMember
-    @wraps(func)
-    def cache_img(slf, name: str):
-        with _CACHE_LOCK:
-            img = slf._cache_dict.get(name)  # pylint: disable=protected-access
-            if not img:
-                img = func(slf, name) or _CACHED_NONE_SENTINEL
-                slf._cache_dict[name] = img  # pylint: disable=protected-access
-            if img is _CACHED_NONE_SENTINEL:
-                return None
-            return img
-
-    return cache_img
-
 
 class BaseSpriteLoader(ABC):
     @property
@@ -62,10 +39,22 @@ class BaseSpriteLoader(ABC):
 
     def __init__(self, base_path: Path = _DEFAULT_BASE_PATH):
         self.base_path = base_path
-        self._sprite_sheet = Image.open(self.base_path / self._sprite_sheet_path)
-        # This is to support the caching decorator and let it use storage on this class
-        # otherwise we get doofy global dicts for caching
-        self._cache_dict = {}
+        # Shared with every other loader of the same sheet, along with its crops
+        self._sheet = SHEET_CACHE.get(self.base_path / self._sprite_sheet_path)
+
+    @property
+    def _sprite_sheet(self) -> Image.Image:
+        return self._sheet.image
+
+    def _bbox(
+        self,
+        left: Union[int, float],
+        upper: Union[int, float],
+        right: Union[int, float],
+        lower: Union[int, float],
+    ) -> Tuple[int, int, int, int]:
+        # Rounded the same way Image.crop does
+        return tuple(round(x * self._chunk_size) for x in (left, upper, right, lower))
 
     def _get_block(
         self,
@@ -75,15 +64,24 @@ class BaseSpriteLoader(ABC):
         lower: Union[int, float],
     ) -> Image.Image:
         """Used to get chunks of the sprite sheet."""
-        bbox = tuple(map(lambda x: x * self._chunk_size, (left, upper, right, lower)))
-        return self._sprite_sheet.crop(bbox)
+        return self._sheet.crop(self._bbox(left, upper, right, lower))
 
-    @_cache_img_not_class
     def get(self, name: str) -> Optional[Image.Image]:
         coords = self._chunk_map.get(name)
         if coords:
             return self._get_block(*coords)
         return None
 
+    def locate(self, name: str) -> Optional[Tuple[Path, Tuple[int, int, int, int]]]:
+        """The sheet `get` would crop `name` from, and the box it would crop."""
+        coords = self._chunk_map.get(name)
+        if coords:
+            return self.base_path / self._sprite_sheet_path, self._bbox(*coords)
+        return None
+
+    def close(self):
+        """Let go of the sheet. It stays cached until SHEET_CACHE evicts it."""
+        self._sheet = None
+
     def key_map(self) -> Dict[str, Callable]:
         return {k: self.get for k in self._chunk_map}
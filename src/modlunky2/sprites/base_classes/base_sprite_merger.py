@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
+from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Type, Tuple
+from typing import Dict, List, Optional, Type, Tuple
 from logging import getLogger
 from PIL import Image, ImageDraw, ImageFont
 
@@ -17,6 +18,33 @@ _DEFAULT_BASE_PATH = Path(
 logger = getLogger("modlunky2")
 
 
+class Compositing(Enum):
+    # Paste each chunk and draw each grid rectangle straight onto the sheets
+    PER_CHUNK = "per-chunk"
+    # Paste runs of chunks that are contiguous in both the source and the
+    # target with one crop, from target boxes computed once per merger
+    BATCHED = "batched"
+
+
+def index_sprite_loaders(
+    sprite_loaders: List[BaseSpriteLoader],
+) -> Dict[Type[BaseSpriteLoader], BaseSpriteLoader]:
+    """Map every type each loader is an instance of to the first such loader."""
+    loaders_by_type = {}
+    for sprite_loader in sprite_loaders:
+        for loader_type in type(sprite_loader).__mro__:
+            loaders_by_type.setdefault(loader_type, sprite_loader)
+    return loaders_by_type
+
+
+def _offset_box(box, height_offset: int):
+    return (box[0], box[1] + height_offset, box[2], box[3] + height_offset)
+
+
+def _box_size(box):
+    return (box[2] - box[0], box[3] - box[1])
+
+
 class BaseSpriteMerger(ABC):
     @property
     @abstractmethod
@@ -45,10 +73,26 @@ class BaseSpriteMerger(ABC):
     def stem(self):
         return self._full_path.stem
 
+    @property
+    def target_path(self) -> Path:
+        return self._full_path
+
+    @property
+    def source_sheet_paths(self) -> List[Path]:
+        """Paths of the sheets this merges from, relative to their base path."""
+        return [
+            loader_type._sprite_sheet_path  # pylint: disable=protected-access
+            for loader_type in self._origin_map
+        ]
+
     def __init__(
-        self, base_path: Path = _DEFAULT_BASE_PATH, separate_grid_file: bool = True
+        self,
+        base_path: Path = _DEFAULT_BASE_PATH,
+        separate_grid_file: bool = True,
+        compositing: Compositing = Compositing.BATCHED,
     ):
         self.base_path = base_path
+        self.compositing = compositing
         self._full_path = self.base_path / self._target_sprite_sheet_path
         self._separate_grid_file = separate_grid_file
         self._grid_colors = [(255, 0, 0, 255), (0, 0, 255, 255)]
@@ -80,7 +124,16 @@ class BaseSpriteMerger(ABC):
             self._origin_sizes[sprite_loader_type] = image_sizes
             self._origin_map[sprite_loader_type] = chunk_maps
 
-        image_size = (int(max_image_width), int(total_image_height))
+        self._image_size = (int(max_image_width), int(total_image_height))
+        # Created when merging, so idle mergers don't hold on to whole sheets
+        self._sprite_sheet = None
+        self._grid_image = None
+        self._grid_image_draw = None
+        # Target boxes of every chunk, see _get_layout
+        self._layout = None
+
+    def _new_images(self):
+        image_size = self._image_size
         self._sprite_sheet = Image.new(mode="RGBA", size=image_size, color=(0, 0, 0, 0))
 
         if self._separate_grid_file:
@@ -159,6 +212,14 @@ class BaseSpriteMerger(ABC):
 
         return (grid_bbox, chunk_bbox)
 
+    @staticmethod
+    def _grid_color_index(left: int, upper: int, chunk_size: int) -> int:
+        chunk_coord = (int(left / chunk_size), int(upper / chunk_size))
+        grid_color_index = int(chunk_coord[0] % 2)
+        if int(chunk_coord[1] % 2):
+            grid_color_index = 0 if grid_color_index else 1
+        return grid_color_index
+
     def _put_grid(
         self,
         left: int,
@@ -167,13 +228,8 @@ class BaseSpriteMerger(ABC):
         lower: int,
         chunk_size: int,
     ):
-        chunk_coord = (int(left / chunk_size), int(upper / chunk_size))
-        grid_color_index = int(chunk_coord[0] % 2)
-        if int(chunk_coord[1] % 2):
-            grid_color_index = 0 if grid_color_index else 1
-
         grid_bbox = (left, upper, right, lower)
-        grid_color = self._grid_colors[grid_color_index]
+        grid_color = self._grid_colors[self._grid_color_index(left, upper, chunk_size)]
         self._grid_image_draw.rectangle(
             grid_bbox, outline=grid_color, width=self._grid_hint_size
         )
@@ -182,16 +238,48 @@ class BaseSpriteMerger(ABC):
         bbox = (left, upper, right, lower)
         self._sprite_sheet.paste(image, bbox)
 
+    def _get_layout(self):
+        """Grid and chunk boxes of every chunk, relative to the top of the
+        part of the sheet its chunk map is placed in.
+
+        Returned as a list of (loader type, chunk size, chunk map layouts)
+        where each chunk map layout is (height, [(name, grid box, chunk box)]).
+        """
+        if self._layout is None:
+            self._layout = []
+            for sprite_loader_type, chunk_maps in self._origin_map.items():
+                chunk_size = (
+                    sprite_loader_type._chunk_size  # pylint: disable=protected-access
+                )
+                image_sizes = self._origin_sizes[sprite_loader_type]
+                chunk_map_layouts = []
+                for chunk_map, image_size in zip(chunk_maps, image_sizes):
+                    boxes = [
+                        (name, *self._get_image_coords(*coords, chunk_size, 0))
+                        for name, coords in chunk_map.items()
+                    ]
+                    chunk_map_layouts.append((image_size[1], boxes))
+                self._layout.append((sprite_loader_type, chunk_size, chunk_map_layouts))
+        return self._layout
+
     def do_merge(self, sprite_loaders: List[BaseSpriteLoader]) -> Image:
         logger.info("Merging sprites for sheet %s", self.stem)
+        self._new_images()
+
+        loaders_by_type = index_sprite_loaders(sprite_loaders)
+        if self.compositing == Compositing.PER_CHUNK:
+            self._merge_per_chunk(loaders_by_type)
+        else:
+            self._merge_batched(loaders_by_type)
+        return self._sprite_sheet
 
+    def _merge_per_chunk(
+        self, loaders_by_type: Dict[Type[BaseSpriteLoader], BaseSpriteLoader]
+    ):
         height_offset = 0
         for sprite_loader_type, chunk_maps in self._origin_map.items():
-            matching_sprite_loaders = [
-                x for x in sprite_loaders if isinstance(x, sprite_loader_type)
-            ]
-            if matching_sprite_loaders:
-                sprite_loader = matching_sprite_loaders[0]
+            sprite_loader = loaders_by_type.get(sprite_loader_type)
+            if sprite_loader is not None:
                 chunk_size = (
                     sprite_loader_type._chunk_size  # pylint: disable=protected-access
                 )
@@ -223,7 +311,95 @@ class BaseSpriteMerger(ABC):
                 logger.error(
                     "Required sprite loader %s not supplied", sprite_loader_type
                 )
-        return self._sprite_sheet
+
+    @staticmethod
+    def _source_box(sprite_loader: BaseSpriteLoader, name: str) -> Optional[Tuple]:
+        """Pixel box of `name` in the loader's sheet, as cropped by `get`.
+
+        None if the loader looks up chunks some other way.
+        """
+        # pylint: disable=protected-access
+        if (
+            type(sprite_loader).get is not BaseSpriteLoader.get
+            or type(sprite_loader)._get_block is not BaseSpriteLoader._get_block
+        ):
+            return None
+        coords = sprite_loader._chunk_map.get(name)
+        if not coords:
+            return None
+        return tuple(round(x * sprite_loader._chunk_size) for x in coords)
+
+    def _merge_batched(
+        self, loaders_by_type: Dict[Type[BaseSpriteLoader], BaseSpriteLoader]
+    ):
+        # Pastes are (names, source image or sheet, source box, chunk box).
+        # A source box of None pastes the whole source image.
+        pastes = []
+
+        height_offset = 0
+        for sprite_loader_type, chunk_size, chunk_map_layouts in self._get_layout():
+            sprite_loader = loaders_by_type.get(sprite_loader_type)
+            if sprite_loader is None:
+                logger.error(
+                    "Required sprite loader %s not supplied", sprite_loader_type
+                )
+                continue
+
+            sheet = sprite_loader._sprite_sheet  # pylint: disable=protected-access
+            for height, boxes in chunk_map_layouts:
+                for name, grid_box, chunk_box in boxes:
+                    grid_box = _offset_box(grid_box, height_offset)
+                    chunk_box = _offset_box(chunk_box, height_offset)
+
+                    source_box = self._source_box(sprite_loader, name)
+                    if source_box is None:
+                        source_image = sprite_loader.get(name)
+                        if not source_image:
+                            logger.error(
+                                "Could not find image %s in source %s",
+                                name,
+                                sprite_loader_type,
+                            )
+                            continue
+                        pastes.append(([name], source_image, None, chunk_box))
+                    else:
+                        last = pastes[-1] if pastes else None
+                        if (
+                            last is not None
+                            and last[1] is sheet
+                            and last[2] is not None
+                            and _box_size(last[2]) == _box_size(last[3])
+                            and _box_size(source_box) == _box_size(chunk_box)
+                            and last[2][2] == source_box[0]
+                            and last[2][1::2] == source_box[1::2]
+                            and last[3][2] == chunk_box[0]
+                            and last[3][1::2] == chunk_box[1::2]
+                        ):
+                            # Extend the run of chunks to the right
+                            last[0].append(name)
+                            pastes[-1] = (
+                                last[0],
+                                sheet,
+                                last[2][:2] + source_box[2:],
+                                last[3][:2] + chunk_box[2:],
+                            )
+                        else:
+                            pastes.append(([name], sheet, source_box, chunk_box))
+
+                    self._put_grid(*grid_box, chunk_size)
+                height_offset += height
+
+        for names, source, source_box, chunk_box in pastes:
+            if source_box is not None:
+                source = source.crop(source_box)
+            try:
+                self._put_chunk(*chunk_box, source)
+            except ValueError as exception:
+                logger.error(
+                    "Failed putting image %s into merged sprite sheet: %s",
+                    ", ".join(names),
+                    str(exception),
+                )
 
     def save(self):
         if not self._full_path.parent.exists():
@@ -234,3 +410,9 @@ class BaseSpriteMerger(ABC):
                 f"{self._full_path.with_suffix('')}_grid{self._full_path.suffix}"
             )
             self._grid_image.save(grid_file_path)
+
+    def release(self):
+        """Drop the merged images once they've been saved."""
+        self._sprite_sheet = None
+        self._grid_image = None
+        self._grid_image_draw = None
@@ -0,0 +1,193 @@
+"""Process-wide cache of decoded sprite sheets and the crops taken from them.
+
+The sprite fetcher, the extractor and every level editor build their own
+sprite loaders, often for the same sheets. Loaders get their sheet from
+SHEET_CACHE so each sheet is only decoded once per process, and only if
+it's actually used.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PIL import Image
+
+# Roughly every sheet the level editor uses
+DEFAULT_MAX_BYTES = 512 << 20
+
+_MIB = 1 << 20
+
+
+def image_nbytes(image: Image.Image) -> int:
+    """Approximate memory used by a decoded image."""
+    return image.width * image.height * len(image.getbands())
+
+
+class CachedSheet:
+    """A sheet and the crops taken from it so far.
+
+    The sheet is decoded the first time it's used. Its size is known from
+    the header, so it counts against the cache's limit from the start.
+    """
+
+    def __init__(self, path: Path, mtime_ns: int, image: Image.Image):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self._image = image
+        self._loaded = False
+        self.nbytes = image_nbytes(image)
+        self._crops: Dict[Tuple[int, int, int, int], Image.Image] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Image.Image:
+        if not self._loaded:
+            self._image.load()
+            self._loaded = True
+        return self._image
+
+    @property
+    def image(self) -> Image.Image:
+        """The decoded sheet."""
+        with self._lock:
+            return self._load()
+
+    def crop(self, bbox: Tuple[int, int, int, int]) -> Image.Image:
+        """Same as image.crop, but each box is only cropped once.
+
+        The returned image is shared, so it must not be modified.
+        """
+        with self._lock:
+            cropped = self._crops.get(bbox)
+            if cropped is None:
+                cropped = self._load().crop(bbox)
+                self._crops[bbox] = cropped
+                self.nbytes += image_nbytes(cropped)
+            return cropped
+
+
+@dataclass(frozen=True)
+class SheetCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    sheets: int
+    nbytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def since(self, earlier: "SheetCacheStats") -> "SheetCacheStats":
+        """Lookups and evictions since `earlier`, with the current size."""
+        return SheetCacheStats(
+            hits=self.hits - earlier.hits,
+            misses=self.misses - earlier.misses,
+            evictions=self.evictions - earlier.evictions,
+            sheets=self.sheets,
+            nbytes=self.nbytes,
+            max_bytes=self.max_bytes,
+        )
+
+    def __str__(self):
+        return (
+            f"{self.sheets} sheets using {self.nbytes / _MIB:.1f} of"
+            f" {self.max_bytes / _MIB:.1f} MiB, {self.hits} hits,"
+            f" {self.misses} misses ({self.hit_rate:.1%} hit rate),"
+            f" {self.evictions} evictions"
+        )
+
+
+class SheetCache:
+    """LRU of decoded sheets, keyed by path and modification time.
+
+    Once the sheets (and their crops) use more than `max_bytes`, the least
+    recently requested ones are dropped. This is checked whenever a sheet is
+    requested. Loaders still holding a dropped sheet keep it alive until
+    they're closed.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._sheets: "OrderedDict[Path, CachedSheet]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Held while opening a sheet, so it's only opened once
+        self._load_locks: Dict[Path, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _lookup(self, path: Path, mtime_ns: int):
+        sheet = self._sheets.get(path)
+        if sheet is None or sheet.mtime_ns != mtime_ns:
+            return None
+        self._sheets.move_to_end(path)
+        self._hits += 1
+        return sheet
+
+    def _evict(self):
+        nbytes = sum(sheet.nbytes for sheet in self._sheets.values())
+        # Always keep the most recent sheet, even if it's over the limit alone
+        while nbytes > self.max_bytes and len(self._sheets) > 1:
+            _, sheet = self._sheets.popitem(last=False)
+            nbytes -= sheet.nbytes
+            self._evictions += 1
+
+    def put(self, path: Path, image: Image.Image) -> CachedSheet:
+        """Use an already decoded `image` as the sheet at `path` until the file
+        changes."""
+        path = Path(path).resolve()
+        sheet = CachedSheet(path, path.stat().st_mtime_ns, image)
+        with self._lock:
+            self._sheets[path] = sheet
+            self._sheets.move_to_end(path)
+            self._evict()
+        return sheet
+
+    def get(self, path: Path) -> CachedSheet:
+        """The sheet at `path`, opening it if it isn't cached or has changed
+        since it was."""
+        path = Path(path).resolve()
+        mtime_ns = path.stat().st_mtime_ns
+
+        with self._lock:
+            sheet = self._lookup(path, mtime_ns)
+            if sheet is not None:
+                return sheet
+            load_lock = self._load_locks.setdefault(path, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Another thread may have opened it while we waited
+                sheet = self._lookup(path, mtime_ns)
+                if sheet is not None:
+                    return sheet
+
+            sheet = CachedSheet(path, mtime_ns, Image.open(path))
+
+            with self._lock:
+                self._misses += 1
+                self._sheets[path] = sheet
+                self._sheets.move_to_end(path)
+                self._evict()
+            return sheet
+
+    def stats(self) -> SheetCacheStats:
+        with self._lock:
+            return SheetCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                sheets=len(self._sheets),
+                nbytes=sum(sheet.nbytes for sheet in self._sheets.values()),
+                max_bytes=self.max_bytes,
+            )
+
+    def clear(self):
+        with self._lock:
+            self._sheets.clear()
+
+
+SHEET_CACHE = SheetCache()
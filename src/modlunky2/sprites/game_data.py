@@ -0,0 +1,123 @@
+"""entities.json and textures.json, cut down to what sprite chunk maps need.
+
+Parsing the full files is most of the cost of loading them. The first load
+pickles a digest with only the fields `chunks_from_json` reads to CACHE_DIR.
+Later loads read the digest instead, for as long as the files it was built
+from are unchanged.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from modlunky2.config import CACHE_DIR
+from modlunky2.constants import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+GAME_DATA_DIR = BASE_DIR / "static/game_data"
+GAME_DATA_CACHE_PATH = CACHE_DIR / "game-data.pickle"
+
+# Bump when the digest changes
+VERSION = 1
+
+
+def digest_entities(entities_json: Dict) -> Dict:
+    digest = {}
+    for name, entity in entities_json.items():
+        animations = sorted(entity["animations"].items(), key=lambda x: int(x[0]))
+        digest[name] = {
+            "texture": entity["texture"],
+            "tile_x": entity["tile_x"],
+            "tile_y": entity["tile_y"],
+            "animations": {
+                animation_id: {
+                    "texture": animation["texture"],
+                    "count": animation["count"],
+                }
+                for animation_id, animation in animations
+            },
+        }
+    return digest
+
+
+def digest_textures(textures_json: Dict) -> Dict:
+    return {
+        texture_id: {
+            "num_tiles": {"width": texture["num_tiles"]["width"]},
+            "offset": {
+                "width": texture["offset"]["width"],
+                "height": texture["offset"]["height"],
+            },
+            "tile_width": texture["tile_width"],
+            "tile_height": texture["tile_height"],
+        }
+        for texture_id, texture in textures_json.items()
+    }
+
+
+def _read_sources() -> Tuple[bytes, bytes, str]:
+    entities_data = (GAME_DATA_DIR / "entities.json").read_bytes()
+    textures_data = (GAME_DATA_DIR / "textures.json").read_bytes()
+    source_md5 = hashlib.md5(entities_data)
+    source_md5.update(textures_data)
+    return entities_data, textures_data, source_md5.hexdigest()
+
+
+def _load_cached(source_md5: str):
+    try:
+        with GAME_DATA_CACHE_PATH.open("rb") as cache_file:
+            cached = pickle.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Ignoring unreadable game data cache %s", GAME_DATA_CACHE_PATH)
+        return None
+
+    if (
+        not isinstance(cached, dict)
+        or cached.get("version") != VERSION
+        or cached.get("source-md5") != source_md5
+    ):
+        return None
+    return cached["entities"], cached["textures"]
+
+
+def _save_cached(source_md5: str, entities: Dict, textures: Dict):
+    GAME_DATA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = GAME_DATA_CACHE_PATH.with_name(f"{GAME_DATA_CACHE_PATH.name}.tmp")
+    with tmp_path.open("wb") as cache_file:
+        pickle.dump(
+            {
+                "version": VERSION,
+                "source-md5": source_md5,
+                "entities": entities,
+                "textures": textures,
+            },
+            cache_file,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, GAME_DATA_CACHE_PATH)
+
+
+@lru_cache(maxsize=None)
+def load_game_data() -> Tuple[Dict, Dict]:
+    """Digested (entities_json, textures_json), in place of the parsed files.
+
+    Loaded once per process. The result is shared, so don't modify it.
+    """
+    entities_data, textures_data, source_md5 = _read_sources()
+    cached = _load_cached(source_md5)
+    if cached is not None:
+        return cached
+
+    entities = digest_entities(json.loads(entities_data))
+    textures = digest_textures(json.loads(textures_data))
+    try:
+        _save_cached(source_md5, entities, textures)
+    except OSError:
+        logger.warning("Failed to write game data cache %s", GAME_DATA_CACHE_PATH)
+    return entities, textures
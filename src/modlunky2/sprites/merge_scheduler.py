@@ -0,0 +1,202 @@
+"""Runs sprite mergers in a process pool, opening source sheets lazily.
+
+Mergers are ordered so that the ones sharing source sheets run next to each
+other, then split into batches. Each batch runs in a worker which opens a
+sheet the first time a merger in the batch needs it and closes it after the
+last one that does. Sheets stay in the worker's SHEET_CACHE, up to its
+limit, for later batches.
+"""
+import logging
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from modlunky2.sprites.base_classes.base_sprite_loader import BaseSpriteLoader
+from modlunky2.sprites.base_classes.base_sprite_merger import BaseSpriteMerger
+from modlunky2.sprites.base_classes.sheet_cache import SHEET_CACHE, SheetCacheStats
+from modlunky2.sprites.sprite_loaders import get_sprite_loader_factories
+from modlunky2.sprites.sprite_mergers import get_all_sprite_mergers
+
+logger = logging.getLogger(__name__)
+
+# Batches per worker. More batches balance the load better, but each batch
+# opens its own copy of the sheets it needs.
+BATCHES_PER_WORKER = 2
+
+# Set in each worker by _init_worker
+_WORKER_JSON = {}
+
+
+@dataclass
+class MergeTiming:
+    stem: str
+    seconds: float
+    error: Optional[str] = None
+
+
+def required_loader_types(
+    sprite_merger: BaseSpriteMerger,
+) -> List[Type[BaseSpriteLoader]]:
+    return list(sprite_merger._origin_map)  # pylint: disable=protected-access
+
+
+def order_by_shared_sheets(
+    sprite_mergers: Sequence[BaseSpriteMerger],
+) -> List[int]:
+    """Indexes of `sprite_mergers`, greedily ordered so each merger shares as
+    many source sheets as possible with the one before it."""
+    remaining = list(range(len(sprite_mergers)))
+    requires = [set(required_loader_types(merger)) for merger in sprite_mergers]
+    order = []
+    previous: Set = set()
+    while remaining:
+        best = max(remaining, key=lambda idx: len(requires[idx] & previous))
+        remaining.remove(best)
+        order.append(best)
+        previous = requires[best]
+    return order
+
+
+def _init_worker(entities_json, textures_json):
+    _WORKER_JSON["entities"] = entities_json
+    _WORKER_JSON["textures"] = textures_json
+
+
+def merge_batch(
+    sprite_mergers: Sequence[BaseSpriteMerger],
+    loader_factories,
+    indexes: Sequence[int],
+) -> List[MergeTiming]:
+    """Merge and save `indexes` of `sprite_mergers` in order.
+
+    Each source sheet's loader is created on first use and closed after its
+    last use.
+    """
+    last_use: Dict[Type[BaseSpriteLoader], int] = {}
+    for pos, idx in enumerate(indexes):
+        for loader_type in required_loader_types(sprite_mergers[idx]):
+            last_use[loader_type] = pos
+
+    open_loaders: Dict[Type[BaseSpriteLoader], BaseSpriteLoader] = {}
+
+    def get_loader(loader_type):
+        if loader_type not in open_loaders:
+            # Same as matching the first of get_all_sprite_loaders by isinstance
+            for factory_type, factory in loader_factories:
+                if issubclass(factory_type, loader_type):
+                    open_loaders[loader_type] = factory()
+                    break
+            else:
+                return None
+        return open_loaders[loader_type]
+
+    timings = []
+    for pos, idx in enumerate(indexes):
+        sprite_merger = sprite_mergers[idx]
+        loader_types = required_loader_types(sprite_merger)
+        start = time.perf_counter()
+        error = None
+        try:
+            sprite_loaders = [
+                loader for loader in map(get_loader, loader_types) if loader is not None
+            ]
+            sprite_merger.do_merge(sprite_loaders)
+            sprite_merger.save()
+        except Exception:  # pylint: disable=broad-except
+            error = "".join(traceback.format_exception(*sys.exc_info())).strip()
+        finally:
+            sprite_merger.release()
+        timings.append(
+            MergeTiming(sprite_merger.stem, time.perf_counter() - start, error)
+        )
+
+        for loader_type in loader_types:
+            if last_use[loader_type] == pos and loader_type in open_loaders:
+                open_loaders.pop(loader_type).close()
+
+    return timings
+
+
+def _merge_batch_in_worker(
+    base_path: Path, indexes: Sequence[int]
+) -> Tuple[List[MergeTiming], SheetCacheStats]:
+    entities_json = _WORKER_JSON["entities"]
+    textures_json = _WORKER_JSON["textures"]
+    cache_stats = SHEET_CACHE.stats()
+    timings = merge_batch(
+        get_all_sprite_mergers(entities_json, textures_json, base_path),
+        get_sprite_loader_factories(entities_json, textures_json, base_path),
+        indexes,
+    )
+    return timings, SHEET_CACHE.stats().since(cache_stats)
+
+
+def schedule_merges(
+    base_path: Path,
+    sprite_mergers: Sequence[BaseSpriteMerger],
+    entities_json: dict,
+    textures_json: dict,
+    max_workers: int,
+) -> List[MergeTiming]:
+    """Merge `sprite_mergers`, which must come from `get_all_sprite_mergers`,
+    in a process pool. Returns how long each merge took."""
+    all_mergers = get_all_sprite_mergers(entities_json, textures_json, base_path)
+    position = {id(merger): idx for idx, merger in enumerate(all_mergers)}
+    # Workers look mergers up by their index in get_all_sprite_mergers
+    selected = [position[id(merger)] for merger in sprite_mergers]
+    order = [selected[idx] for idx in order_by_shared_sheets(sprite_mergers)]
+    if not order:
+        return []
+
+    num_batches = min(len(order), max_workers * BATCHES_PER_WORKER)
+    batch_size = -(-len(order) // num_batches)
+    batches = [
+        order[start : start + batch_size] for start in range(0, len(order), batch_size)
+    ]
+
+    timings = []
+    batch_cache_stats = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(entities_json, textures_json),
+    ) as pool:
+        futures = [
+            pool.submit(_merge_batch_in_worker, base_path, batch) for batch in batches
+        ]
+        for future in futures:
+            batch_timings, cache_stats = future.result()
+            timings.extend(batch_timings)
+            batch_cache_stats.append(cache_stats)
+    elapsed = time.perf_counter() - start
+
+    for timing in sorted(timings, key=lambda timing: timing.seconds, reverse=True):
+        if timing.error:
+            logger.critical(
+                "Failed to merge sprite for %s: %s", timing.stem, timing.error
+            )
+        else:
+            logger.debug("Merged %s in %.2fs", timing.stem, timing.seconds)
+    logger.info(
+        "Merged %s sprite sheets in %.2fs (%.2fs of merging across %s workers)",
+        len(timings),
+        elapsed,
+        sum(timing.seconds for timing in timings),
+        max_workers,
+    )
+    # Lookups across every batch, sizes of the fullest worker cache
+    cache_stats = SheetCacheStats(
+        hits=sum(stats.hits for stats in batch_cache_stats),
+        misses=sum(stats.misses for stats in batch_cache_stats),
+        evictions=sum(stats.evictions for stats in batch_cache_stats),
+        sheets=max(stats.sheets for stats in batch_cache_stats),
+        nbytes=max(stats.nbytes for stats in batch_cache_stats),
+        max_bytes=batch_cache_stats[0].max_bytes,
+    )
+    logger.info("Sprite sheet cache: %s", cache_stats)
+    return timings
@@ -1,6 +1,8 @@
-from typing import Optional
+from functools import partial
+from typing import Callable, List, Optional, Tuple, Type
 
 from modlunky2.constants import BASE_DIR
+from modlunky2.sprites.base_classes.base_sprite_loader import BaseSpriteLoader
 
 from modlunky2.sprites.items import ItemSheet
 from modlunky2.sprites.coffins import CoffinSheet
@@ -65,64 +67,84 @@ from modlunky2.sprites.menu_basic import MenuBasicSheet, PetHeadsSheet
 from modlunky2.sprites.deco_sheet import CaveDecoSheet
 
 
-def get_all_sprite_loaders(
+SpriteLoaderFactory = Tuple[Type[BaseSpriteLoader], Callable[[], BaseSpriteLoader]]
+
+
+def _factory(loader_type, *args) -> SpriteLoaderFactory:
+    return loader_type, partial(loader_type, *args)
+
+
+def get_sprite_loader_factories(
     entities_json: Optional[dict], textures_json: Optional[dict], base_path: str
-):
+) -> List[SpriteLoaderFactory]:
+    """(loader type, factory) for every sprite loader, in the same order as
+    `get_all_sprite_loaders`. Nothing is opened until a factory is called."""
     return [
-        ItemSheet(base_path),
-        CoffinSheet(base_path),
-        StickerSheet(base_path),
-        JournalItemSheet(base_path),
-        JournalPeopleSheet(base_path),
-        JournalMonsterSheet(base_path),
-        JournalBigMonsterSheet(base_path),
-        JournalPlaceSheet(base_path),
-        JournalTrapSheet(base_path),
-        CharacterBlackSheet(base_path),
-        CharacterLimeSheet(base_path),
-        CharacterMagentaSheet(base_path),
-        CharacterOliveSheet(base_path),
-        CharacterOrangeSheet(base_path),
-        CharacterPinkSheet(base_path),
-        CharacterRedSheet(base_path),
-        CharacterVioletSheet(base_path),
-        CharacterWhiteSheet(base_path),
-        CharacterYellowSheet(base_path),
-        CharacterBlueSheet(base_path),
-        CharacterCeruleanSheet(base_path),
-        CharacterCinnabarSheet(base_path),
-        CharacterCyanSheet(base_path),
-        CharacterEggChildSheet(base_path),
-        CharacterGoldSheet(base_path),
-        CharacterGraySheet(base_path),
-        CharacterGreenSheet(base_path),
-        CharacterHiredHandSheet(base_path),
-        CharacterIrisSheet(base_path),
-        CharacterKhakiSheet(base_path),
-        CharacterLemonSheet(base_path),
-        Mounts(entities_json, textures_json, base_path),
-        Pets(entities_json, textures_json, base_path),
-        MenuLeaderSheet(base_path),
-        MenuBasicSheet(base_path),
-        PetHeadsSheet(BASE_DIR / "static"),
-        Basic1(entities_json, textures_json, base_path),
-        Basic2(entities_json, textures_json, base_path),
-        Basic3(entities_json, textures_json, base_path),
-        Monsters1(entities_json, textures_json, base_path),
-        Monsters2(entities_json, textures_json, base_path),
-        Monsters3(entities_json, textures_json, base_path),
-        Big1(entities_json, textures_json, base_path),
-        Big2(entities_json, textures_json, base_path),
-        Big3(entities_json, textures_json, base_path),
-        Big4(entities_json, textures_json, base_path),
-        Big5(entities_json, textures_json, base_path),
-        Big6(entities_json, textures_json, base_path),
-        OsirisAndAlienQueen(entities_json, textures_json, base_path),
-        OlmecAndMech(entities_json, textures_json, base_path),
-        Ghost(entities_json, textures_json, base_path),
-        CaveDecoSheet(base_path),
+        _factory(ItemSheet, base_path),
+        _factory(CoffinSheet, base_path),
+        _factory(StickerSheet, base_path),
+        _factory(JournalItemSheet, base_path),
+        _factory(JournalPeopleSheet, base_path),
+        _factory(JournalMonsterSheet, base_path),
+        _factory(JournalBigMonsterSheet, base_path),
+        _factory(JournalPlaceSheet, base_path),
+        _factory(JournalTrapSheet, base_path),
+        _factory(CharacterBlackSheet, base_path),
+        _factory(CharacterLimeSheet, base_path),
+        _factory(CharacterMagentaSheet, base_path),
+        _factory(CharacterOliveSheet, base_path),
+        _factory(CharacterOrangeSheet, base_path),
+        _factory(CharacterPinkSheet, base_path),
+        _factory(CharacterRedSheet, base_path),
+        _factory(CharacterVioletSheet, base_path),
+        _factory(CharacterWhiteSheet, base_path),
+        _factory(CharacterYellowSheet, base_path),
+        _factory(CharacterBlueSheet, base_path),
+        _factory(CharacterCeruleanSheet, base_path),
+        _factory(CharacterCinnabarSheet, base_path),
+        _factory(CharacterCyanSheet, base_path),
+        _factory(CharacterEggChildSheet, base_path),
+        _factory(CharacterGoldSheet, base_path),
+        _factory(CharacterGraySheet, base_path),
+        _factory(CharacterGreenSheet, base_path),
+        _factory(CharacterHiredHandSheet, base_path),
+        _factory(CharacterIrisSheet, base_path),
+        _factory(CharacterKhakiSheet, base_path),
+        _factory(CharacterLemonSheet, base_path),
+        _factory(Mounts, entities_json, textures_json, base_path),
+        _factory(Pets, entities_json, textures_json, base_path),
+        _factory(MenuLeaderSheet, base_path),
+        _factory(MenuBasicSheet, base_path),
+        _factory(PetHeadsSheet, BASE_DIR / "static"),
+        _factory(Basic1, entities_json, textures_json, base_path),
+        _factory(Basic2, entities_json, textures_json, base_path),
+        _factory(Basic3, entities_json, textures_json, base_path),
+        _factory(Monsters1, entities_json, textures_json, base_path),
+        _factory(Monsters2, entities_json, textures_json, base_path),
+        _factory(Monsters3, entities_json, textures_json, base_path),
+        _factory(Big1, entities_json, textures_json, base_path),
+        _factory(Big2, entities_json, textures_json, base_path),
+        _factory(Big3, entities_json, textures_json, base_path),
+        _factory(Big4, entities_json, textures_json, base_path),
+        _factory(Big5, entities_json, textures_json, base_path),
+        _factory(Big6, entities_json, textures_json, base_path),
+        _factory(OsirisAndAlienQueen, entities_json, textures_json, base_path),
+        _factory(OlmecAndMech, entities_json, textures_json, base_path),
+        _factory(Ghost, entities_json, textures_json, base_path),
+        _factory(CaveDecoSheet, base_path),
         # These uses the constant BASE_DIR as the base path as this
         # texture is bundled with the source rather than coming
         # from the extracted assets.
-        TilecodeExtras(BASE_DIR),
-    ] + [class_(BASE_DIR) for class_ in EXTRA_TILECODE_CLASSES]
+        _factory(TilecodeExtras, BASE_DIR),
+    ] + [_factory(class_, BASE_DIR) for class_ in EXTRA_TILECODE_CLASSES]
+
+
+def get_all_sprite_loaders(
+    entities_json: Optional[dict], textures_json: Optional[dict], base_path: str
+):
+    return [
+        factory()
+        for _, factory in get_sprite_loader_factories(
+            entities_json, textures_json, base_path
+        )
+    ]
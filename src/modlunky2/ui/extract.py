@@ -8,6 +8,7 @@ from ctypes.util import find_library  # pylint: disable=unused-import
 from fsb5.utils import load_lib, LibraryNotFoundException
 
 from modlunky2.assets.assets import AssetStore
+from modlunky2.assets.hash_cache import FILEPATH_HASH_CACHE_PATH, FilepathHashCache
 from modlunky2.assets.constants import (
     EXTRACTED_DIR,
     FILEPATH_DIRS,
@@ -59,6 +60,7 @@ def extract_assets(
     create_entity_sheets,
     extract_sound_extensions,
     reuse_extracted,
+    incremental=False,
 ):
     exe_filename = install_dir / target
 
@@ -81,15 +83,23 @@ def extract_assets(
             legacy_path.unlink()
 
     with exe_filename.open("rb") as exe:
-        asset_store = AssetStore.load_from_file(exe)
-        unextracted = asset_store.extract(
-            mods_dir / EXTRACTED_DIR,
-            mods_dir / ".compressed" / EXTRACTED_DIR,
-            generate_string_hashes=generate_string_hashes,
-            create_entity_sheets=create_entity_sheets,
-            extract_sound_extensions=extract_sound_extensions,
-            reuse_extracted=reuse_extracted,
+        asset_store = AssetStore.load_from_file(
+            exe,
+            use_mmap=True,
+            hash_cache=FilepathHashCache(FILEPATH_HASH_CACHE_PATH),
         )
+        try:
+            unextracted = asset_store.extract(
+                mods_dir / EXTRACTED_DIR,
+                mods_dir / ".compressed" / EXTRACTED_DIR,
+                generate_string_hashes=generate_string_hashes,
+                create_entity_sheets=create_entity_sheets,
+                extract_sound_extensions=extract_sound_extensions,
+                reuse_extracted=reuse_extracted,
+                incremental=incremental,
+            )
+        finally:
+            asset_store.close()
 
     for asset in unextracted:
         logger.warning("Un-extracted Asset %s", asset.asset_block)
@@ -235,6 +245,24 @@ class ExtractTab(Tab):
             ),
         )
 
+        self.incremental = tk.BooleanVar()
+        self.incremental.set(False)
+        self.checkbox_incremental = ttk.Checkbutton(
+            self.config_frame,
+            text="Only Extract Changed Assets",
+            variable=self.incremental,
+            onvalue=True,
+            offvalue=False,
+        )
+        self.checkbox_incremental.grid(row=6, sticky="nw")
+        ToolTip(
+            self.checkbox_incremental,
+            (
+                "If checked we will only extract assets that changed\n"
+                "since the last extraction, e.g. after a game update."
+            ),
+        )
+
         self.list_box.config(yscrollcommand=self.scrollbar.set)
         self.scrollbar.config(command=self.list_box.yview)
 
@@ -276,6 +304,7 @@ class ExtractTab(Tab):
             create_entity_sheets=self.create_entity.get(),
             extract_sound_extensions=extract_sound_extensions,
             reuse_extracted=self.reuse_extracted.get(),
+            incremental=self.incremental.get(),
         )
 
     def get_exes(self):
@@ -1,4 +1,5 @@
 import logging
+import os
 import shutil
 import tkinter as tk
 import webbrowser
@@ -8,18 +9,28 @@ from tkinter import ttk
 from PIL import Image, ImageTk
 
 from modlunky2.assets.assets import AssetStore
+from modlunky2.assets.compression import CompressionSettings
+from modlunky2.assets.constants import DEFAULT_COMPRESSION_LEVEL
 from modlunky2.assets.exc import MissingAsset
-from modlunky2.assets.hashing import md5sum_path
+from modlunky2.assets.exe_identity import EXE_IDENTITY_CACHE_PATH, ExeIdentityCache
+from modlunky2.assets.hash_cache import FILEPATH_HASH_CACHE_PATH, FilepathHashCache
 from modlunky2.assets.patcher import Patcher
 from modlunky2.config import Config
 from modlunky2.constants import BASE_DIR
 from modlunky2.ui.widgets import ScrollableLabelFrame, Tab, ToolTip
-from modlunky2.utils import is_patched
 
 logger = logging.getLogger(__name__)
 
 MODS = Path("Mods")
 
+# Large assets are compressed with zstd's worker threads, and assets that
+# no longer fit in their original size are retried at higher levels.
+PACK_COMPRESSION = CompressionSettings(
+    level=DEFAULT_COMPRESSION_LEVEL,
+    threads=max(os.cpu_count() - 2, 1),
+    fit_to_budget=True,
+)
+
 
 def pack_assets(_call, install_dir, packs):
     mods_dir = install_dir / MODS
@@ -27,8 +38,10 @@ def pack_assets(_call, install_dir, packs):
     source_exe = extract_dir / "Spel2.exe"
     dest_exe = install_dir / "Spel2.exe"
 
+    exe_identities = ExeIdentityCache(EXE_IDENTITY_CACHE_PATH)
+
     logger.info("Starting Pack of %s", source_exe)
-    if is_patched(source_exe):
+    if exe_identities.is_patched(source_exe):
         logger.critical(
             "Source exe (%s) is somehow patched. You need to re-extract.", source_exe
         )
@@ -37,12 +50,10 @@ def pack_assets(_call, install_dir, packs):
     # If the destination isn't patched we want to check if it differs
     # from the source exe as new updates are a regular point of confusion
     # for users.
-    if not is_patched(dest_exe):
+    if not exe_identities.is_patched(dest_exe):
         logger.info("Checking for new release...")
-        logger.info("Hashing %s", source_exe)
-        src_md5 = md5sum_path(source_exe)
-        logger.info("Hashing %s", dest_exe)
-        dest_md5 = md5sum_path(dest_exe)
+        src_md5 = exe_identities.md5sum(source_exe)
+        dest_md5 = exe_identities.md5sum(dest_exe)
         if src_md5 != dest_md5:
             logger.critical(
                 (
@@ -55,12 +66,15 @@ def pack_assets(_call, install_dir, packs):
     shutil.copy2(source_exe, dest_exe)
 
     with dest_exe.open("rb+") as dest_file:
-        asset_store = AssetStore.load_from_file(dest_file)
+        asset_store = AssetStore.load_from_file(
+            dest_file, hash_cache=FilepathHashCache(FILEPATH_HASH_CACHE_PATH)
+        )
         try:
             asset_store.repackage(
                 packs,
                 extract_dir,
                 mods_dir / ".compressed",
+                compression=PACK_COMPRESSION,
             )
         except MissingAsset as err:
             logger.error(
@@ -69,9 +83,13 @@ def pack_assets(_call, install_dir, packs):
             return
 
         patcher = Patcher(dest_file)
-        patcher.patch_checksum()
+        patched = patcher.patch_checksum()
         patcher.patch_release()
-        logger.info("Repacking complete!")
+
+    if patched:
+        # Lets the next pack skip scanning and hashing the installed exe
+        exe_identities.record_patched(dest_exe)
+    logger.info("Repacking complete!")
 
 
 class WarningFrame(ttk.Frame):
@@ -173,7 +191,7 @@ class PackTab(Tab):
         source_exe = extract_dir / "Spel2.exe"
         dest_exe = self.modlunky_config.install_dir / "Spel2.exe"
 
-        if is_patched(source_exe):
+        if ExeIdentityCache(EXE_IDENTITY_CACHE_PATH).is_patched(source_exe):
             logger.critical(
                 "Source exe (%s) is somehow patched. You need to validate game files in steam and re-extract."
             )
@@ -90,8 +90,16 @@ class WatcherThread(threading.Thread, Generic[ConfigType, TrackerDataType]):
             return
 
     def poll_tracker(self):
+        # Polls run every few ms, so only gather stats if they'll be logged
+        log_reads = logger.isEnabledFor(logging.DEBUG)
+        reads_before = self.proc.page_cache.stats() if log_reads else None
         try:
             data = self.tracker.poll(self.proc, self.config)
+            if log_reads:
+                logger.debug(
+                    "Memory reads while polling: %s",
+                    self.proc.page_cache.stats().since(reads_before),
+                )
             if data is None:
                 self.shutdown()
             else:
@@ -667,8 +667,8 @@ class RunState:
             self.prev_next_uid = game_state.next_entity_uid
             return
 
-        for entity_uid in range(self.prev_next_uid, game_state.next_entity_uid):
-            entity_poly = game_state.instance_id_to_pointer.get(entity_uid)
+        new_uids = range(self.prev_next_uid, game_state.next_entity_uid)
+        for entity_poly in game_state.instance_id_to_pointer.get_many(new_uids):
             if entity_poly is None:
                 continue
             if entity_poly.value.type is None:
@@ -781,8 +781,7 @@ class RunState:
         item_types = set()
         if player.items is None:
             return
-        for item in player.items:
-            entity_poly = instance_id_to_pointer.get(item)
+        for entity_poly in instance_id_to_pointer.get_many(player.items):
             if entity_poly is None:
                 continue
 
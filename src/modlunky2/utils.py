@@ -10,16 +10,9 @@ import webbrowser
 import struct
 import zipfile
 
-from modlunky2.assets.patcher import Patcher
-
 logger = logging.getLogger(__name__)
 
 
-def is_patched(exe_filename):
-    with exe_filename.open("rb") as exe:
-        return Patcher(exe).is_checksum_patched()
-
-
 def tb_info():
     return "".join(traceback.format_exception(*sys.exc_info())).strip()
 
@@ -0,0 +1,340 @@
+import os
+import shutil
+
+import pytest
+
+from modlunky2.assets import assets
+from modlunky2.assets.assets import AssetStore, DiskAsset, DiskBundle, ExtractMode
+from modlunky2.assets.compression import CompressionSettings
+from modlunky2.assets.constants import FILEPATH_DIRS
+from modlunky2.assets.hash_cache import FilepathHashCache
+from modlunky2.assets.testing import BundleBuilder
+
+STRINGS = "# Menu\nPlay\nOptions\n"
+ASSETS = {
+    "Data/Levels/abzu.lvl": (b"\\.abzu\n" * 200, True),
+    "strings00.str": (STRINGS.encode(), True),
+    "strings01.str": ("# Menu\nJouer\nOptions\n".encode(), True),
+    "shaders.hlsl": (b"float4 main() {}\n", False),
+    "not/a/known/path.bin": (b"mystery", True),
+}
+
+
+@pytest.fixture(name="exe_path")
+def fixture_exe_path(tmp_path):
+    builder = BundleBuilder()
+    for filepath, (data, is_encrypted) in ASSETS.items():
+        builder.add_asset(filepath, data, is_encrypted)
+    return builder.write(tmp_path / "Spel2.exe")
+
+
+def make_dirs(root):
+    extract_dir = root / "Extracted"
+    compressed_dir = root / ".compressed" / "Extracted"
+    for dir_ in FILEPATH_DIRS:
+        (extract_dir / dir_).mkdir(parents=True, exist_ok=True)
+        (compressed_dir / dir_).mkdir(parents=True, exist_ok=True)
+    return extract_dir, compressed_dir
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_load_populates_filepaths(exe_path, use_mmap):
+    with exe_path.open("rb") as exe:
+        asset_store = AssetStore.load_from_file(exe, use_mmap=use_mmap)
+        asset_store.close()
+
+    filepaths = [asset.filepath for asset in asset_store.assets]
+    assert filepaths == [
+        "Data/Levels/abzu.lvl",
+        "strings00.str",
+        "strings01.str",
+        "shaders.hlsl",
+        None,
+    ]
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+@pytest.mark.parametrize("extract_mode", list(ExtractMode))
+def test_extract_modes(exe_path, tmp_path, extract_mode, use_mmap):
+    extract_dir, compressed_dir = make_dirs(tmp_path / extract_mode.name)
+    with exe_path.open("rb") as exe:
+        asset_store = AssetStore.load_from_file(exe, use_mmap=use_mmap)
+        unextracted = asset_store.extract(
+            extract_dir,
+            compressed_dir,
+            max_workers=2,
+            create_entity_sheets=False,
+            extract_mode=extract_mode,
+        )
+        asset_store.close()
+
+    assert len(unextracted) == 1
+    for filepath, (data, _) in ASSETS.items():
+        if filepath.startswith("not/"):
+            continue
+        assert (extract_dir / filepath).read_bytes() == data
+
+    hashed = (extract_dir / "strings01_hashed.str").read_text()
+    assert hashed.splitlines()[1].endswith(": Jouer")
+
+
+def test_extract_skips_atlas_without_entity_sheets(exe_path, tmp_path, monkeypatch):
+    extract_dir, compressed_dir = make_dirs(tmp_path)
+    monkeypatch.setattr(
+        assets.AtlasIndex,
+        "load_or_build",
+        lambda _extract_dir: pytest.fail("Atlas was indexed"),
+    )
+    with exe_path.open("rb") as exe:
+        AssetStore.load_from_file(exe).extract(
+            extract_dir, compressed_dir, create_entity_sheets=False
+        )
+
+
+def test_find_asset(exe_path):
+    with exe_path.open("rb") as exe:
+        asset_store = AssetStore.load_from_file(exe)
+
+    assert asset_store.find_asset("strings01.str") is asset_store.assets[2]
+    assert asset_store.find_asset("strings02.str") is None
+    assert asset_store.find_asset(None) is None
+
+
+def test_load_with_hash_cache(exe_path, tmp_path):
+    hash_cache = FilepathHashCache(tmp_path / "hashes.json")
+    for _ in range(2):
+        with exe_path.open("rb") as exe:
+            asset_store = AssetStore.load_from_file(exe, hash_cache=hash_cache)
+        assert asset_store.assets[1].filepath == "strings00.str"
+
+    assert hash_cache.get(asset_store.key) is not None
+
+
+def extract_incremental(
+    exe_path, extract_dir, compressed_dir, extract_mode=ExtractMode.SERIAL
+):
+    with exe_path.open("rb") as exe:
+        asset_store = AssetStore.load_from_file(exe)
+        asset_store.extract(
+            extract_dir,
+            compressed_dir,
+            max_workers=2,
+            create_entity_sheets=False,
+            generate_string_hashes=False,
+            extract_mode=extract_mode,
+            incremental=True,
+        )
+
+
+def mtimes(extract_dir):
+    return {
+        filepath: (extract_dir / filepath).stat().st_mtime_ns
+        for filepath in ASSETS
+        if not filepath.startswith("not/")
+    }
+
+
+@pytest.mark.parametrize("extract_mode", [ExtractMode.SERIAL, ExtractMode.PROCESS])
+def test_extract_incremental(tmp_path, extract_mode):
+    def extract():
+        extract_incremental(exe_path, extract_dir, compressed_dir, extract_mode)
+
+    extract_dir, compressed_dir = make_dirs(tmp_path)
+    builder = BundleBuilder()
+    for filepath, (data, is_encrypted) in ASSETS.items():
+        builder.add_asset(filepath, data, is_encrypted)
+    exe_path = builder.write(tmp_path / "Spel2.exe")
+    extract()
+    first = mtimes(extract_dir)
+
+    # Nothing changed
+    extract()
+    assert mtimes(extract_dir) == first
+
+    # An extracted file was edited so it's restored
+    level_path = extract_dir / "Data/Levels/abzu.lvl"
+    level_path.write_bytes(b"edited")
+    edited = mtimes(extract_dir)
+    extract()
+    assert level_path.read_bytes() == ASSETS["Data/Levels/abzu.lvl"][0]
+    restored = mtimes(extract_dir)
+    assert restored["Data/Levels/abzu.lvl"] != edited["Data/Levels/abzu.lvl"]
+    assert {k: v for k, v in restored.items() if k != "Data/Levels/abzu.lvl"} == {
+        k: v for k, v in first.items() if k != "Data/Levels/abzu.lvl"
+    }
+
+    # The exe changes for strings00.str, which changes the bundle key too
+    builder.assets[1] = ("strings00.str", b"# Menu\nPlay!\n", True)
+    builder.write(exe_path)
+    extract()
+    assert (extract_dir / "strings00.str").read_bytes() == b"# Menu\nPlay!\n"
+    updated = mtimes(extract_dir)
+    assert updated["strings00.str"] != restored["strings00.str"]
+    assert {k: v for k, v in updated.items() if k != "strings00.str"} == {
+        k: v for k, v in restored.items() if k != "strings00.str"
+    }
+
+
+def test_extract_fingerprints_only_when_incremental(exe_path, tmp_path, monkeypatch):
+    extract_dir, compressed_dir = make_dirs(tmp_path)
+    decrypted = []
+    chacha = assets.chacha
+
+    def counting_chacha(filepath, data, key):
+        decrypted.append(filepath)
+        return chacha(filepath, data, key)
+
+    monkeypatch.setattr(assets, "chacha", counting_chacha)
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            assets.AssetFingerprint,
+            "from_payload",
+            lambda payload: pytest.fail("Asset was fingerprinted"),
+        )
+        with exe_path.open("rb") as exe:
+            AssetStore.load_from_file(exe).extract(
+                extract_dir,
+                compressed_dir,
+                create_entity_sheets=False,
+                generate_string_hashes=False,
+                extract_mode=ExtractMode.SERIAL,
+            )
+    assert not (compressed_dir / "extract-manifest.json").exists()
+
+    # Each encrypted asset is only decrypted once, by the extraction itself
+    decrypted.clear()
+    extract_incremental(exe_path, extract_dir, compressed_dir)
+    assert sorted(decrypted) == [
+        b"Data/Levels/abzu.lvl",
+        b"strings00.str",
+        b"strings01.str",
+    ]
+    assert (compressed_dir / "extract-manifest.json").exists()
+
+
+def test_streaming_pack_matches(exe_path, tmp_path):
+    mods_dir = tmp_path / "Mods"
+    extract_dir, _ = make_dirs(mods_dir)
+    with exe_path.open("rb") as exe:
+        asset_store = AssetStore.load_from_file(exe)
+        asset_store.extract(
+            extract_dir,
+            mods_dir / ".compressed" / "Extracted",
+            create_entity_sheets=False,
+        )
+    # Large enough to need several chunks, with a partial final block
+    (extract_dir / "Data/Levels/abzu.lvl").write_bytes(os.urandom(0x280025))
+    (extract_dir / "shaders.hlsl").write_bytes(os.urandom(0x180007))
+
+    packed = {}
+    for streaming in (False, True):
+        dest_path = tmp_path / f"Spel2-{streaming}.exe"
+        shutil.copy2(exe_path, dest_path)
+        with dest_path.open("rb+") as dest_file:
+            asset_store = AssetStore.load_from_file(dest_file)
+            asset_store.repackage(
+                [], extract_dir, mods_dir / ".compressed", streaming=streaming
+            )
+        packed[streaming] = dest_path.read_bytes()
+
+    assert packed[True] == packed[False]
+
+    dest_path = tmp_path / "Spel2-True.exe"
+    extract_dir, compressed_dir = make_dirs(tmp_path / "Repacked")
+    with dest_path.open("rb") as dest_file:
+        AssetStore.load_from_file(dest_file).extract(
+            extract_dir, compressed_dir, create_entity_sheets=False
+        )
+    assert (extract_dir / "shaders.hlsl").read_bytes() == (
+        mods_dir / "Extracted" / "shaders.hlsl"
+    ).read_bytes()
+
+
+def test_needs_compression_skips_hashing_unchanged(exe_path, tmp_path, monkeypatch):
+    mods_dir = tmp_path / "Mods"
+    extract_dir, compressed_dir = make_dirs(mods_dir)
+    with exe_path.open("rb") as exe:
+        asset_store = AssetStore.load_from_file(exe)
+        asset_store.extract(
+            extract_dir, compressed_dir, recompress=True, create_entity_sheets=False
+        )
+    asset_path = extract_dir / "Data/Levels/abzu.lvl"
+    disk_asset = DiskAsset(
+        asset_path,
+        mods_dir / ".compressed",
+        asset_store.find_asset("Data/Levels/abzu.lvl"),
+    )
+
+    hashed = []
+    real_md5sum_path = assets.md5sum_path
+
+    def counting_md5sum_path(path):
+        hashed.append(path)
+        return real_md5sum_path(path)
+
+    monkeypatch.setattr(assets, "md5sum_path", counting_md5sum_path)
+
+    assert not disk_asset.needs_compression()
+    assert not hashed
+
+    # Touched but unchanged: hashed once, then trusted again
+    stat = asset_path.stat()
+    os.utime(asset_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not disk_asset.needs_compression()
+    assert len(hashed) == 1
+    assert not disk_asset.needs_compression()
+    assert len(hashed) == 1
+
+    asset_path.write_bytes(b"\\.abzu\n")
+    assert disk_asset.needs_compression()
+    disk_asset.compress()
+    hashed.clear()
+    assert not disk_asset.needs_compression()
+    assert not hashed
+
+
+def test_compress_if_needed_raises():
+    class FailingDiskAsset:
+        def compress_if_needed(self, *_args):
+            raise OSError("disk full")
+
+    disk_bundle = DiskBundle({"shaders.hlsl": FailingDiskAsset()})
+    with pytest.raises(OSError, match="disk full"):
+        disk_bundle.compress_if_needed()
+
+
+def test_repackage_fit_to_budget(exe_path, tmp_path):
+    mods_dir = tmp_path / "Mods"
+    extract_dir, compressed_dir = make_dirs(mods_dir)
+    with exe_path.open("rb") as exe:
+        AssetStore.load_from_file(exe).extract(
+            extract_dir, compressed_dir, create_entity_sheets=False
+        )
+
+    with exe_path.open("rb") as exe:
+        original_lens = {
+            asset.filepath: asset.asset_block.asset_len
+            for asset in AssetStore.load_from_file(exe).assets
+            if asset.filepath
+        }
+
+    with exe_path.open("rb+") as exe:
+        asset_store = AssetStore.load_from_file(exe)
+        asset_store.repackage(
+            [],
+            extract_dir,
+            mods_dir / ".compressed",
+            compression=CompressionSettings(level=1, fit_to_budget=True),
+        )
+        for asset in asset_store.assets:
+            if asset.filepath:
+                assert asset.asset_block.asset_len <= original_lens[asset.filepath]
+
+    extract_dir, compressed_dir = make_dirs(tmp_path / "Repacked")
+    with exe_path.open("rb") as exe:
+        AssetStore.load_from_file(exe).extract(
+            extract_dir, compressed_dir, create_entity_sheets=False
+        )
+    for filepath, (data, _) in ASSETS.items():
+        if filepath in original_lens:
+            assert (extract_dir / filepath).read_bytes() == data
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from modlunky2.assets.chacha import chacha, chacha_rest, xor_blocks
+
+FILEPATH = b"Data/Textures/items.png"
+KEY = 0x1234567890ABCDEF
+
+
+@pytest.mark.parametrize(
+    "size", [0, 1, 0x3F, 0x40, 0x41, 0x1000, 0x10000 + 0x25, 0x20000 + 0x85]
+)
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_chacha_matches_reference(size, version):
+    data = os.urandom(size)
+    expected = chacha(FILEPATH, data, KEY, version=version, reference=True)
+    assert chacha(FILEPATH, data, KEY, version=version) == expected
+    assert chacha(FILEPATH, memoryview(data), KEY, version=version) == expected
+
+
+def test_chacha_roundtrip():
+    data = os.urandom(0x1234)
+    encrypted = chacha(FILEPATH, data, KEY)
+    assert encrypted != data
+    assert chacha(FILEPATH, encrypted, KEY) == data
+
+
+# 0x100 leaves a last chunk of whole blocks shorter than the others
+@pytest.mark.parametrize("chunk_size", [0x40, 0x100])
+def test_xor_blocks_small_chunks(chunk_size):
+    key = bytes(range(0x40))
+    data = os.urandom(0x40 * 5 + 7)
+    expected = chacha_rest(data, key, reference=True)
+    assert xor_blocks(data, key, chunk_size=chunk_size) == expected
@@ -0,0 +1,51 @@
+import os
+import threading
+
+import zstandard as zstd
+
+from modlunky2.assets import compression
+from modlunky2.assets.compression import CompressionSettings, compress, get_compressor
+
+# Compressible, but much better at higher levels
+DATA = b"".join(
+    b"%d:%s\n" % (i, os.urandom(4).hex().encode() * (i % 7)) for i in range(20000)
+)
+
+
+def decompress(data):
+    params = zstd.get_frame_parameters(data)
+    assert params.content_size == len(DATA)
+    assert params.dict_id == 0
+    return zstd.ZstdDecompressor().decompress(data)
+
+
+def test_get_compressor_reused_per_thread():
+    assert get_compressor(3) is get_compressor(3)
+    assert get_compressor(3) is not get_compressor(4)
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_compressor(3)))
+    thread.start()
+    thread.join()
+    assert other[0] is not get_compressor(3)
+
+
+def test_compress_threaded(monkeypatch):
+    monkeypatch.setattr(compression, "THREADED_MIN_SIZE", 1024)
+    compressed = compress(DATA, CompressionSettings(level=3, threads=2))
+    assert decompress(compressed) == DATA
+
+
+def test_fit_to_budget():
+    fast = compress(DATA, CompressionSettings(level=1))
+    best = compress(DATA, CompressionSettings(level=19))
+    assert len(best) < len(fast)
+
+    settings = CompressionSettings(level=1, fit_to_budget=True, budget_levels=(19,))
+    # Fits, so stays at the fast level
+    assert compress(DATA, settings, budget=len(fast)) == fast
+    # Doesn't fit, so is raised
+    assert compress(DATA, settings, budget=len(best)) == best
+    # Can't fit at all, so the best effort is returned
+    assert compress(DATA, settings, budget=1) == best
+    assert decompress(best) == DATA
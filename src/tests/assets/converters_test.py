@@ -0,0 +1,41 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from modlunky2.assets.converters import (
+    _png_to_dds_reference,
+    dds_to_png,
+    png_to_dds,
+)
+
+
+def random_image(width, height):
+    img = Image.frombytes("RGBA", (width, height), os.urandom(width * height * 4))
+    # Plenty of fully transparent pixels with non-zero colour
+    alpha = img.getchannel("A").point(lambda a: 0 if a < 128 else a)
+    img.putalpha(alpha)
+    return img
+
+
+@pytest.mark.parametrize("size", [(1, 1), (7, 3), (128, 64)])
+@pytest.mark.parametrize("mode", ["RGBA", "RGB", "LA", "P"])
+def test_png_to_dds_matches_reference(size, mode):
+    img = random_image(*size).convert(mode)
+    assert png_to_dds(img) == _png_to_dds_reference(img)
+
+
+def test_png_to_dds_zeroes_transparent_pixels():
+    img = Image.new("RGBA", (2, 1), (255, 255, 255, 0))
+    img.putpixel((1, 0), (1, 2, 3, 4))
+    data = png_to_dds(img)
+    assert data[:4] == b"DDS "
+    assert data[128:] == bytes([0, 0, 0, 0, 1, 2, 3, 4])
+
+
+def test_png_to_dds_round_trip():
+    img = random_image(16, 8)
+    with Image.open(io.BytesIO(dds_to_png(png_to_dds(img)))) as png:
+        assert png.size == (16, 8)
+        assert png.getpixel((0, 0))[3] == img.getpixel((0, 0))[3]
@@ -0,0 +1,89 @@
+import os
+from struct import pack
+
+import pytest
+
+from modlunky2.assets import exe_identity
+from modlunky2.assets.exe_identity import ExeIdentity, ExeIdentityCache
+from modlunky2.assets.patcher import Patcher
+from modlunky2.assets.hashing import md5sum_path
+
+CHECKSUM_CHECK = b"\x48\x3B\xC1\x74\x09\x33\xC9\xFF\x15\x01\x02\x03\x04\xCC"
+PE_OFFSET = 0x80
+
+
+def exe_data(pe_timestamp):
+    header = bytearray(b"MZ" + b"\x00" * 0x3A + pack("<I", PE_OFFSET))
+    header += b"\x00" * (PE_OFFSET - len(header))
+    header += b"PE\x00\x00" + pack("<HHI", 0x8664, 1, pe_timestamp)
+    return bytes(header) + b"\x00" * 0x40000 + CHECKSUM_CHECK + b"\x00" * 0x40000
+
+
+@pytest.fixture(name="exe_path")
+def fixture_exe_path(tmp_path):
+    path = tmp_path / "Spel2.exe"
+    path.write_bytes(exe_data(0x5F000000))
+    return path
+
+
+@pytest.fixture(name="hashed")
+def fixture_hashed(monkeypatch):
+    hashed = []
+
+    def counting_md5sum_path(path):
+        hashed.append(path)
+        return md5sum_path(path)
+
+    monkeypatch.setattr(exe_identity, "md5sum_path", counting_md5sum_path)
+    return hashed
+
+
+def test_identity(exe_path):
+    identity = ExeIdentity.from_path(exe_path)
+    assert identity.pe_timestamp == 0x5F000000
+    assert identity.size == exe_path.stat().st_size
+    assert identity == ExeIdentity.from_path(exe_path)
+
+
+def test_md5sum_cached(exe_path, tmp_path, hashed):
+    cache = ExeIdentityCache(tmp_path / "cache.json")
+    assert cache.md5sum(exe_path) == md5sum_path(exe_path)
+    assert cache.md5sum(exe_path) == md5sum_path(exe_path)
+    assert len(hashed) == 1
+
+    # Another instance reads it back from disk
+    assert ExeIdentityCache(tmp_path / "cache.json").md5sum(exe_path)
+    assert len(hashed) == 1
+
+
+def test_game_update_invalidates(exe_path, tmp_path, hashed):
+    cache = ExeIdentityCache(tmp_path / "cache.json")
+    original_md5 = cache.md5sum(exe_path)
+
+    # Same size and mtime, only the PE timestamp differs
+    stat = exe_path.stat()
+    exe_path.write_bytes(exe_data(0x60000000))
+    os.utime(exe_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert cache.md5sum(exe_path) != original_md5
+    assert len(hashed) == 2
+
+
+def fail_scan(_patcher):
+    pytest.fail("Exe was scanned")
+
+
+def test_is_patched(exe_path, tmp_path, monkeypatch):
+    cache = ExeIdentityCache(tmp_path / "cache.json")
+    assert not cache.is_patched(exe_path)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Patcher, "scan", fail_scan)
+        assert not cache.is_patched(exe_path)
+
+    with exe_path.open("rb+") as exe:
+        assert Patcher(exe).patch_checksum()
+    cache.record_patched(exe_path)
+
+    monkeypatch.setattr(Patcher, "scan", fail_scan)
+    assert cache.is_patched(exe_path)
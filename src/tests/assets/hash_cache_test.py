@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from modlunky2.assets.hash_cache import FilepathHashCache
+
+
+def test_roundtrip(tmp_path):
+    cache = FilepathHashCache(tmp_path / "hashes.json")
+    assert cache.get(0x1234) is None
+
+    cache.put(0x1234, {"strings00.str": b"\x01\x02"})
+    assert cache.get(0x1234) == {"strings00.str": b"\x01\x02"}
+    assert cache.get(0x5678) is None
+
+
+def test_evicts_oldest_keys(tmp_path):
+    cache = FilepathHashCache(tmp_path / "hashes.json", max_keys=2)
+    for key in range(3):
+        cache.put(key, {"shaders.hlsl": bytes([key])})
+
+    assert cache.get(0) is None
+    assert cache.get(1) == {"shaders.hlsl": b"\x01"}
+    assert cache.get(2) == {"shaders.hlsl": b"\x02"}
+
+
+def test_ignores_other_versions(tmp_path):
+    cache_path = tmp_path / "hashes.json"
+    cache = FilepathHashCache(cache_path)
+    cache.put(0x1234, {"strings00.str": b"\x01"})
+
+    data = json.loads(cache_path.read_text(encoding="utf-8"))
+    data["version"] = FilepathHashCache.VERSION + 1
+    cache_path.write_text(json.dumps(data), encoding="utf-8")
+    assert cache.get(0x1234) is None
+
+    cache_path.write_text("not json", encoding="utf-8")
+    assert cache.get(0x1234) is None
+
+
+def test_evicts_by_store_order(tmp_path):
+    cache = FilepathHashCache(tmp_path / "hashes.json", max_keys=2)
+    for key in [2, 0, 1]:
+        cache.put(key, {"shaders.hlsl": bytes([key])})
+    # Storing a key again makes it the newest
+    cache.put(0, {"shaders.hlsl": b"\x00"})
+    cache.put(3, {"shaders.hlsl": b"\x03"})
+
+    assert cache.get(1) is None
+    assert cache.get(2) is None
+    assert cache.get(0) == {"shaders.hlsl": b"\x00"}
+    assert cache.get(3) == {"shaders.hlsl": b"\x03"}
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {},
+        {"hashes": None},
+        {"hashes": {"strings00.str": "not hex"}},
+        {"hashes": {"strings00.str": 1}},
+    ],
+)
+def test_ignores_corrupt_entries(tmp_path, entry):
+    cache_path = tmp_path / "hashes.json"
+    cache = FilepathHashCache(cache_path)
+    cache.put(0x1234, {"strings00.str": b"\x01"})
+
+    data = json.loads(cache_path.read_text(encoding="utf-8"))
+    data["entries"]["0000000000001234"] = entry
+    cache_path.write_text(json.dumps(data), encoding="utf-8")
+    assert cache.get(0x1234) is None
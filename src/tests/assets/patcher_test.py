@@ -0,0 +1,53 @@
+from modlunky2.assets.patcher import (
+    CHECKSUM_PATCH_REPLACE,
+    RELEASE_AOB_PRODUCTION,
+    RELEASE_AOB_REPLACE,
+    Patcher,
+)
+
+CHECKSUM_CHECK = b"\x48\x3B\xC1\x74\x09\x33\xC9\xFF\x15\x01\x02\x03\x04\xCC\x48\x8B"
+
+
+def write_exe(path, checksum_check=CHECKSUM_CHECK):
+    path.write_bytes(
+        b"MZ"
+        + b"\x00" * 0x5000
+        + checksum_check
+        + b"\x00" * 0x3000
+        + RELEASE_AOB_PRODUCTION
+        + b"\x00" * 0x100
+    )
+    return path
+
+
+def test_patch(tmp_path):
+    exe_path = write_exe(tmp_path / "Spel2.exe")
+    with exe_path.open("rb+") as exe:
+        patcher = Patcher(exe)
+        assert not patcher.is_checksum_patched()
+        assert patcher.patch_checksum()
+        assert patcher.patch_release()
+        assert patcher.is_checksum_patched()
+        # Nothing left to patch
+        assert not patcher.patch_checksum()
+        assert not patcher.patch_release()
+
+    data = exe_path.read_bytes()
+    assert CHECKSUM_PATCH_REPLACE in data
+    assert RELEASE_AOB_REPLACE in data
+    assert RELEASE_AOB_PRODUCTION not in data
+
+    with exe_path.open("rb") as exe:
+        assert Patcher(exe).is_checksum_patched()
+
+
+def test_patch_checksum_unexpected_form(tmp_path):
+    exe_path = write_exe(
+        tmp_path / "Spel2.exe", CHECKSUM_CHECK[:13] + b"\x90" + CHECKSUM_CHECK[14:]
+    )
+    original = exe_path.read_bytes()
+    with exe_path.open("rb+") as exe:
+        patcher = Patcher(exe)
+        assert not patcher.is_checksum_patched()
+        assert not patcher.patch_checksum()
+    assert exe_path.read_bytes() == original
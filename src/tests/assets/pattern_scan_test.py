@@ -0,0 +1,44 @@
+import pytest
+
+from modlunky2.assets.pattern_scan import Pattern, scan, scan_file
+
+
+def test_from_aob():
+    pattern = Pattern.from_aob("call", "?? FF ?? ?? 01 02 03 ?? CC")
+    assert pattern.size == 9
+    assert pattern.segments == ((1, b"\xff"), (4, b"\x01\x02\x03"), (8, b"\xcc"))
+    assert pattern.anchor == (4, b"\x01\x02\x03")
+
+
+def test_from_aob_needs_literal():
+    with pytest.raises(ValueError):
+        Pattern.from_aob("empty", "?? ??")
+
+
+@pytest.mark.parametrize("window_size", [1, 3, 5, 0x400000])
+def test_scan_finds_all_hits(window_size):
+    buffer = (
+        b"\xff\x01\x02\x03\xcc"  # 0: ff 01 02 03 cc
+        b"\xff\xaa\x02\x03\xcc"  # 5: wildcard differs
+        b"\xfe\x01\x02\x03\xcc"  # 10: literal differs
+        b"\x01\x01\x02\x03"  # 15: runs past the end for `call`
+    )
+    call = Pattern.from_aob("call", "FF ?? 02 03 CC")
+    literal = Pattern.from_bytes("literal", b"\x01\x02")
+    hits = scan(buffer, [call, literal], window_size=window_size)
+    assert hits == {"call": [0, 5], "literal": [1, 11, 16]}
+
+
+def test_scan_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"\x00" * 100 + b"needle" + b"\x00" * 100)
+    with path.open("rb") as handle:
+        assert scan_file(handle, [Pattern.from_bytes("needle", b"needle")]) == {
+            "needle": [100]
+        }
+
+    path.write_bytes(b"")
+    with path.open("rb") as handle:
+        assert scan_file(handle, [Pattern.from_bytes("needle", b"needle")]) == {
+            "needle": []
+        }
@@ -0,0 +1,72 @@
+import pytest
+
+from modlunky2.assets.riff import RIFF
+from modlunky2.assets.soundbank import fsb_chunks, fsb_view
+from modlunky2.assets.testing import build_fsb5_pcm16, build_soundbank
+
+FSBS = [
+    build_fsb5_pcm16([("a", b"ab" * 3)]),
+    build_fsb5_pcm16([("b", b"cd" * 5), ("c", b"ef" * 7)]),
+]
+
+
+def test_riff_index():
+    bank = build_soundbank(FSBS)
+    riff = RIFF(bank)
+
+    assert riff.type == b"FEV "
+    assert [chunk.name for chunk in riff.children] == [
+        b"FMT ",
+        b"LIST",
+        b"SND ",
+        b"SND ",
+    ]
+    assert riff.children[1].type == b"PROJ"
+    assert [chunk.name for chunk in riff.chunks] == [
+        b"RIFF",
+        b"FMT ",
+        b"LIST",
+        b"BNKI",
+        b"SND ",
+        b"SND ",
+    ]
+    for chunk in riff.chunks:
+        assert chunk.offset % chunk.alignment == 0
+        assert bank[chunk.offset - 8 : chunk.offset - 4] == chunk.name
+    assert riff.root.end == len(bank)
+
+    for chunk, fsb in zip(fsb_chunks(riff), FSBS):
+        view = fsb_view(riff, chunk)
+        assert view.obj is bank
+        assert view == fsb
+
+
+def test_riff_open(tmp_path):
+    path = tmp_path / "soundbank.bank"
+    path.write_bytes(build_soundbank(FSBS))
+    with RIFF.open(path) as riff:
+        with fsb_view(riff, fsb_chunks(riff)[1]) as view:
+            assert view == FSBS[1]
+
+
+def test_riff_odd_sized_chunks_are_padded():
+    data = b"RIFF" + (26).to_bytes(4, "little") + b"TEST"
+    data += b"ODD " + (3).to_bytes(4, "little") + b"abc\x00"
+    data += b"EVEN" + (2).to_bytes(4, "little") + b"de"
+    riff = RIFF(data)
+    assert [(chunk.name, bytes(riff.view(chunk))) for chunk in riff.children] == [
+        (b"ODD ", b"abc"),
+        (b"EVEN", b"de"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"RIFX\x04\x00\x00\x00TEST",
+        b"RIFF\xff\x00\x00\x00TEST",
+    ],
+)
+def test_riff_invalid(data):
+    with pytest.raises(ValueError):
+        RIFF(data)
@@ -0,0 +1,72 @@
+import json
+import os
+import wave
+
+import pytest
+
+from modlunky2.assets.soundbank import MANIFEST_FILENAME, Extension, extract_soundbank
+from modlunky2.assets.testing import build_fsb5_pcm16, build_soundbank
+
+SAMPLES = [(f"sample{i:02}", bytes([i]) * (2 * (i + 1) * 50)) for i in range(10)]
+
+
+@pytest.fixture(name="soundbank_path")
+def fixture_soundbank_path(tmp_path):
+    path = tmp_path / "soundbank.bank"
+    path.write_bytes(
+        build_soundbank([build_fsb5_pcm16(SAMPLES[:6]), build_fsb5_pcm16(SAMPLES[6:])])
+    )
+    return path
+
+
+def test_extract_soundbank(soundbank_path, tmp_path):
+    dest_path = tmp_path / "soundbank"
+    stats = extract_soundbank(
+        soundbank_path, dest_path, [Extension.WAV], max_workers=2, batch_size=3
+    )
+    assert stats["wav"].extracted == len(SAMPLES)
+    assert stats["wav"].skipped == 0
+    assert stats["wav"].samples_per_sec > 0
+
+    for name, data in SAMPLES:
+        with wave.open(str(dest_path / "wav" / f"{name}.wav"), "rb") as wav:
+            assert wav.getframerate() == 44100
+            assert wav.readframes(wav.getnframes()) == data
+
+
+def test_extract_soundbank_skips_unchanged(soundbank_path, tmp_path):
+    dest_path = tmp_path / "soundbank"
+    extract_soundbank(soundbank_path, dest_path, max_workers=1)
+
+    stats = extract_soundbank(soundbank_path, dest_path, max_workers=1)
+    assert stats["wav"].extracted == 0
+    assert stats["wav"].skipped == len(SAMPLES)
+
+    modified = dest_path / "wav" / "sample03.wav"
+    original = modified.read_bytes()
+    modified.write_bytes(original[:-1] + b"\xff")
+    (dest_path / "wav" / "sample07.wav").unlink()
+
+    stats = extract_soundbank(soundbank_path, dest_path, max_workers=1)
+    assert stats["wav"].extracted == 2
+    assert stats["wav"].skipped == len(SAMPLES) - 2
+    assert modified.read_bytes() == original
+
+
+def test_extract_soundbank_touched_unchanged(soundbank_path, tmp_path):
+    dest_path = tmp_path / "soundbank"
+    extract_soundbank(soundbank_path, dest_path, max_workers=1)
+
+    touched = dest_path / "wav" / "sample05.wav"
+    stat = touched.stat()
+    mtime_ns = stat.st_mtime_ns + 1_000_000_000
+    os.utime(touched, ns=(stat.st_atime_ns, mtime_ns))
+
+    stats = extract_soundbank(soundbank_path, dest_path, max_workers=1)
+    assert stats["wav"].extracted == 0
+    assert stats["wav"].skipped == len(SAMPLES)
+    assert touched.stat().st_mtime_ns == mtime_ns
+
+    # The new mtime is remembered so the file isn't hashed again
+    manifest = json.loads((dest_path / MANIFEST_FILENAME).read_text())
+    assert manifest["entries"]["wav/sample05.wav"]["mtime-ns"] == mtime_ns
@@ -0,0 +1,50 @@
+from modlunky2.assets.string_hashing import StringHashes
+
+ENGLISH = "# Menu\nPlay\n  Options \n#\nQuit\n# Items\nRope\n".encode()
+FRENCH = "# Menu\nJouer\n  Options \n#\nQuitter\n# Items\nCorde\n".encode()
+
+
+def test_from_data():
+    string_hashes = StringHashes.from_data(ENGLISH)
+    assert len(string_hashes.hashes) == 7
+    assert string_hashes.hashes[0] is None
+    assert string_hashes.hashes[3] is None
+    # Comment sections are part of the hash
+    assert string_hashes.hashes[1] != StringHashes.from_data(b"Play\n").hashes[0]
+
+
+def test_write_all_string_hashes(tmp_path):
+    string_hashes = StringHashes.from_data(ENGLISH)
+    english_dest = tmp_path / "strings00_hashed.str"
+    french_dest = tmp_path / "strings01_hashed.str"
+    mismatched_dest = tmp_path / "strings02_hashed.str"
+
+    written = string_hashes.write_all_string_hashes(
+        [
+            (ENGLISH, english_dest),
+            (FRENCH, french_dest),
+            (b"Too\nshort\n", mismatched_dest),
+        ],
+        max_workers=2,
+    )
+
+    assert written == [english_dest, french_dest]
+    assert not mismatched_dest.exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        english_dest.name,
+        french_dest.name,
+    ]
+
+    hashes = string_hashes.hashes
+    assert (
+        french_dest.read_bytes()
+        == (
+            "# Menu\n"
+            f"{hashes[1]}: Jouer\n"
+            f"{hashes[2]}:   Options \n"
+            "#\n"
+            f"{hashes[4]}: Quitter\n"
+            "# Items\n"
+            f"{hashes[6]}: Corde\n"
+        ).encode()
+    )
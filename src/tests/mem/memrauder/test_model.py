@@ -1,22 +1,42 @@
 import ctypes
+import dataclasses
 from dataclasses import dataclass, field
+import random
 from enum import IntEnum, IntFlag
 from typing import FrozenSet, Optional, Set, Tuple
 import pytest
 
-from modlunky2.mem.memrauder.dsl import struct_field, sc_int8
+from modlunky2.mem.memrauder.dsl import (
+    dc_struct,
+    pointer,
+    struct_field,
+    sc_bool,
+    sc_double,
+    sc_float,
+    sc_int8,
+    sc_int16,
+    sc_int64,
+    sc_longdouble,
+    sc_uint8,
+    sc_uint32,
+    sc_void_p,
+)
 from modlunky2.mem.memrauder.model import (
     Array,
     BytesReader,
     DataclassStruct,
     FieldPath,
     MemContext,
+    MemoryReader,
+    PageCacheStats,
+    PageCachingReader,
     Pointer,
     PolyPointer,
     PolyPointerType,
     ScalarCType,
     ScalarCValueConstructionError,
     StructFieldMeta,
+    lazy_view_class,
 )
 
 
@@ -151,6 +171,151 @@ def test_dataclass_struct_scalar_c_error_passthrough():
         dc_struct.from_bytes(b"\x00", MemContext())
 
 
+@dataclass(frozen=True)
+class MixedInner:
+    flag: bool = struct_field(0x0, sc_bool)
+    four: FourEnum = struct_field(0x1, sc_int8)
+
+
+@dataclass(frozen=True)
+class MixedStruct:
+    small: int = struct_field(0x1, sc_int8)
+    # Overlaps small
+    wide: int = struct_field(0x0, sc_int16)
+    flags: SecondBitFlag = struct_field(0x4, sc_uint32)
+    addr: int = struct_field(0x8, sc_void_p)
+    single: float = struct_field(0x10, sc_float)
+    double: float = struct_field(0x18, sc_double)
+    big: int = struct_field(0x20, sc_int64)
+    extended: float = struct_field(0x30, sc_longdouble)
+    inner: MixedInner = struct_field(0x40, dc_struct)
+    last: int = struct_field(0x44, sc_uint8)
+
+
+def mixed_struct_buf(rand: random.Random) -> bytearray:
+    buf = bytearray(rand.randbytes(0x45))
+    # Keep the enum constructible
+    buf[0x41] = 4
+    return buf
+
+
+def test_dataclass_struct_compiled_matches_interpreted():
+    dc_struct_type = DataclassStruct(FieldPath(), MixedStruct)
+    rand = random.Random(1234)
+    for _ in range(200):
+        buf = bytes(mixed_struct_buf(rand))
+        # pylint: disable=protected-access
+        compiled = dc_struct_type._compiled_from_bytes(buf, MemContext())
+        interpreted = dc_struct_type.from_bytes_interpreted(buf, MemContext())
+        # repr, since NaN != NaN
+        assert repr(compiled) == repr(interpreted)
+        assert type(compiled.flags) is SecondBitFlag
+        assert type(compiled.inner.four) is FourEnum
+
+
+def test_dataclass_struct_compiled_null_pointer():
+    dc_struct_type = DataclassStruct(FieldPath(), MixedStruct)
+    buf = bytearray(0x45)
+    buf[0x41] = 4
+    assert dc_struct_type.from_bytes(bytes(buf), MemContext()).addr == 0
+
+
+def test_dataclass_struct_compiled_errors():
+    dc_struct_type = DataclassStruct(FieldPath(), MixedStruct)
+    buf = mixed_struct_buf(random.Random(1234))
+    with pytest.raises(ValueError) as too_small:
+        dc_struct_type.from_bytes(bytes(buf[:0x10]), MemContext())
+    assert str(too_small.value) == "failed to get value for field single"
+
+    buf[0x41] = 0
+    with pytest.raises(ScalarCValueConstructionError):
+        dc_struct_type.from_bytes(bytes(buf), MemContext())
+
+
+@dataclass
+class CountingReader(MemoryReader):
+    slab: bytes
+    reads: int = 0
+
+    def read(self, addr: int, size: int) -> Optional[bytes]:
+        self.reads += 1
+        return BytesReader(self.slab).read(addr, size)
+
+
+@dataclass(frozen=True)
+class LazyOuter:
+    num: int = struct_field(0x0, sc_uint8)
+    inner: Optional[MixedInner] = struct_field(0x8, pointer(dc_struct))
+    mixed: MixedStruct = struct_field(0x10, dc_struct)
+
+
+def test_dataclass_struct_lazy_matches_eager():
+    dc_struct_type = DataclassStruct(FieldPath(), MixedStruct)
+    rand = random.Random(1234)
+    for _ in range(200):
+        buf = bytes(mixed_struct_buf(rand))
+        eager = dc_struct_type.from_bytes(buf, MemContext())
+        lazy = dc_struct_type.from_bytes(buf, MemContext(lazy=True))
+        assert type(lazy) is lazy_view_class(MixedStruct)
+        assert isinstance(lazy, MixedStruct)
+        assert repr(lazy) == repr(eager)
+
+
+def test_dataclass_struct_lazy_equality():
+    buf = mixed_struct_buf(random.Random(1234))
+    # Avoid NaN, which isn't equal to itself
+    buf[0x10:0x14] = bytes(ctypes.c_float(1.5))
+    buf[0x18:0x20] = bytes(ctypes.c_double(2.25))
+    extended = bytes(ctypes.c_longdouble(3.0))
+    buf[0x30 : 0x30 + len(extended)] = extended
+    buf = bytes(buf)
+    dc_struct_type = DataclassStruct(FieldPath(), MixedStruct)
+    eager = dc_struct_type.from_bytes(buf, MemContext())
+
+    lazy = dc_struct_type.from_bytes(buf, MemContext(lazy=True))
+    assert lazy == eager
+    assert eager == lazy
+    assert hash(lazy) == hash(eager)
+    assert lazy != dataclasses.replace(eager, small=eager.small + 1)
+
+
+def test_dataclass_struct_lazy_defers_pointers():
+    slab = bytearray(0x60)
+    slab[0x0] = 7
+    slab[0x8] = 0x58
+    slab[0x51] = 4
+    slab[0x59] = 4
+    reader = CountingReader(bytes(slab))
+    mem_ctx = MemContext(reader, lazy=True)
+
+    outer = mem_ctx.type_at_addr(LazyOuter, 0)
+    assert reader.reads == 1
+    assert outer.num == 7
+    assert reader.reads == 1
+
+    assert outer.inner == MixedInner(False, FourEnum.FOUR)
+    assert reader.reads == 2
+    # Cached after the first access
+    assert outer.inner is outer.inner
+    assert reader.reads == 2
+    assert outer.mixed.inner.four is FourEnum.FOUR
+
+
+def test_dataclass_struct_lazy_errors():
+    dc_struct_type = DataclassStruct(FieldPath(), LazyOuter)
+    buf = bytearray(0x55)
+    buf[0x51] = 4
+
+    # Scalars are still decoded up front
+    with pytest.raises(ValueError):
+        dc_struct_type.from_bytes(bytes(buf[:0x10]), MemContext(lazy=True))
+
+    buf[0x51] = 0
+    outer = dc_struct_type.from_bytes(bytes(buf), MemContext(lazy=True))
+    with pytest.raises(ScalarCValueConstructionError):
+        outer.mixed.inner  # pylint: disable=pointless-statement
+
+
 @pytest.mark.parametrize(
     "py_type,expected",
     [(Tuple[int, ...], (10, 2)), (Tuple[int, int], (10, 2)), (FrozenSet[int], {10, 2})],
@@ -187,6 +352,38 @@ def test_array_scalar_c_error_passthrough():
         read()
 
 
+@pytest.mark.parametrize(
+    "py_type",
+    [Tuple[int, ...], Tuple[FourEnum, ...], FrozenSet[SecondBitFlag], Tuple[bool, ...]],
+)
+def test_array_matches_elementwise(py_type):
+    collection_type, elem_py_type = (
+        (frozenset, py_type.__args__[0])
+        if py_type.__origin__ is frozenset
+        else (tuple, py_type.__args__[0])
+    )
+    c_type = ctypes.c_bool if elem_py_type is bool else ctypes.c_uint32
+    count = 512
+    elem_type = ScalarCType(FieldPath(), elem_py_type, c_type)
+    elem_size = ctypes.sizeof(c_type)
+    rand = random.Random(1234)
+    values = [rand.choice([0, 4, 5]) for _ in range(count)]
+    if elem_py_type is FourEnum:
+        values = [4] * count
+    buf = b"".join(bytes(c_type(value)) for value in values)
+
+    arr = Array(
+        FieldPath(), py_type, lambda path, t: ScalarCType(path, t, c_type), count
+    )
+    expected = collection_type(
+        elem_type.from_bytes(buf[i * elem_size : (i + 1) * elem_size], MemContext())
+        for i in range(count)
+    )
+    result = arr.from_bytes(buf, MemContext())
+    assert result == expected
+    assert [type(elem) for elem in result] == [type(elem) for elem in expected]
+
+
 @pytest.mark.parametrize(
     "addr_bytes,expected",
     [
@@ -238,12 +435,13 @@ def test_poly_pointer_castless(cls, expected_val):
     "cls,expected_val",
     [(Supreme, Supreme(1)), (Middle, Middle(1, 2)), (Lowest, Lowest(1, 2, 3))],
 )
-def test_poly_pointer_cast_down(cls, expected_val):
+@pytest.mark.parametrize("lazy", [False, True])
+def test_poly_pointer_cast_down(cls, expected_val, lazy):
     pp_type = PolyPointerType(
         FieldPath(), Optional[PolyPointer[Supreme]], DataclassStruct
     )
     pp_supreme = pp_type.from_bytes(
-        SUPREME_POINTER_BYTES, MemContext(LOWEST_BYTES_READER)
+        SUPREME_POINTER_BYTES, MemContext(LOWEST_BYTES_READER, lazy=lazy)
     )
     assert pp_supreme is not None
 
@@ -279,3 +477,64 @@ def test_poly_pointer_cast_up(cls):
 
     assert pp_poly.addr == SUPREME_POINTER_ADDR
     assert pp_poly.value == expected_val
+
+
+PAGE_SLAB = bytes(range(256)) * 4
+
+
+def test_page_caching_reader_matches_wrapped():
+    reader = PageCachingReader(BytesReader(PAGE_SLAB), page_size=16)
+    rand = random.Random(1234)
+    for _ in range(500):
+        addr = rand.randrange(len(PAGE_SLAB) + 32)
+        size = rand.randrange(1, 100)
+        assert reader.read(addr, size) == BytesReader(PAGE_SLAB).read(addr, size)
+
+
+def test_page_caching_reader_counts():
+    counting = CountingReader(PAGE_SLAB)
+    reader = PageCachingReader(counting, page_size=16)
+
+    # Spans 3 pages, read together
+    assert reader.read(0x1C, 0x18) == PAGE_SLAB[0x1C:0x34]
+    assert counting.reads == 1
+    assert reader.read(0x20, 4) == PAGE_SLAB[0x20:0x24]
+    assert reader.read(0x2F, 2) == PAGE_SLAB[0x2F:0x31]
+    assert counting.reads == 1
+    assert reader.stats() == PageCacheStats(
+        requests=3, hits=2, misses=1, reads=1, bytes_read=48
+    )
+
+    reader.new_snapshot()
+    reader.read(0x20, 4)
+    assert counting.reads == 2
+    assert reader.stats().since(PageCacheStats(requests=3, hits=2)) == PageCacheStats(
+        requests=1, hits=0, misses=2, reads=2, bytes_read=64
+    )
+
+
+def test_page_caching_reader_prefetch():
+    counting = CountingReader(PAGE_SLAB)
+    reader = PageCachingReader(counting, page_size=16)
+    reader.prefetch([(0x40, 4), (0x52, 8), (0x100, 1)])
+    # 0x40 and 0x50 are adjacent pages
+    assert counting.reads == 2
+    for addr, size in [(0x40, 4), (0x52, 8), (0x100, 1)]:
+        assert reader.read(addr, size) == PAGE_SLAB[addr : addr + size]
+    assert counting.reads == 2
+
+
+def test_page_caching_reader_failures():
+    counting = CountingReader(PAGE_SLAB)
+    reader = PageCachingReader(counting, page_size=16, max_read_pages=4)
+    assert reader.read(len(PAGE_SLAB) - 4, 8) is None
+    assert reader.read(len(PAGE_SLAB) - 4, 4) == PAGE_SLAB[-4:]
+
+    # Too big to cache
+    reads = counting.reads
+    assert reader.read(0, 128) == PAGE_SLAB[:128]
+    assert reader.read(0, 128) == PAGE_SLAB[:128]
+    assert counting.reads == reads + 2
+
+    with pytest.raises(ValueError):
+        PageCachingReader(counting, page_size=24)
@@ -1,6 +1,7 @@
 import ctypes
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from enum import IntEnum
+from typing import FrozenSet, Optional, Tuple
 import pytest
 
 from modlunky2.mem.memrauder.dsl import sc_uint8, sc_uint16, struct_field
@@ -10,6 +11,7 @@ from modlunky2.mem.memrauder.model import (
     FieldPath,
     MemContext,
     ScalarCType,
+    ScalarCValueConstructionError,
 )
 from modlunky2.mem.memrauder.msvc import (
     UnorderedMap,
@@ -70,6 +72,28 @@ def test_vesctor_bad_buf():
         mem_type.from_bytes(vec_buf, mem_ctx)
 
 
+class Color(IntEnum):
+    RED = 10
+    GREEN = 11
+    BLUE = 12
+
+
+def test_vector_enum():
+    vec_buf = (
+        b"\x00" * 8
+        + b"\x01\x00\x00\x00\x00\x00\x00\x00"
+        + b"\xfe" * 4
+        + b"\x04\x00\x00\x00"
+    )
+    mem_type = Vector(FieldPath(), Optional[FrozenSet[Color]], sc_uint8)
+    mem_ctx = MemContext(BytesReader(b"\xff\x0a\x0c\x0a\x0c"))
+    assert mem_type.from_bytes(vec_buf, mem_ctx) == frozenset([Color.RED, Color.BLUE])
+
+    mem_ctx = MemContext(BytesReader(b"\xff\x0a\x0c\x0a\x0d"))
+    with pytest.raises(ScalarCValueConstructionError):
+        mem_type.from_bytes(vec_buf, mem_ctx)
+
+
 @dataclass(frozen=True)
 class VecWrap:
     num_list: Optional[Tuple[int, ...]] = struct_field(0x1, vector(sc_uint16))
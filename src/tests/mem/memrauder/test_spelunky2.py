@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+
+from modlunky2.mem.entities import EntityType
+from modlunky2.mem.memrauder.model import (
+    BytesReader,
+    DictMap,
+    MemContext,
+    MemoryReader,
+)
+from modlunky2.mem.testing import UidEntityMapSlabBuilder
+
+
+@dataclass
+class CountingReader(MemoryReader):
+    slab: bytes
+    reads: int = 0
+
+    def read(self, addr: int, size: int) -> Optional[bytes]:
+        self.reads += 1
+        return BytesReader(self.slab).read(addr, size)
+
+
+ENTITY_TYPES = [EntityType.ITEM_ROCK, EntityType.ITEM_BOMB, EntityType.ITEM_ROPE]
+
+
+def make_builder(mask: int, num_entities: int) -> UidEntityMapSlabBuilder:
+    builder = UidEntityMapSlabBuilder(mask=mask)
+    for uid in range(num_entities):
+        builder.add_entity(uid, ENTITY_TYPES[uid % len(ENTITY_TYPES)])
+    return builder
+
+
+@pytest.mark.parametrize("mask,num_entities", [(0xFF, 20), (0x3F, 60), (0x7, 7)])
+def test_get_many_matches_get(mask, num_entities):
+    builder = make_builder(mask, num_entities)
+    mem_ctx = MemContext(BytesReader(builder.build_slab()))
+    uid_map = builder.build_map(mem_ctx)
+
+    uids = [-1, num_entities + 5, *range(num_entities), 3]
+    expected = [uid_map.get(uid) for uid in uids]
+    assert uid_map.get_many(uids) == expected
+    assert expected[0] is None
+    assert expected[1] is None
+    for uid, found in zip(uids[2:], expected[2:]):
+        assert found.value.uid == uid
+        assert found.value.type.id == ENTITY_TYPES[uid % len(ENTITY_TYPES)]
+
+
+def test_get_many_reads():
+    builder = make_builder(0xFF, 100)
+    reader = CountingReader(builder.build_slab())
+    # Lazy, so only reads of the table and entities are counted, not their types
+    uid_map = builder.build_map(MemContext(reader, lazy=True))
+
+    reads = reader.reads
+    for uid in range(100):
+        uid_map.get(uid)
+    get_reads = reader.reads - reads
+
+    reads = reader.reads
+    uid_map.get_many(range(100))
+    get_many_reads = reader.reads - reads
+    assert get_many_reads < get_reads / 4
+
+
+@dataclass
+class PrefetchCheckingReader(CountingReader):
+    # Once set, every read must be within a range from the last prefetch()
+    prefetched: Optional[list] = None
+
+    def prefetch(self, ranges):
+        self.prefetched = list(ranges)
+
+    def read(self, addr: int, size: int) -> Optional[bytes]:
+        if self.prefetched is not None:
+            assert any(
+                start <= addr and addr + size <= start + length
+                for start, length in self.prefetched
+            ), f"read of {size:#x} bytes at {addr:#x} wasn't prefetched"
+        return super().read(addr, size)
+
+
+def test_get_many_prefetches():
+    builder = make_builder(0xFF, 100)
+    reader = PrefetchCheckingReader(builder.build_slab())
+    uid_map = builder.build_map(MemContext(reader, lazy=True))
+    reader.prefetched = []
+
+    found = uid_map.get_many(range(100))
+    assert [entity.value.uid for entity in found] == list(range(100))
+
+
+def test_get_many_failed_reads():
+    builder = make_builder(0xFF, 20)
+    slab = builder.build_slab()
+    # Drop the last entity
+    mem_ctx = MemContext(BytesReader(slab[: -builder.ENTITY_SIZE]))
+    uid_map = builder.build_map(mem_ctx)
+
+    found = uid_map.get_many(range(20))
+    assert found == [uid_map.get(uid) for uid in range(20)]
+    assert found[19] is None
+    assert all(entity is not None for entity in found[:19])
+
+
+def test_get_many_no_table():
+    builder = make_builder(0xFF, 0)
+    slab = bytearray(builder.build_slab())
+    slab[0x8:0x10] = bytes(8)
+    uid_map = builder.build_map(MemContext(BytesReader(bytes(slab))))
+    assert uid_map.get_many([0, 1]) == [None, None]
+
+
+def test_dict_map_get_many():
+    dict_map = DictMap({1: "a", 3: "c"})
+    assert dict_map.get_many([3, 2, 1]) == ["c", None, "a"]
@@ -0,0 +1,109 @@
+import os
+import shutil
+
+from PIL import Image
+import pytest
+
+from modlunky2.sprites.atlas_index import (
+    ATLAS_INDEX_FILENAME,
+    AtlasIndex,
+    make_biomes,
+    make_non_biome_sheets,
+)
+from modlunky2.sprites.sprite_fetcher import SpelunkySpriteFetcher
+
+
+def noise_sheet(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.frombytes("RGBA", (256, 256), os.urandom(256 * 256 * 4)).save(path)
+
+
+@pytest.fixture(name="sheets_dir", scope="module")
+def fixture_sheets_dir(tmp_path_factory):
+    sheets_dir = tmp_path_factory.mktemp("sheets")
+    # Create whichever sheets building the index asks for
+    while True:
+        try:
+            AtlasIndex.build(sheets_dir)
+            return sheets_dir
+        except FileNotFoundError as err:
+            noise_sheet(sheets_dir / err.filename)
+
+
+@pytest.fixture(name="extract_dir")
+def fixture_extract_dir(sheets_dir, tmp_path):
+    extract_dir = tmp_path / "Extracted"
+    shutil.copytree(sheets_dir, extract_dir)
+    return extract_dir
+
+
+def reference_get(non_biome_sheets, biomes, name, biome="cave"):
+    """What SpelunkySpriteFetcher.get did before the index."""
+    key_map = {}
+    for sheet in non_biome_sheets:
+        for key in sheet.key_map():
+            key_map[key] = sheet.get
+    img = key_map.get(name, lambda x: None)(name)
+    if not img and biome in biomes:
+        img = biomes[biome].get(name)
+    if not img:
+        for biome_name, biome_class in biomes.items():
+            if biome_name != biome:
+                img = biome_class.get(name)
+            if img:
+                break
+    return img
+
+
+def test_get_matches_loaders(extract_dir):
+    fetcher = SpelunkySpriteFetcher(extract_dir)
+    non_biome_sheets = make_non_biome_sheets(extract_dir)
+    biomes = make_biomes(extract_dir)
+
+    names = {"not_a_sprite"}
+    for sheet in non_biome_sheets:
+        names.update(sheet.key_map())
+    for biome in biomes.values():
+        names.update(biome._sheet_map)
+
+    for biome in ["cave", "tidepool", "not_a_biome"]:
+        for name in sorted(names):
+            expected = reference_get(non_biome_sheets, biomes, name, biome)
+            actual = fetcher.get(name, biome)
+            if expected is None:
+                assert actual is None, name
+            else:
+                assert actual.tobytes() == expected.tobytes(), (name, biome)
+
+
+def test_index_reused(extract_dir, monkeypatch):
+    SpelunkySpriteFetcher(extract_dir)
+    assert (extract_dir / ATLAS_INDEX_FILENAME).exists()
+
+    def no_build(_base_path):
+        raise AssertionError("Index should have been loaded")
+
+    monkeypatch.setattr(AtlasIndex, "build", no_build)
+    index = AtlasIndex.load_or_build(extract_dir)
+    assert index.find("olmec") is not None
+
+
+def test_index_invalidated_by_sheet(extract_dir):
+    index = AtlasIndex.load_or_build(extract_dir)
+    assert index.is_current(extract_dir)
+
+    sheet = index.sheets[0]
+    sheet_path = sheet.full_path(extract_dir)
+    stat = sheet_path.stat()
+    os.utime(sheet_path, ns=(stat.st_atime_ns, sheet.mtime_ns + 1))
+    assert not index.is_current(extract_dir)
+
+    rebuilt = AtlasIndex.load_or_build(extract_dir)
+    assert rebuilt.sheets[0].mtime_ns == sheet.mtime_ns + 1
+    assert AtlasIndex.load(extract_dir / ATLAS_INDEX_FILENAME).is_current(extract_dir)
+
+
+def test_load_unreadable(tmp_path):
+    (tmp_path / ATLAS_INDEX_FILENAME).write_text("{", encoding="utf-8")
+    assert AtlasIndex.load(tmp_path / ATLAS_INDEX_FILENAME) is None
+    assert AtlasIndex.load(tmp_path / "missing.json") is None
@@ -0,0 +1,127 @@
+import os
+from pathlib import Path
+
+from PIL import Image
+import pytest
+
+from modlunky2.sprites import sprite_mergers
+from modlunky2.sprites.base_classes.base_sprite_loader import BaseSpriteLoader
+from modlunky2.sprites.base_classes.sheet_cache import SHEET_CACHE
+from modlunky2.sprites.base_classes.base_sprite_merger import (
+    BaseSpriteMerger,
+    Compositing,
+    index_sprite_loaders,
+)
+from modlunky2.sprites.game_data import load_game_data
+from modlunky2.sprites.sprite_loaders import get_sprite_loader_factories
+
+
+class LoaderA(BaseSpriteLoader):
+    _sprite_sheet_path = Path("a.png")
+    _chunk_size = 8
+    _chunk_map = {
+        "a0": (0, 0, 1, 1),
+        "a1": (1, 0, 2, 1),
+        "a2": (2, 0, 3, 1),
+        "wide": (0, 1, 2, 2),
+        "tall": (3, 0, 4, 2),
+    }
+
+
+class LoaderB(BaseSpriteLoader):
+    _sprite_sheet_path = Path("b.png")
+    _chunk_size = 8
+    _chunk_map = {"b0": (0, 0, 1, 1), "b1": (1, 0, 2, 1)}
+
+
+class SubLoaderB(LoaderB):
+    pass
+
+
+def make_merger(separate_grid_file):
+    class Merger(BaseSpriteMerger):
+        _target_sprite_sheet_path = Path("merged.png")
+        _grid_hint_size = 1
+        _origin_map = {
+            LoaderA: {
+                "a0": (0, 0, 1, 1),
+                "a1": (1, 0, 2, 1),
+                "a2": (2, 0, 3, 1),
+                "missing": (3, 0, 4, 1),
+                "tall": (0, 1, 1, 3),
+                "wide": (1, 1, 3, 2),
+            },
+            LoaderB: {"b1": (0, 0, 1, 1), "b0": (1, 0, 2, 1)},
+        }
+
+    return Merger(separate_grid_file=separate_grid_file)
+
+
+def noise_sheet(path, size):
+    Image.frombytes("RGBA", size, os.urandom(size[0] * size[1] * 4)).save(path)
+
+
+@pytest.fixture(name="loaders")
+def fixture_loaders(tmp_path):
+    noise_sheet(tmp_path / "a.png", (32, 16))
+    noise_sheet(tmp_path / "b.png", (16, 8))
+    return [LoaderA(tmp_path), SubLoaderB(tmp_path)]
+
+
+def test_index_sprite_loaders(loaders):
+    loaders_by_type = index_sprite_loaders(loaders)
+    assert loaders_by_type[LoaderA] is loaders[0]
+    assert loaders_by_type[LoaderB] is loaders[1]
+    assert loaders_by_type[BaseSpriteLoader] is loaders[0]
+
+
+@pytest.mark.parametrize("separate_grid_file", [True, False])
+def test_compositing_matches(loaders, separate_grid_file):
+    merger = make_merger(separate_grid_file)
+    merger.compositing = Compositing.PER_CHUNK
+    expected = merger.do_merge(loaders).tobytes()
+    expected_grid = merger._grid_image.tobytes()
+
+    merger.compositing = Compositing.BATCHED
+    assert merger.do_merge(loaders).tobytes() == expected
+    assert merger._grid_image.tobytes() == expected_grid
+
+
+@pytest.fixture(name="extract_dir")
+def fixture_extract_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sprite_mergers, "_SPRITE_MERGERS", [])
+    entities_json, textures_json = load_game_data()
+    noise = Image.frombytes("RGBA", (2048, 2048), os.urandom(2048 * 2048 * 4))
+    # The same image is counted once per sheet, don't let any be evicted
+    monkeypatch.setattr(SHEET_CACHE, "max_bytes", 1 << 40)
+    for loader_type, _ in get_sprite_loader_factories(
+        entities_json, textures_json, tmp_path
+    ):
+        sheet_path = tmp_path / loader_type.__new__(loader_type)._sprite_sheet_path
+        sheet_path.parent.mkdir(parents=True, exist_ok=True)
+        Image.new("RGBA", (1, 1)).save(sheet_path)
+        SHEET_CACHE.put(sheet_path, noise)
+    return tmp_path
+
+
+def test_compositing_matches_sprite_mergers(extract_dir):
+    entities_json, textures_json = load_game_data()
+    loaders = [
+        factory()
+        for _, factory in get_sprite_loader_factories(
+            entities_json, textures_json, extract_dir
+        )
+    ]
+
+    all_mergers = sprite_mergers.get_all_sprite_mergers(
+        entities_json, textures_json, extract_dir
+    )
+    for merger in all_mergers[:2] + all_mergers[-3:]:
+        merger.compositing = Compositing.PER_CHUNK
+        expected = merger.do_merge(loaders).tobytes()
+        expected_grid = merger._grid_image.tobytes()
+
+        merger.compositing = Compositing.BATCHED
+        assert merger.do_merge(loaders).tobytes() == expected, merger.stem
+        assert merger._grid_image.tobytes() == expected_grid, merger.stem
+        merger.release()
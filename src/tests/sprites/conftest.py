@@ -0,0 +1,11 @@
+import pytest
+
+from modlunky2.sprites import game_data
+
+
+@pytest.fixture(autouse=True)
+def game_data_cache(tmp_path_factory, monkeypatch):
+    """Keep the digested game data out of the real cache directory."""
+    cache_path = tmp_path_factory.getbasetemp() / "game-data.pickle"
+    monkeypatch.setattr(game_data, "GAME_DATA_CACHE_PATH", cache_path)
+    return cache_path
@@ -0,0 +1,73 @@
+import json
+import shutil
+
+import pytest
+
+from modlunky2.sprites import game_data
+from modlunky2.sprites.game_data import GAME_DATA_DIR, load_game_data
+from modlunky2.sprites.util import chunks_from_json, target_chunks_from_json
+
+
+@pytest.fixture(name="fresh_load")
+def fixture_fresh_load():
+    load_game_data.cache_clear()
+    yield load_game_data
+    load_game_data.cache_clear()
+
+
+def read_json(name):
+    with (GAME_DATA_DIR / name).open(encoding="utf-8") as json_file:
+        return json.load(json_file)
+
+
+def test_digest_gives_same_chunks(fresh_load):
+    entities_json = read_json("entities.json")
+    textures_json = read_json("textures.json")
+    entities, textures = fresh_load()
+
+    assert entities.keys() == entities_json.keys()
+    for entity_name in entities_json:
+        for chunk_size in (128, 64):
+            assert chunks_from_json(
+                entities, textures, entity_name, chunk_size
+            ) == chunks_from_json(entities_json, textures_json, entity_name, chunk_size)
+        assert target_chunks_from_json(
+            entities, textures, entity_name, 128
+        ) == target_chunks_from_json(entities_json, textures_json, entity_name, 128)
+
+
+def test_cache_reused(fresh_load, game_data_cache, monkeypatch):
+    game_data_cache.unlink(missing_ok=True)
+    expected = fresh_load()
+    assert game_data_cache.exists()
+
+    def no_parse(_data):
+        raise AssertionError("Digest should have been loaded from the cache")
+
+    monkeypatch.setattr(json, "loads", no_parse)
+    fresh_load.cache_clear()
+    assert fresh_load() == expected
+
+
+def test_cache_invalidated(fresh_load, game_data_cache, tmp_path, monkeypatch):
+    game_data_dir = tmp_path / "game_data"
+    shutil.copytree(GAME_DATA_DIR, game_data_dir)
+    monkeypatch.setattr(game_data, "GAME_DATA_DIR", game_data_dir)
+    entities, _ = fresh_load()
+
+    entities_json = read_json("entities.json")
+    name = next(iter(entities_json))
+    entities_json[name]["tile_x"] += 1
+    (game_data_dir / "entities.json").write_text(
+        json.dumps(entities_json), encoding="utf-8"
+    )
+
+    fresh_load.cache_clear()
+    changed, _ = fresh_load()
+    assert changed[name]["tile_x"] == entities[name]["tile_x"] + 1
+
+
+def test_unreadable_cache(fresh_load, game_data_cache):
+    game_data_cache.write_bytes(b"not a pickle")
+    entities, textures = fresh_load()
+    assert entities and textures
@@ -0,0 +1,117 @@
+from PIL import Image
+import pytest
+
+from modlunky2.sprites import sprite_mergers
+from modlunky2.sprites.game_data import load_game_data
+from modlunky2.sprites.merge_scheduler import (
+    merge_batch,
+    order_by_shared_sheets,
+    schedule_merges,
+)
+from modlunky2.sprites.sprite_loaders import get_sprite_loader_factories
+
+
+class FakeLoader:
+    opened = []
+    closed = []
+
+    def __init__(self, name):
+        self.name = name
+        FakeLoader.opened.append(name)
+
+    def close(self):
+        FakeLoader.closed.append(self.name)
+
+
+def fake_loader_type(name):
+    return type(name, (FakeLoader,), {})
+
+
+class FakeMerger:
+    def __init__(self, stem, loader_types):
+        self.stem = stem
+        self._origin_map = {loader_type: {} for loader_type in loader_types}
+        self.merged_with = None
+
+    def do_merge(self, sprite_loaders):
+        self.merged_with = [loader.name for loader in sprite_loaders]
+
+    def save(self):
+        pass
+
+    def release(self):
+        pass
+
+
+def test_order_by_shared_sheets():
+    a, b, c = (fake_loader_type(name) for name in "abc")
+    mergers = [
+        FakeMerger("ab", [a, b]),
+        FakeMerger("c", [c]),
+        FakeMerger("b", [b]),
+        FakeMerger("bc", [b, c]),
+    ]
+    assert order_by_shared_sheets(mergers) == [0, 2, 3, 1]
+
+
+def test_merge_batch_opens_sheets_once(monkeypatch):
+    monkeypatch.setattr(FakeLoader, "opened", [])
+    monkeypatch.setattr(FakeLoader, "closed", [])
+    a, b, c = (fake_loader_type(name) for name in "abc")
+    factories = [(t, lambda t=t: t(t.__name__)) for t in (a, b, c)]
+    mergers = [
+        FakeMerger("ab", [a, b]),
+        FakeMerger("b", [b]),
+        FakeMerger("bc", [b, c]),
+    ]
+
+    timings = merge_batch(mergers, factories, [0, 1, 2])
+
+    assert [timing.stem for timing in timings] == ["ab", "b", "bc"]
+    assert all(timing.error is None for timing in timings)
+    assert mergers[2].merged_with == ["b", "c"]
+    assert FakeLoader.opened == ["a", "b", "c"]
+    # Each sheet is closed right after its last use
+    assert FakeLoader.closed == ["a", "b", "c"]
+
+
+@pytest.fixture(name="extract_dir")
+def fixture_extract_dir(tmp_path, monkeypatch):
+    # Don't reuse mergers cached for a different base path
+    monkeypatch.setattr(sprite_mergers, "_SPRITE_MERGERS", [])
+    entities_json, textures_json = load_game_data()
+    for loader_type, _ in get_sprite_loader_factories(
+        entities_json, textures_json, tmp_path
+    ):
+        # Some paths are properties, e.g. built from the biome name
+        sheet_path = tmp_path / loader_type.__new__(loader_type)._sprite_sheet_path
+        sheet_path.parent.mkdir(parents=True, exist_ok=True)
+        Image.new("RGBA", (64, 64), (255, 0, 0, 255)).save(sheet_path)
+    return tmp_path
+
+
+def test_schedule_merges(extract_dir):
+    entities_json, textures_json = load_game_data()
+    all_mergers = sprite_mergers.get_all_sprite_mergers(
+        entities_json, textures_json, extract_dir
+    )
+    selected = all_mergers[:3] + all_mergers[-2:]
+
+    timings = schedule_merges(
+        extract_dir, selected, entities_json, textures_json, max_workers=2
+    )
+
+    assert sorted(timing.stem for timing in timings) == sorted(
+        merger.stem for merger in selected
+    )
+    assert all(timing.error is None for timing in timings)
+    for merger in selected:
+        assert merger.target_path.exists()
+
+
+def test_schedule_merges_nothing_to_do(extract_dir):
+    entities_json, textures_json = load_game_data()
+    assert (
+        schedule_merges(extract_dir, [], entities_json, textures_json, max_workers=2)
+        == []
+    )
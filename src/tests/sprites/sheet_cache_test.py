@@ -0,0 +1,92 @@
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from modlunky2.sprites.base_classes.base_sprite_loader import BaseSpriteLoader
+from modlunky2.sprites.base_classes.sheet_cache import SheetCache, SHEET_CACHE
+
+
+def save_sheet(path, size, color=(255, 0, 0, 255)):
+    Image.new("RGBA", size, color).save(path)
+
+
+def test_get_decodes_once(tmp_path):
+    path = tmp_path / "sheet.png"
+    save_sheet(path, (16, 16))
+    cache = SheetCache()
+
+    sheet = cache.get(path)
+    assert sheet.image.size == (16, 16)
+    assert cache.get(tmp_path / "." / "sheet.png") is sheet
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.sheets) == (1, 1, 1)
+    assert stats.nbytes == 16 * 16 * 4
+    assert stats.hit_rate == 0.5
+
+
+def test_get_changed_sheet(tmp_path):
+    path = tmp_path / "sheet.png"
+    save_sheet(path, (16, 16))
+    cache = SheetCache()
+    sheet = cache.get(path)
+
+    save_sheet(path, (8, 8))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, sheet.mtime_ns + 1))
+
+    changed = cache.get(path)
+    assert changed is not sheet
+    assert changed.image.size == (8, 8)
+    assert cache.stats().sheets == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    paths = [tmp_path / f"sheet{idx}.png" for idx in range(3)]
+    for path in paths:
+        save_sheet(path, (16, 16))
+    cache = SheetCache(max_bytes=2 * 16 * 16 * 4)
+
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    assert cache.get(paths[0]) is first
+    cache.get(paths[2])
+
+    stats = cache.stats()
+    assert (stats.sheets, stats.evictions) == (2, 1)
+    # sheet1 was the least recently used
+    assert cache.get(paths[0]) is first
+    assert cache.stats().misses == 3
+
+
+def test_crop_shared(tmp_path):
+    path = tmp_path / "sheet.png"
+    save_sheet(path, (16, 16))
+    sheet = SheetCache().get(path)
+
+    cropped = sheet.crop((0, 0, 8, 8))
+    assert cropped.size == (8, 8)
+    assert sheet.crop((0, 0, 8, 8)) is cropped
+    assert sheet.nbytes == (16 * 16 + 8 * 8) * 4
+
+
+class Loader(BaseSpriteLoader):
+    _sprite_sheet_path = Path("sheet.png")
+    _chunk_size = 8
+    _chunk_map = {"a": (0, 0, 1, 1), "half": (0.5, 0, 1.5, 1)}
+
+
+def test_loaders_share_sheet(tmp_path):
+    save_sheet(tmp_path / "sheet.png", (16, 16))
+    first = Loader(tmp_path)
+    second = Loader(tmp_path)
+
+    assert first._sprite_sheet is second._sprite_sheet
+    assert first.get("a") is second.get("a")
+    assert first.get("half").size == (8, 8)
+    assert first.get("missing") is None
+
+    first.close()
+    assert second.get("a").size == (8, 8)
+    assert SHEET_CACHE.get(tmp_path / "sheet.png").image is second._sprite_sheet